@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Vergleicht das HTML-Rendering per String-Verkettung mit dem Streaming-Writer
+
+Die alte Variante (html += ... und ein f.write am Ende) wird aus einer
+Git-Revision von create_complete_visualization.py geladen, die aktuelle aus dem
+Arbeitsverzeichnis. Jede Messung läuft in einem eigenen Prozess; der
+Peak-Speicher (VmHWM) wird direkt vor dem Rendern zurückgesetzt.
+
+    python benchmarks/bench_render.py --sizes 500x50 2000x200
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import benchutil
+from synthetic_comparison import generate_comparison, parse_size
+
+def synthetic_report(module, n_prompts, n_configs, output_chars=400, seed=0):
+    """Report-dict wie prepare_report aus einer synthetischen Comparison-JSON"""
+    data = generate_comparison(n_prompts, n_configs, seed=seed, response_chars=output_chars,
+                               judges=0, similarities=False, histories=False)
+    results, models, prompts, prompts_data = module.extract_data(data)
+    model_stats, consolidated_ranking, detailed_ranking, category_best = module.calculate_statistics(
+        results, models, prompts, prompts_data)
+    return {
+        'results': results, 'models': models, 'prompts': prompts, 'prompts_data': prompts_data,
+        'model_stats': model_stats, 'consolidated_ranking': consolidated_ranking,
+        'detailed_ranking': detailed_ranking, 'category_best': category_best,
+    }
+
+def worker(module_path, n_prompts, n_configs, output_chars, output_path):
+    """Ein Rendering messen und das Ergebnis als JSON auf stdout ausgeben"""
+    module = benchutil.load_module(module_path)
+    report = synthetic_report(module, n_prompts, n_configs, output_chars)
+    gc.collect()
+    benchutil.reset_peak_rss()
+    rss_before = benchutil.current_rss_kb()
+    start = time.perf_counter()
+    module.render_html(report, output_path, 'inline', 'table')
+    seconds = time.perf_counter() - start
+    rss_after = benchutil.peak_rss_kb()
+    with open(output_path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_extra_mb': (rss_after - rss_before) / 1024,
+        'output_mb': Path(output_path).stat().st_size / 1e6,
+        'sha256': digest,
+    }))
+
+def baseline_revision():
+    """Letzte Revision vor dem Streaming-Writer ([user-010])"""
+    commit = benchutil.git('log', '-1', '--format=%H', '--grep', r'^\[user-010\]')
+    return f'{commit}~1' if commit else 'HEAD'
+
+def measure(module_path, size, output_chars, output_path):
+    n_prompts, n_configs = size
+    proc = subprocess.run(
+        [sys.executable, __file__, '--worker', str(module_path), str(n_prompts), str(n_configs),
+         str(output_chars), str(output_path)],
+        capture_output=True, text=True, check=True,
+        # Kategorie-Reihenfolge hängt an der Set-Iteration, für vergleichbare Ausgaben fixieren
+        env={**os.environ, 'PYTHONHASHSEED': '0'})
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        module_path, n_prompts, n_configs, output_chars, output_path = sys.argv[2:7]
+        worker(module_path, int(n_prompts), int(n_configs), int(output_chars), output_path)
+        return
+
+    parser = argparse.ArgumentParser(description='Benchmark: String-Verkettung vs. Streaming-Writer')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[(500, 50), (2000, 100)],
+                        help='Größen als <Prompts>x<Konfigurationen> (Standard: 500x50 2000x100)')
+    parser.add_argument('--output-chars', type=int, default=400,
+                        help='Länge der synthetischen Modell-Antworten in Zeichen')
+    parser.add_argument('--baseline-rev',
+                        help='Git-Revision mit der alten Variante (Standard: Parent des [user-010]-Commits)')
+    args = parser.parse_args()
+
+    baseline_rev = args.baseline_rev or baseline_revision()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        baseline_path = benchutil.export_revision(baseline_rev, tmp / 'baseline')
+        variants = [('verkettet', baseline_path), ('streaming', benchutil.REPO_DIR / benchutil.SCRIPT_NAME)]
+
+        print(f"Baseline: {baseline_rev}")
+        print(f"{'Größe':>12} {'Variante':>10} {'Zeit [s]':>9} {'Peak +MB':>9} {'HTML [MB]':>10}")
+        for size in args.sizes:
+            digests = set()
+            for name, module_path in variants:
+                result = measure(module_path, size, args.output_chars, tmp / f'{name}.html')
+                digests.add(result['sha256'])
+                print(f"{size[0]:>6}x{size[1]:<5} {name:>10} {result['seconds']:>9.2f} "
+                      f"{result['peak_extra_mb']:>9.1f} {result['output_mb']:>10.1f}")
+            if len(digests) != 1:
+                print("  Warnung: Ausgaben der beiden Varianten unterscheiden sich")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Gemeinsame Hilfen der Benchmarks: Speicher messen, Script-Versionen laden"""
+
+import importlib.util
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+SCRIPT_NAME = 'create_complete_visualization.py'
+
+def _proc_status_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def current_rss_kb():
+    rss = _proc_status_kb('VmRSS')
+    return rss if rss is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def reset_peak_rss():
+    """Setzt VmHWM zurück (Linux), damit der Peak nur die folgende Phase misst"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_kb():
+    peak = _proc_status_kb('VmHWM')
+    return peak if peak is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def load_module(path, name='viz_under_test'):
+    """Lädt das Script aus path; seine Hilfsmodule (comparison_loader.py, ...) kommen aus demselben Verzeichnis"""
+    sys.path.insert(0, str(Path(path).resolve().parent))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def git(*args):
+    return subprocess.run(['git', *args], cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout.strip()
+
+def export_revision(rev, target_dir):
+    """Schreibt die Python-Dateien im Wurzelverzeichnis einer Git-Revision nach target_dir
+
+    Das Script importiert seit der Aufteilung eigene Module (comparison_loader.py,
+    report_statistics.py, ...); sie müssen aus derselben Revision stammen.
+    Rückgabe: Pfad des Scripts.
+    """
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for name in git('ls-tree', '--name-only', rev).splitlines():
+        if name.endswith('.py'):
+            (target_dir / name).write_text(git('show', f'{rev}:{name}') + '\n', encoding='utf-8')
+    return target_dir / SCRIPT_NAME
+
+def describe_tree():
+    """Kurze Revision des Arbeitsverzeichnisses, mit '+dirty' bei lokalen Änderungen an den Python-Dateien"""
+    try:
+        rev = git('rev-parse', '--short', 'HEAD')
+        dirty = git('status', '--porcelain', '--', ':(glob)*.py')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return rev + ('+dirty' if dirty else '')
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Benchmark-Suite für create_complete_visualization.py auf synthetischen Runs
+
+Für jede Größe (<Prompts>x<Konfigurationen>) wird eine Comparison-JSON erzeugt
+(und unter --data-dir wiederverwendet). Ein frischer Prozess misst dann
+die Phasen load, extract_data, calculate_statistics und create_html:
+Zeit, Peak-Speicher der Phase (VmHWM) und Ausgabegröße. Die Ergebnisse
+landen als JSON in benchmarks/results/, damit sich Versionen vergleichen lassen:
+
+    python benchmarks/run_benchmarks.py --sizes 50x5 200x30 500x50
+    python benchmarks/run_benchmarks.py --compare          # gegen den letzten gespeicherten Lauf
+    python benchmarks/run_benchmarks.py --rev HEAD~3 --no-save
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy
+
+import benchutil
+from synthetic_comparison import GENERATOR_VERSION, parse_size, write_comparison
+
+DEFAULT_SIZES = [(50, 5), (200, 30), (500, 50)]
+DEFAULT_DATA_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'mhd-visualization' / 'benchmarks'
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+PHASES = ('load', 'extract_data', 'calculate_statistics', 'create_html')
+
+def synthetic_input(data_dir, size, seed):
+    """Pfad der synthetischen Comparison-JSON dieser Größe, bei Bedarf erzeugt"""
+    n_prompts, n_configs = size
+    path = Path(data_dir) / f'synthetic_{n_prompts}x{n_configs}_s{seed}_v{GENERATOR_VERSION}_comparison.json'
+    if not path.exists():
+        print(f"Erzeuge {path.name}...", flush=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        write_comparison(tmp_path, n_prompts, n_configs, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+def measure_phase(fn):
+    """Führt fn aus und liefert (Ergebnis, Sekunden, zusätzlicher Peak in MB)"""
+    gc.collect()
+    benchutil.reset_peak_rss()
+    rss_before = benchutil.current_rss_kb()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak_mb = max(0, benchutil.peak_rss_kb() - rss_before) / 1024
+    return result, seconds, peak_mb
+
+def worker(module_path, input_path, output_path):
+    """Misst alle Phasen für eine Eingabe und gibt das Ergebnis als JSON-Zeile aus"""
+    module = benchutil.load_module(module_path)
+    phases = {}
+
+    def load():
+        if hasattr(module, 'load_comparison'):
+            return module.load_comparison(input_path)
+        with open(input_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    data, seconds, peak = measure_phase(load)
+    phases['load'] = {'seconds': seconds, 'peak_mb': peak}
+
+    (results, models, prompts, prompts_data), seconds, peak = measure_phase(lambda: module.extract_data(data))
+    phases['extract_data'] = {'seconds': seconds, 'peak_mb': peak}
+
+    def statistics():
+        stats = module.calculate_statistics(results, models, prompts, prompts_data)
+        extra = {}
+        if hasattr(module, 'significance_statistics'):
+            cube = module.ScoreCube.from_results(results, models, prompts, prompts_data)
+            extra['significance'] = module.significance_statistics(cube, stats[1], stats[2])
+        if hasattr(module, 'SimilarityCube'):
+            cube = module.SimilarityCube.from_data(data, models, prompts)
+            extra['similarity'] = module.similarity_statistics(cube, stats[0]) if cube else None
+        return stats, extra
+
+    (stats, extra), seconds, peak = measure_phase(statistics)
+    phases['calculate_statistics'] = {'seconds': seconds, 'peak_mb': peak}
+
+    if hasattr(module, 'render_html'):
+        model_stats, consolidated_ranking, detailed_ranking, category_best = stats
+        report = {
+            'results': results, 'models': models, 'prompts': prompts, 'prompts_data': prompts_data,
+            'model_stats': model_stats, 'consolidated_ranking': consolidated_ranking,
+            'detailed_ranking': detailed_ranking, 'category_best': category_best, **extra,
+        }
+        render = lambda: module.render_html(report, output_path)
+    else:
+        # Ältere Versionen: create_html rechnet Extraktion und Statistik selbst noch einmal
+        render = lambda: module.create_html(data, output_path)
+    _, seconds, peak = measure_phase(render)
+    phases['create_html'] = {'seconds': seconds, 'peak_mb': peak}
+
+    print(json.dumps({
+        'phases': phases,
+        'peak_rss_mb': benchutil.peak_rss_kb() / 1024,
+        'output_mb': Path(output_path).stat().st_size / 1e6,
+    }))
+
+def run_size(module_path, input_path, output_path, repeat):
+    """Median der Zeiten und Maximum der Peaks über repeat frische Prozesse"""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, __file__, '--worker', str(module_path), str(input_path), str(output_path)],
+            capture_output=True, text=True, env={**os.environ, 'PYTHONHASHSEED': '0'})
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'Worker fehlgeschlagen')
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    phases = {
+        name: {
+            'seconds': statistics.median(r['phases'][name]['seconds'] for r in runs),
+            'peak_mb': max(r['phases'][name]['peak_mb'] for r in runs),
+        }
+        for name in PHASES
+    }
+    return {
+        'phases': phases,
+        'total_seconds': sum(p['seconds'] for p in phases.values()),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        'output_mb': runs[-1]['output_mb'],
+    }
+
+def latest_results(results_dir):
+    files = sorted(Path(results_dir).glob('*.json'))
+    if not files:
+        return None, None
+    with open(files[-1], encoding='utf-8') as f:
+        return files[-1], json.load(f)
+
+def compare(previous, current, max_slowdown):
+    """Druckt Zeitverhältnisse pro Größe und Phase, True wenn etwas über max_slowdown liegt"""
+    before = {run['size']: run for run in previous['runs']}
+    regression = False
+    print(f"\nVergleich mit {previous['revision']} ({previous['timestamp']}):")
+    for run in current['runs']:
+        old = before.get(run['size'])
+        if old is None:
+            continue
+        cells = []
+        for name in PHASES + ('total',):
+            new_s = run['total_seconds'] if name == 'total' else run['phases'][name]['seconds']
+            old_s = old['total_seconds'] if name == 'total' else old['phases'][name]['seconds']
+            ratio = new_s / old_s if old_s > 0 else float('inf')
+            flag = ''
+            if ratio > max_slowdown and new_s - old_s > 0.05:
+                flag = ' (!)'
+                regression = True
+            cells.append(f"{name} {ratio:.2f}x{flag}")
+        print(f"  {run['size']:>10}: " + ', '.join(cells))
+    return regression
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description='Benchmark-Suite auf synthetischen Comparison-JSONs')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=DEFAULT_SIZES,
+                        help='Größen als <Prompts>x<Konfigurationen> (Standard: 50x5 200x30 500x50)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='Wiederholungen pro Größe (Median der Zeiten)')
+    parser.add_argument('--rev', help='Git-Revision statt des Arbeitsverzeichnisses messen')
+    parser.add_argument('--data-dir', type=Path, default=DEFAULT_DATA_DIR,
+                        help=f'Ablage der erzeugten Eingaben (Standard: {DEFAULT_DATA_DIR})')
+    parser.add_argument('--results-dir', type=Path, default=RESULTS_DIR,
+                        help='Ablage der Ergebnisse (Standard: benchmarks/results)')
+    parser.add_argument('--no-save', action='store_true', help='Ergebnisse nicht speichern')
+    parser.add_argument('--compare', action='store_true',
+                        help='Mit dem zuletzt gespeicherten Lauf vergleichen; Exit-Code 1 bei Regression')
+    parser.add_argument('--max-slowdown', type=float, default=1.25,
+                        help='Ab diesem Zeitverhältnis gilt eine Phase als Regression (Standard: 1.25)')
+    args = parser.parse_args()
+
+    args.data_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.rev:
+            module_path = benchutil.export_revision(args.rev, tmp / 'revision')
+            revision = benchutil.git('rev-parse', '--short', args.rev)
+        else:
+            module_path = benchutil.REPO_DIR / benchutil.SCRIPT_NAME
+            revision = benchutil.describe_tree()
+
+        current = {
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'revision': revision,
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'runs': [],
+        }
+        print(f"Revision: {revision}")
+        header = f"{'Größe':>11} {'Eingabe':>8}" + ''.join(f" {name:>20}" for name in PHASES) + f" {'gesamt':>8} {'HTML':>8}"
+        print(header)
+        print(f"{'':>11} {'[MB]':>8}" + ''.join(f" {'[s] / Peak [MB]':>20}" for _ in PHASES) + f" {'[s]':>8} {'[MB]':>8}")
+        for size in args.sizes:
+            input_path = synthetic_input(args.data_dir, size, args.seed)
+            result = run_size(module_path, input_path, tmp / 'out.html', args.repeat)
+            run = {
+                'size': f'{size[0]}x{size[1]}',
+                'prompts': size[0],
+                'configs': size[1],
+                'seed': args.seed,
+                'input_mb': input_path.stat().st_size / 1e6,
+                **result,
+            }
+            current['runs'].append(run)
+            print(f"{run['size']:>11} {run['input_mb']:>8.1f}"
+                  + ''.join(f" {run['phases'][name]['seconds']:>10.2f} / {run['phases'][name]['peak_mb']:>7.1f}"
+                            for name in PHASES)
+                  + f" {run['total_seconds']:>8.2f} {run['output_mb']:>8.1f}")
+
+    regression = False
+    if args.compare:
+        previous_path, previous = latest_results(args.results_dir)
+        if previous is None:
+            print("\nKein gespeicherter Lauf zum Vergleichen.")
+        else:
+            regression = compare(previous, current, args.max_slowdown)
+
+    if not args.no_save:
+        args.results_dir.mkdir(parents=True, exist_ok=True)
+        stamp = current['timestamp'].replace(':', '').replace('-', '')
+        path = args.results_dir / f"{stamp}_{revision.replace('+', '-')}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+        print(f"\nGespeichert: {path}")
+
+    if regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
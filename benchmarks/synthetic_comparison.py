@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Erzeugt synthetische Weval-Comparison-JSONs in beliebiger Größe
+
+Das Schema entspricht echten Runs (config.prompts[].points/should_not,
+effectiveModels mit [temp:..][sp_idx:..]-Suffix inkl. IDEAL_BENCHMARK,
+allFinalAssistantResponses, evaluationResults.llmCoverageScores[..].pointAssessments
+mit individualJudgements, similarityMatrix, perPromptSimilarities,
+fullConversationHistories, errors), damit Laden und Extraktion realistisch
+viel Arbeit haben.
+
+Jeder Prompt wird aus einem eigenen, aus (seed, Index) abgeleiteten Zufallsgenerator
+erzeugt. write_comparison schreibt die Datei deshalb Abschnitt für Abschnitt und
+braucht nur Speicher für einen Prompt, auch bei 5.000 Prompts x 500 Konfigurationen.
+
+    python benchmarks/synthetic_comparison.py 500x50 -o /tmp/synth_comparison.json.gz
+"""
+
+import argparse
+import bz2
+import gzip
+import io
+import json
+import lzma
+import random
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+CATEGORY_PREFIXES = ['mhd-trans', 'mhd-insult', 'mhd-false-trans', 'mhd-context-fake', 'mhd-history-fake', 'mhd-curse']
+PROVIDERS = ['openai', 'openrouter:anthropic', 'openrouter:google', 'openrouter:qwen', 'openrouter:deepseek', 'openrouter:meta-llama']
+SYSTEM_PROMPTS = [
+    None,
+    'Du bist ein Experte für mittelhochdeutsche Sprache und Literatur. Übersetze präzise und gestehe Unwissenheit ein, wenn du etwas nicht weißt.',
+    'Du bist ein Experte für mittelhochdeutsche Sprache und Literatur. Übersetze präzise, vermeide derbe Wörter.',
+]
+JUDGES = [
+    'holistic-qwen3-30b-a3b-instruct-2507(openrouter:qwen/qwen3-30b-a3b-instruct-2507)',
+    'holistic-openai-gpt-oss-120b(openrouter:openai/gpt-oss-120b)',
+    'holistic-zai-glm-4.5(openrouter:z-ai/glm-4.5)',
+]
+WORDS = ['minne', 'êre', 'tugent', 'âventiure', 'ritter', 'vrouwe', 'helt', 'swert', 'künec', 'lant', 'magedîn',
+         'Übersetzung', 'bedeutet', 'wörtlich', 'Vers', 'Nibelungenlied', 'Parzival', 'höfisch', 'Begriff', 'und',
+         'der', 'die', 'das', 'ist', 'nicht', 'im', 'Sinne', 'von', 'als', 'auch']
+
+# Erhöhen, wenn sich der erzeugte Inhalt ändert (Name der zwischengespeicherten Benchmark-Eingaben)
+GENERATOR_VERSION = 2
+
+DEFAULT_OPTIONS = {
+    'response_chars': 600,
+    'points_per_prompt': 5,
+    'judges': 3,
+    'error_rate': 0.02,
+    'similarities': True,
+    'histories': True,
+}
+
+def parse_size(text):
+    """'500x50' -> (500, 50)"""
+    prompts, configs = text.lower().split('x')
+    return int(prompts), int(configs)
+
+def _sentence(rng, n_words):
+    return ' '.join(rng.choice(WORDS) for _ in range(n_words)) + '.'
+
+def _text(rng, n_chars):
+    parts = []
+    length = 0
+    while length < n_chars:
+        sentence = _sentence(rng, rng.randint(6, 16))
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return ' '.join(parts)
+
+def config_ids(n_configs):
+    """Konfigurations-IDs wie in echten Runs: je Basismodell drei System-Prompt-Varianten"""
+    models = []
+    for i in range(n_configs):
+        base = i // len(SYSTEM_PROMPTS)
+        provider = PROVIDERS[base % len(PROVIDERS)]
+        models.append(f'{provider}/model-{base:03d}[temp:0][sp_idx:{i % len(SYSTEM_PROMPTS)}]')
+    return models
+
+def config_skills(models, seed):
+    """Grundstärke pro Konfiguration, damit Rankings Struktur haben"""
+    rng = random.Random(f'{seed}-skill')
+    return {m: rng.uniform(0.3, 0.95) for m in models}
+
+def prompt_id(i):
+    return f'{CATEGORY_PREFIXES[i % len(CATEGORY_PREFIXES)]}-synth-{i:05d}'
+
+def generate_prompt(i, models, skill, seed=0, **options):
+    """Alle Daten eines Prompts: Definition, Antworten, Scores, Ähnlichkeiten, Verläufe, Fehler"""
+    opts = {**DEFAULT_OPTIONS, **options}
+    rng = random.Random(f'{seed}-{i}')
+    pid = prompt_id(i)
+    user_text = 'Übersetze: ' + _sentence(rng, 12)
+    points = [{'text': f'Kriterium {k}: ' + _sentence(rng, 8), 'multiplier': 1}
+              for k in range(opts['points_per_prompt'])]
+    should_not = [{'text': 'Erfindet ' + _sentence(rng, 6), 'multiplier': 1}] if i % 2 else []
+    definition = {
+        'messages': [{'role': 'user', 'content': user_text}],
+        'id': pid,
+        'description': 'Synthetischer Prompt ' + _sentence(rng, 6),
+        'idealResponse': _text(rng, opts['response_chars'] // 3),
+        'render_as': 'markdown',
+        'points': points,
+    }
+    if should_not:
+        definition['should_not'] = should_not
+
+    responses = {'IDEAL_BENCHMARK': definition['idealResponse']}
+    coverage = {}
+    histories = {}
+    errors = {}
+    for model_id in models:
+        if rng.random() < opts['error_rate']:
+            message = f'Failed to get response for {model_id}: API Error: 404 Not Found.'
+            responses[model_id] = '<<error>>' + message + '<</error>>'
+            coverage[model_id] = {'error': 'Generation failed: ' + message}
+            errors[model_id] = message
+            continue
+        output = _text(rng, opts['response_chars'])
+        responses[model_id] = output
+        assessments = []
+        for point in points + should_not:
+            is_inverted = point in should_not
+            extent = min(1.0, max(0.0, rng.gauss(skill[model_id], 0.25)))
+            if is_inverted:
+                extent = 1.0 - extent
+            extent = round(extent * 4) / 4
+            judgements = [{'judgeModelId': JUDGES[j % len(JUDGES)], 'coverageExtent': extent,
+                           'reflection': _sentence(rng, 18)} for j in range(opts['judges'])]
+            assessments.append({
+                'keyPointText': point['text'],
+                'coverageExtent': extent,
+                'reflection': f"Consensus from {opts['judges']} judge(s). Average score: {extent:.2f}.",
+                'individualJudgements': judgements,
+                'multiplier': 1,
+                'isInverted': is_inverted,
+                'pathId': 'path_0',
+            })
+        positive = [a['coverageExtent'] for a in assessments if not a['isInverted']]
+        coverage[model_id] = {
+            'keyPointsCount': len(assessments),
+            'avgCoverageExtent': round(sum(positive) / len(positive), 4),
+            'pointAssessments': assessments,
+        }
+        histories[model_id] = [
+            {'role': 'user', 'content': user_text},
+            {'role': 'assistant', 'content': output},
+        ]
+    similarities = prompt_similarities(rng, models, skill, errors) if opts['similarities'] else {}
+    return {
+        'definition': definition,
+        'responses': responses,
+        'coverage': coverage,
+        'similarities': similarities,
+        'histories': histories,
+        'errors': errors,
+    }
+
+def prompt_similarities(rng, models, skill, errors):
+    """Symmetrische Ähnlichkeitsmatrix eines Prompts wie in perPromptSimilarities
+
+    Varianten desselben Basismodells ähneln sich stärker, gute Konfigurationen der
+    Idealantwort; vereinzelte Antworten weichen deutlich von allen anderen ab.
+    Fehlgeschlagene Konfigurationen haben nur null-Einträge (außer der Diagonale).
+    """
+    ids = ['IDEAL_BENCHMARK'] + models
+    offset = {m: (-0.25 if rng.random() < 0.01 else 0.0) for m in models}
+    offset['IDEAL_BENCHMARK'] = 0.0
+    matrix = {a: {} for a in ids}
+    for i, a in enumerate(ids):
+        matrix[a][a] = 1
+        for b in ids[i + 1:]:
+            if a in errors or b in errors:
+                value = None
+            elif a == 'IDEAL_BENCHMARK':
+                value = round(min(0.99, max(0.0, 0.5 + 0.4 * skill[b] + offset[b] + rng.gauss(0, 0.04))), 6)
+            else:
+                same_base = a.split('[')[0] == b.split('[')[0]
+                value = round(min(0.99, max(0.0, (0.88 if same_base else 0.78) + offset[a] + offset[b]
+                                            + rng.gauss(0, 0.03))), 6)
+            matrix[a][b] = matrix[b][a] = value
+    return matrix
+
+def similarity_matrix(effective_models, seed):
+    rng = random.Random(f'{seed}-similarity')
+    matrix = {a: {a: 1} for a in effective_models}
+    for i, a in enumerate(effective_models):
+        for b in effective_models[i + 1:]:
+            same_base = a.split('[')[0] == b.split('[')[0]
+            value = rng.uniform(0.85, 0.95) if same_base else rng.uniform(0.65, 0.85)
+            matrix[a][b] = matrix[b][a] = round(value, 6)
+    return matrix
+
+def _header(n_prompts, n_configs, seed, models):
+    return {
+        'configId': 'synthetic__mittelhochdeutsch-evaluation',
+        'configTitle': f'Synthetischer Run {n_prompts}x{n_configs}',
+        'runLabel': f'synthetic-{n_prompts}x{n_configs}-s{seed}',
+        'timestamp': '2025-01-01T00-00-00-000Z',
+        'description': 'Synthetische Comparison-Datei für Benchmarks',
+    }, {
+        'id': 'synthetic',
+        'title': f'Synthetischer Run {n_prompts}x{n_configs}',
+        'models': sorted({m.split('[')[0] for m in models}),
+    }
+
+def generate_comparison(n_prompts, n_configs, seed=0, **options):
+    """Komplettes Comparison-dict im Speicher (für kleine Größen; gleicher Inhalt wie write_comparison)"""
+    opts = {**DEFAULT_OPTIONS, **options}
+    models = config_ids(n_configs)
+    effective_models = ['IDEAL_BENCHMARK'] + models
+    skill = config_skills(models, seed)
+    prompts = [generate_prompt(i, models, skill, seed, **opts) for i in range(n_prompts)]
+    header, config = _header(n_prompts, n_configs, seed, models)
+
+    evaluation = {}
+    if opts['similarities']:
+        evaluation['similarityMatrix'] = similarity_matrix(effective_models, seed)
+        evaluation['perPromptSimilarities'] = {p['definition']['id']: p['similarities'] for p in prompts}
+    evaluation['llmCoverageScores'] = {p['definition']['id']: p['coverage'] for p in prompts}
+    return {
+        **header,
+        'config': {**config, 'prompts': [p['definition'] for p in prompts], 'systems': SYSTEM_PROMPTS},
+        'evalMethodsUsed': ['embedding', 'llm-coverage'] if opts['similarities'] else ['llm-coverage'],
+        'effectiveModels': effective_models,
+        'modelSystemPrompts': {m: SYSTEM_PROMPTS[i % len(SYSTEM_PROMPTS)] for i, m in enumerate(models)},
+        'promptIds': [prompt_id(i) for i in range(n_prompts)],
+        'allFinalAssistantResponses': {p['definition']['id']: p['responses'] for p in prompts},
+        'fullConversationHistories': ({p['definition']['id']: p['histories'] for p in prompts}
+                                      if opts['histories'] else {}),
+        'evaluationResults': evaluation,
+        'errors': {p['definition']['id']: p['errors'] for p in prompts if p['errors']},
+    }
+
+@contextmanager
+def open_output(path):
+    """Text-Handle auf die Zieldatei; .gz/.bz2/.xz/.zip werden komprimiert geschrieben"""
+    openers = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.zip':
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            with zf.open(f'{path.stem}_comparison.json', 'w', force_zip64=True) as raw:
+                with io.TextIOWrapper(raw, encoding='utf-8') as f:
+                    yield f
+        return
+    with openers.get(path.suffix, open)(path, 'wt', encoding='utf-8') as f:
+        yield f
+
+def write_comparison(path, n_prompts, n_configs, seed=0, **options):
+    """Schreibt eine Comparison-Datei abschnittsweise, ohne sie im Speicher aufzubauen
+
+    Jeder Abschnitt (Prompts, Antworten, Verläufe, Scores, ...) erzeugt die Prompts
+    erneut aus ihrem Seed; der Inhalt ist identisch zu generate_comparison.
+    """
+    path = Path(path)
+    opts = {**DEFAULT_OPTIONS, **options}
+    models = config_ids(n_configs)
+    effective_models = ['IDEAL_BENCHMARK'] + models
+    skill = config_skills(models, seed)
+    header, config = _header(n_prompts, n_configs, seed, models)
+    dumps = lambda value: json.dumps(value, ensure_ascii=False)
+
+    def prompts():
+        for i in range(n_prompts):
+            yield generate_prompt(i, models, skill, seed, **opts)
+
+    def write_mapping(f, key, part, skip_empty=False):
+        f.write(f'{dumps(key)}: {{')
+        first = True
+        for prompt in prompts():
+            value = prompt[part]
+            if skip_empty and not value:
+                continue
+            f.write(('' if first else ', ') + f"{dumps(prompt['definition']['id'])}: {dumps(value)}")
+            first = False
+        f.write('}')
+
+    with open_output(path) as f:
+        f.write(dumps(header)[:-1])
+        f.write(', "config": ' + dumps(config)[:-1] + ', "prompts": [')
+        for i, prompt in enumerate(prompts()):
+            f.write((', ' if i else '') + dumps(prompt['definition']))
+        f.write('], "systems": ' + dumps(SYSTEM_PROMPTS) + '}')
+        f.write(', "evalMethodsUsed": '
+                + dumps(['embedding', 'llm-coverage'] if opts['similarities'] else ['llm-coverage']))
+        f.write(', "effectiveModels": ' + dumps(effective_models))
+        f.write(', "modelSystemPrompts": '
+                + dumps({m: SYSTEM_PROMPTS[i % len(SYSTEM_PROMPTS)] for i, m in enumerate(models)}))
+        f.write(', "promptIds": ' + dumps([prompt_id(i) for i in range(n_prompts)]))
+        f.write(', ')
+        write_mapping(f, 'allFinalAssistantResponses', 'responses')
+        f.write(', ')
+        if opts['histories']:
+            write_mapping(f, 'fullConversationHistories', 'histories')
+        else:
+            f.write('"fullConversationHistories": {}')
+        f.write(', "evaluationResults": {')
+        if opts['similarities']:
+            f.write('"similarityMatrix": ' + dumps(similarity_matrix(effective_models, seed)) + ', ')
+            write_mapping(f, 'perPromptSimilarities', 'similarities')
+            f.write(', ')
+        write_mapping(f, 'llmCoverageScores', 'coverage')
+        f.write('}, ')
+        write_mapping(f, 'errors', 'errors', skip_empty=True)
+        f.write('}')
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetische Comparison-JSON erzeugen')
+    parser.add_argument('size', type=parse_size, help='<Prompts>x<Konfigurationen>, z.B. 500x50')
+    parser.add_argument('-o', '--output', type=Path, required=True,
+                        help='Zieldatei (.json, .json.gz, .json.bz2, .json.xz oder .zip)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--response-chars', type=int, default=DEFAULT_OPTIONS['response_chars'],
+                        help='Ungefähre Länge einer Modell-Antwort in Zeichen')
+    parser.add_argument('--judges', type=int, default=DEFAULT_OPTIONS['judges'],
+                        help='individualJudgements pro Kriterium')
+    parser.add_argument('--error-rate', type=float, default=DEFAULT_OPTIONS['error_rate'],
+                        help='Anteil fehlgeschlagener Zellen')
+    parser.add_argument('--no-similarities', action='store_true',
+                        help='similarityMatrix und perPromptSimilarities weglassen')
+    parser.add_argument('--no-histories', action='store_true', help='fullConversationHistories weglassen')
+    args = parser.parse_args()
+
+    n_prompts, n_configs = args.size
+    path = write_comparison(args.output, n_prompts, n_configs, seed=args.seed,
+                            response_chars=args.response_chars, judges=args.judges,
+                            error_rate=args.error_rate, similarities=not args.no_similarities,
+                            histories=not args.no_histories)
+    print(f"{n_prompts} Prompts x {n_configs} Konfigurationen -> {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
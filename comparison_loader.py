@@ -0,0 +1,489 @@
+"""Laden und Extrahieren von Comparison-JSONs (Weval-Runs)
+
+Geteilt von der Visualisierung, dem Datenbank-Export (results_db.py), dem
+Server (serve_results.py) und compile_blueprint.py: selektives Streaming großer
+und komprimierter JSONs, Auswahl von Archiv-Membern, Prompt-Index, Extraktion
+von Prompts und Zellen sowie die Namen der Konfigurationen.
+"""
+
+import bz2
+import glob
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import pickle
+import re
+import zipfile
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from pathlib import Path
+
+import numpy as np
+
+from judge_cache import IDEAL_MODEL_ID
+
+def nan_mean(values, axis):
+    """Mittelwert ohne NaN (NaN, wo es keine Werte gibt), ohne RuntimeWarnings"""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=axis)
+    total = np.where(valid, values, 0.0).sum(axis=axis)
+    return np.divide(total, count, out=np.full(count.shape, np.nan), where=count > 0)
+
+def similarity_array(matrix, ids):
+    """Dichte Ähnlichkeitsmatrix (NaN = fehlt) in der Reihenfolge von ids
+
+    Fehlt ein Paar nur in einer Richtung, wird die Gegenrichtung übernommen.
+    """
+    rows = [matrix.get(a) or {} for a in ids]
+    values = np.array([[row.get(b) for b in ids] for row in rows], dtype=float).reshape(len(ids), len(ids))
+    return np.where(np.isnan(values), values.T, values)
+
+def reduce_prompt_similarities(matrix):
+    """Verdichtet die Ähnlichkeitsmatrix eines Prompts auf zwei Werte pro Konfiguration
+
+    Liefert (Konfigurationen, Ähnlichkeit zu IDEAL_BENCHMARK, mittlere Ähnlichkeit
+    zu den anderen Antworten des Prompts). Beim Laden wird so jede Matrix sofort
+    reduziert, statt Prompts × Konfigurationen² Werte im Speicher zu halten.
+    """
+    if isinstance(matrix, tuple):
+        return matrix
+    configs = [m for m in matrix if m != IDEAL_MODEL_ID]
+    dense = similarity_array(matrix, [IDEAL_MODEL_ID] + configs)
+    peers = dense[1:, 1:].copy()
+    np.fill_diagonal(peers, np.nan)
+    return configs, dense[0, 1:], nan_mean(peers, axis=1)
+
+# Felder der Comparison-JSON, die extract_data tatsächlich liest.
+# True = Wert materialisieren, dict = in das Objekt absteigen ('*' = jeder Schlüssel),
+# Funktion = Wert materialisieren und sofort damit verdichten.
+# Alles andere (fullConversationHistories, promptContexts, ...) wird übersprungen.
+EXTRACT_FIELDS = {
+    'config': {'prompts': True},
+    'effectiveModels': True,
+    'allFinalAssistantResponses': {'*': True},
+    'evaluationResults': {
+        'llmCoverageScores': {'*': True},
+        'similarityMatrix': True,
+        'perPromptSimilarities': {'*': reduce_prompt_similarities},
+    },
+}
+
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Komprimierte Eingaben werden als Stream dekomprimiert, nie auf die Platte entpackt
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# Standard-Auswahl des Members in .zip-Archiven, in dieser Reihenfolge
+DEFAULT_MEMBER_PATTERNS = ('*_comparison.json', '*.json')
+
+_NON_WS_RE = re.compile(r'\S')
+_SCALAR_END_RE = re.compile(r'[,\]}\s]')
+_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[\[{]|[\]}]', re.S)
+# Zeichen, mit denen eine Zahl weitergehen kann (12 -> 12.5, 1 -> 1e-3)
+_NUMBER_TAIL_RE = re.compile(r'[0-9.eE+-]*')
+_JSON_DECODER = json.JSONDecoder()
+
+class SelectiveJsonReader:
+    """Liest ein JSON-Objekt blockweise und materialisiert nur ausgewählte Pfade"""
+
+    def __init__(self, stream, chunk_size=STREAM_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._pin = None
+
+    def _fill(self, size=None):
+        chunk = self._stream.read(size or self._chunk_size)
+        if not chunk:
+            return False
+        # Bereits verarbeiteten Text verwerfen, außer er gehört zu einem Wert,
+        # der gerade materialisiert wird
+        keep = self._pos if self._pin is None else self._pin
+        if keep:
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._pin is not None:
+                self._pin -= keep
+        self._buf += chunk
+        return True
+
+    def _fill_or_fail(self):
+        if not self._fill():
+            raise ValueError('Unerwartetes Dateiende im JSON-Stream')
+
+    def _peek(self):
+        while True:
+            m = _NON_WS_RE.search(self._buf, self._pos)
+            if m:
+                self._pos = m.start()
+                return self._buf[self._pos]
+            self._pos = len(self._buf)
+            self._fill_or_fail()
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"JSON-Stream: '{char}' erwartet, '{found}' gefunden")
+        self._pos += 1
+
+    def _skip_value(self):
+        """Überspringt einen JSON-Wert, ohne Python-Objekte dafür anzulegen"""
+        if self._peek() not in '{["':
+            # Skalar (Zahl, true, false, null) bis zum nächsten Trennzeichen
+            while True:
+                m = _SCALAR_END_RE.search(self._buf, self._pos)
+                if m:
+                    self._pos = m.start()
+                    return
+                self._pos = len(self._buf)
+                self._fill_or_fail()
+
+        depth = 0
+        while True:
+            m = _TOKEN_RE.search(self._buf, self._pos)
+            if m is None:
+                self._pos = len(self._buf)
+                self._fill_or_fail()
+                continue
+            token = m.group()
+            if token[0] == '"':
+                if m.group(1) is None:
+                    # String endet erst im nächsten Block
+                    self._pos = m.start()
+                    self._fill_or_fail()
+                    continue
+                self._pos = m.end()
+                if depth == 0:
+                    return
+            elif token in '[{':
+                depth += 1
+                self._pos = m.end()
+            else:
+                depth -= 1
+                self._pos = m.end()
+                if depth == 0:
+                    return
+
+    def _read_value(self):
+        self._peek()
+        self._pin = self._pos
+        try:
+            while True:
+                try:
+                    value, end = _JSON_DECODER.raw_decode(self._buf, self._pin)
+                except json.JSONDecodeError as exc:
+                    value, end, error = None, None, exc
+                # Ein Wert, der genau am Pufferende aufhört, kann abgeschnitten sein;
+                # eine Zahl auch dann, wenn bis zum Pufferende noch Zahlzeichen folgen
+                # ('12.' liefert 12 mit end=2)
+                if end is not None and end < len(self._buf) and not (
+                        isinstance(value, (int, float)) and not isinstance(value, bool)
+                        and _NUMBER_TAIL_RE.match(self._buf, end).end() == len(self._buf)):
+                    self._pos = end
+                    return value
+                # Puffer verdoppeln, damit große Werte nicht quadratisch neu geparst werden
+                if not self._fill(max(self._chunk_size, len(self._buf) - self._pin)):
+                    if end is None:
+                        raise error
+                    self._pos = end
+                    return value
+        finally:
+            self._pin = None
+
+    def _read_object(self, fields):
+        result = {}
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return result
+        while True:
+            key = self._read_value()
+            self._expect(':')
+            sub_fields = fields.get(key, fields.get('*'))
+            if sub_fields is True:
+                result[key] = self._read_value()
+            elif callable(sub_fields):
+                result[key] = sub_fields(self._read_value())
+            elif sub_fields:
+                if self._peek() == '{':
+                    result[key] = self._read_object(sub_fields)
+                else:
+                    result[key] = self._read_value()
+            else:
+                self._skip_value()
+
+            separator = self._peek()
+            self._pos += 1
+            if separator == '}':
+                return result
+            if separator != ',':
+                raise ValueError(f"JSON-Stream: ',' oder '}}' erwartet, '{separator}' gefunden")
+
+    def read(self, fields):
+        return self._read_object(fields)
+
+def stream_comparison(stream, fields=EXTRACT_FIELDS):
+    """Liest nur die angegebenen Felder aus einem Comparison-JSON-Textstream"""
+    return SelectiveJsonReader(stream).read(fields)
+
+def select_archive_member(names, member=None):
+    """Wählt den JSON-Member eines Archivs über exakten Namen oder Glob-Muster"""
+    names = [n for n in names if not n.endswith('/')]
+    if member is not None and member in names:
+        return member
+    patterns = (member,) if member is not None else DEFAULT_MEMBER_PATTERNS
+    for pattern in patterns:
+        matches = [n for n in names if fnmatch(n, pattern)]
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise ValueError(f"Mehrere Archiv-Einträge passen auf '{pattern}': {', '.join(matches)}")
+    raise ValueError(f"Kein Archiv-Eintrag passt auf {' / '.join(patterns)} (vorhanden: {', '.join(names)})")
+
+@contextmanager
+def open_comparison(json_path, member=None):
+    """Öffnet eine Comparison-JSON (auch .zip/.gz/.bz2/.xz) als Textstream"""
+    json_path = Path(json_path)
+    suffix = json_path.suffix.lower()
+    if suffix == '.zip':
+        with zipfile.ZipFile(json_path) as archive:
+            name = select_archive_member(archive.namelist(), member)
+            with archive.open(name) as raw:
+                yield io.TextIOWrapper(raw, encoding='utf-8')
+    elif suffix in COMPRESSED_OPENERS:
+        with COMPRESSED_OPENERS[suffix](json_path, 'rt', encoding='utf-8') as f:
+            yield f
+    else:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            yield f
+
+def comparison_stem(json_path):
+    """Dateiname ohne Kompressions- und .json-Endung (für Ausgabedateien)"""
+    json_path = Path(json_path)
+    if json_path.suffix.lower() in ('.zip', *COMPRESSED_OPENERS):
+        json_path = Path(json_path.stem)
+    return json_path.stem
+
+def load_comparison(json_path, fields=EXTRACT_FIELDS, member=None):
+    """Lädt eine Comparison-JSON-Datei selektiv (fields=None lädt alles)"""
+    with open_comparison(json_path, member) as f:
+        if fields is None:
+            return json.load(f)
+        return stream_comparison(f, fields)
+
+# Kategorie eines Prompts nach dem Anfang seiner ID, erster Treffer gilt.
+# Ein kompilierter Prompt-Index (compile_blueprint.py) kann sie pro Prompt überschreiben.
+CATEGORY_PREFIXES = (
+    ('mhd-trans', 'Übersetzungen'),
+    ('mhd-insult', 'Schimpfwörter'),
+    ('mhd-false-trans', 'Falsche Übersetzungen'),
+    ('mhd-context-fake', 'Erfundener Kontext'),
+    ('mhd-history-fake', 'Erfundene Geschichte'),
+    ('mhd-curse', 'Flüche'),
+    ('mhd-diceware', 'Diceware-Tests'),
+)
+
+def get_category(prompt_id):
+    for prefix, category in CATEGORY_PREFIXES:
+        if prompt_id.startswith(prefix):
+            return category
+    return 'Andere'
+
+# Kennung und Version des von compile_blueprint.py geschriebenen Prompt-Index
+PROMPT_INDEX_FORMAT = 'mhd-blueprint-index'
+PROMPT_INDEX_VERSION = 2
+
+def load_prompt_index(index_path):
+    """Lädt einen mit compile_blueprint.py kompilierten Prompt-Index
+
+    Liefert das Index-Dict (u.a. 'prompts': Prompt-ID -> Eintrag und 'digest').
+    Ist der Blueprint neuer als der Index, wird nur gewarnt – das Nachkompilieren
+    (und damit YAML-Parsen) bleibt compile_blueprint.py vorbehalten.
+    """
+    with open(index_path, 'rb') as f:
+        index = pickle.load(f)
+    if not isinstance(index, dict) or index.get('format') != PROMPT_INDEX_FORMAT:
+        raise ValueError(f'{index_path} ist kein Prompt-Index')
+    if index.get('version') != PROMPT_INDEX_VERSION:
+        raise ValueError(f'{index_path} hat Version {index.get("version")}, erwartet {PROMPT_INDEX_VERSION} '
+                         '(mit compile_blueprint.py neu kompilieren)')
+    try:
+        stat = Path(index['source']).stat()
+        if (stat.st_size, stat.st_mtime_ns) != (index['source_size'], index['source_mtime_ns']):
+            print(f"Warnung: {index['source']} wurde nach dem Kompilieren geändert, "
+                  "compile_blueprint.py erneut ausführen")
+    except OSError:
+        pass
+    return index
+
+def simplify_model_name(model_id):
+    name = model_id.split('[')[0].strip()
+    if ':' in name:
+        parts = name.split(':')
+        return parts[-1]
+    return name
+
+def extract_prompt(prompt_def, prompt_index=None):
+    """Extrahiert Prompt-Text, ideale Antwort und Kriterien einer Prompt-Definition
+
+    Mit prompt_index (load_prompt_index) kommt die Kategorie aus dem Blueprint,
+    fehlende Texte (Beschreibung, Prompt, ideale Antwort) werden von dort ergänzt.
+    Die Kriterien bleiben die des Runs: nur sie wurden tatsächlich bewertet.
+    """
+    prompt_id = prompt_def.get('id')
+    prompt_text = ''
+    messages = prompt_def.get('messages', [])
+    for msg in messages:
+        if msg.get('role') == 'user':
+            prompt_text = msg.get('content', '')
+            break
+    
+    should_criteria = []
+    should_not_criteria = []
+    
+    for point in prompt_def.get('points', []):
+        if isinstance(point, dict):
+            should_criteria.append(point.get('text', ''))
+    
+    for point in prompt_def.get('should_not', []):
+        if isinstance(point, dict):
+            should_not_criteria.append(point.get('text', ''))
+    
+    prompt = {
+        'description': prompt_def.get('description', ''),
+        'prompt': prompt_text,
+        'ideal': prompt_def.get('idealResponse', ''),
+        'should': should_criteria,
+        'should_not': should_not_criteria,
+        'category': get_category(prompt_id)
+    }
+    entry = prompt_index['prompts'].get(prompt_id) if prompt_index else None
+    if entry:
+        for field in ('description', 'prompt', 'ideal'):
+            if not prompt[field]:
+                prompt[field] = entry[field]
+        prompt['category'] = entry['category']
+    return prompt
+
+def extract_cell(response_text, model_score_data):
+    """Extrahiert Score, Antwort und Kriterien-Ergebnisse einer (Prompt, Modell)-Zelle"""
+    
+    # Extrahiere Score
+    score = None
+    if isinstance(model_score_data, dict):
+        avg_coverage = model_score_data.get('avgCoverageExtent')
+        if avg_coverage is not None:
+            score = avg_coverage * 100
+    
+    # Extrahiere Kriterien-Ergebnisse
+    passed_criteria = []
+    failed_criteria = []
+    
+    point_assessments = model_score_data.get('pointAssessments', [])
+    for assessment in point_assessments:
+        criterion_text = assessment.get('keyPointText', '')
+        if assessment.get('coverageExtent', 0) is None:
+            # Kein Judge hat ein gültiges Ergebnis geliefert
+            continue
+        coverage = assessment.get('coverageExtent', 0) * 100
+        
+        # coverageExtent ist bei should_not-Kriterien (isInverted) schon invertiert:
+        # 1 = unerwünschter Inhalt fehlt, also gilt für beide Arten dieselbe Schwelle
+        if coverage >= 50:
+            passed_criteria.append({'text': criterion_text, 'score': coverage})
+        else:
+            failed_criteria.append({'text': criterion_text, 'score': coverage})
+    
+    # Handle errors
+    is_error = isinstance(response_text, str) and '<<error>>' in response_text
+    
+    return {
+        'score': score,
+        'output': response_text if isinstance(response_text, str) else '',
+        'passed': passed_criteria,
+        'failed': failed_criteria,
+        'is_error': is_error
+    }
+
+def extract_data(data, prompt_index=None):
+    """Extrahiert alle Daten für die Visualisierung"""
+    
+    # Extrahiere Prompt-Definitionen
+    config = data.get('config', {})
+    prompt_defs = config.get('prompts', [])
+    
+    prompts_data = {}
+    for prompt_def in prompt_defs:
+        prompts_data[prompt_def.get('id')] = extract_prompt(prompt_def, prompt_index)
+    
+    # Extrahiere Modelle
+    effective_models = [m for m in data.get('effectiveModels', []) if m != IDEAL_MODEL_ID]
+    
+    # Extrahiere Antworten
+    all_responses = data.get('allFinalAssistantResponses', {})
+    
+    # Extrahiere Scores aus evaluationResults.llmCoverageScores
+    eval_results = data.get('evaluationResults', {})
+    llm_scores = eval_results.get('llmCoverageScores', {})
+    
+    # Baue Ergebnis-Matrix auf
+    results = {}
+    for prompt_id in prompts_data.keys():
+        results[prompt_id] = {}
+        prompt_responses = all_responses.get(prompt_id, {})
+        prompt_scores = llm_scores.get(prompt_id, {})
+        
+        for model_id in effective_models:
+            results[prompt_id][model_id] = extract_cell(
+                prompt_responses.get(model_id, ''), prompt_scores.get(model_id, {}))
+    
+    return results, effective_models, list(prompts_data.keys()), prompts_data
+
+def get_system_prompt_info(model_id):
+    """Extrahiert System-Prompt-Info aus der Model-ID"""
+    if 'sp_idx:0' in model_id:
+        return 'Kein System-Prompt'
+    elif 'sp_idx:1' in model_id:
+        return 'System: MHD-Experte (präzise)'
+    elif 'sp_idx:2' in model_id:
+        return 'System: MHD-Experte (keine derben Wörter)'
+    return 'Standard'
+
+def get_base_model_name(model_id):
+    """Extrahiert den Basis-Modellnamen ohne Konfiguration"""
+    return model_id.split('[')[0].strip()
+
+def optional(value):
+    """float oder None für NaN (für JSON und SQLite)"""
+    return None if np.isnan(value) else float(value)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def expand_inputs(patterns):
+    """Löst Dateien, Verzeichnisse und Glob-Muster zu einer Liste von Run-Dateien auf"""
+    suffixes = ('.json', '.zip', *COMPRESSED_OPENERS)
+    paths = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            paths.extend(sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in suffixes))
+        elif path.exists():
+            paths.append(path)
+        else:
+            matches = sorted(Path(p) for p in glob.glob(str(pattern)))
+            if not matches:
+                raise FileNotFoundError(f"File not found at {pattern}")
+            paths.extend(matches)
+    return list(dict.fromkeys(paths))
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Kompiliert einen Weval-Blueprint (YAML, mehrere Dokumente) in einen Prompt-Index
+
+Der Index ist eine Pickle-Datei mit Prompt-ID -> Kategorie, Tags, Beschreibung,
+Prompt, idealer Antwort und Kriterien sowie dem Header des Blueprints (Modelle,
+System-Prompts). create_complete_visualization.py liest ihn per --prompt-index und
+muss so selbst kein YAML parsen; run_evaluation.py führt die Prompts daraus aus:
+
+    python compile_blueprint.py mittelhochdeutsch-evaluation.yml
+    python create_complete_visualization.py run.json --prompt-index mittelhochdeutsch-evaluation.index
+
+Erneutes Kompilieren parst nur die Dokumente neu, deren Text sich geändert hat;
+alle anderen werden aus dem vorhandenen Index übernommen.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import sys
+import time
+from pathlib import Path
+
+from comparison_loader import PROMPT_INDEX_FORMAT, PROMPT_INDEX_VERSION, get_category
+
+# Zeile, die ein neues YAML-Dokument beginnt ('---' in Spalte 0, dann Leerraum oder Zeilenende).
+# Laut YAML-Spezifikation darf diese Folge in keinem Skalar in Spalte 0 stehen.
+_DOCUMENT_START_RE = re.compile(r'^---(?=[ \t\r\n]|$)', re.M)
+
+def split_documents(text):
+    """Teilt einen YAML-Stream textuell in Dokumente, ohne ihn zu parsen
+
+    Jedes Stück beginnt mit seiner '---'-Zeile (bis auf Text vor dem ersten
+    Trenner), sodass sich die Stücke einzeln mit yaml.safe_load lesen lassen.
+    """
+    starts = [m.start() for m in _DOCUMENT_START_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [text[start:end] for start, end in zip(starts, starts[1:] + [len(text)])]
+
+def document_digest(chunk):
+    return hashlib.blake2b(chunk.encode('utf-8'), digest_size=16).hexdigest()
+
+def point_texts(points):
+    """Kriterien (should/should_not) als Liste von Texten
+
+    Neben reinen Strings erlaubt Weval Objekte ({text: ..., weight: ...}),
+    Funktionspunkte ({$contains: ...}) und Alternativpfade (verschachtelte Listen).
+    """
+    texts = []
+    for point in points or []:
+        if isinstance(point, list):
+            texts.extend(point_texts(point))
+        elif isinstance(point, dict):
+            text = point.get('text') or point.get('point')
+            if text is None:
+                text = ', '.join(f'{key}: {value}' for key, value in point.items())
+            texts.append(str(text))
+        elif point is not None:
+            texts.append(str(point))
+    return texts
+
+def prompt_text(doc):
+    if 'prompt' in doc:
+        return str(doc['prompt'] or '')
+    for message in doc.get('messages') or []:
+        if not isinstance(message, dict):
+            continue
+        if message.get('role') == 'user':
+            return str(message.get('content') or '')
+        if 'user' in message:
+            return str(message['user'] or '')
+    return ''
+
+def compile_prompt(doc):
+    """Index-Eintrag einer Prompt-Definition aus dem Blueprint"""
+    prompt_id = str(doc['id'])
+    tags = doc.get('tags') or []
+    return {
+        'id': prompt_id,
+        'category': str(doc.get('category') or get_category(prompt_id)),
+        'tags': [str(tag) for tag in (tags if isinstance(tags, list) else [tags])],
+        'description': str(doc.get('description') or ''),
+        'prompt': prompt_text(doc),
+        'ideal': str(doc.get('ideal') or ''),
+        'should': point_texts(doc.get('should') or doc.get('points')),
+        'should_not': point_texts(doc.get('should_not')),
+    }
+
+def compile_document(chunk, number):
+    """Parst ein Dokument; liefert (Header oder None, Liste der Prompt-Einträge)"""
+    import yaml
+
+    doc = yaml.safe_load(chunk)
+    if doc is None:
+        return None, []
+    if isinstance(doc, list):
+        prompt_docs, header = doc, None
+    elif isinstance(doc, dict) and ('prompt' in doc or 'messages' in doc):
+        prompt_docs, header = [doc], None
+    elif isinstance(doc, dict):
+        # Header-Dokument, optional mit eingebetteter prompts-Liste (Ein-Dokument-Form)
+        prompt_docs = doc.get('prompts') or []
+        header = {key: value for key, value in doc.items() if key != 'prompts'}
+    else:
+        raise ValueError(f'Dokument {number}: weder Header noch Prompt ({type(doc).__name__})')
+
+    entries = []
+    for prompt_doc in prompt_docs:
+        if not isinstance(prompt_doc, dict) or not prompt_doc.get('id'):
+            raise ValueError(f'Dokument {number}: Prompt ohne id')
+        entries.append(compile_prompt(prompt_doc))
+    return header, entries
+
+def load_index(index_path):
+    """Vorhandener Index oder None (fehlend, beschädigt oder anderes Format)"""
+    try:
+        with open(index_path, 'rb') as f:
+            index = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get('format') != PROMPT_INDEX_FORMAT \
+            or index.get('version') != PROMPT_INDEX_VERSION:
+        return None
+    return index
+
+def compile_blueprint(yaml_path, index_path, force=False):
+    """Kompiliert yaml_path nach index_path und liefert (Index, Statistik)
+
+    Dokumente, deren Text (per BLAKE2-Hash) schon im vorhandenen Index steht,
+    werden übernommen statt neu geparst. Ist die Quelldatei seit dem letzten
+    Lauf unverändert (Größe und mtime), bleibt der Index unangetastet.
+    """
+    yaml_path = Path(yaml_path)
+    stat = yaml_path.stat()
+    previous = None if force else load_index(index_path)
+    stats = {'documents': 0, 'parsed': 0, 'reused': 0, 'up_to_date': False}
+    if previous and previous['source'] == str(yaml_path.resolve()) \
+            and previous['source_size'] == stat.st_size and previous['source_mtime_ns'] == stat.st_mtime_ns:
+        stats.update(documents=len(previous['documents']), reused=len(previous['documents']), up_to_date=True)
+        return previous, stats
+
+    known = previous['document_entries'] if previous else {}
+    text = yaml_path.read_text(encoding='utf-8')
+    header = {}
+    documents = []
+    document_entries = {}
+    prompts = {}
+    for number, chunk in enumerate(split_documents(text), 1):
+        digest = document_digest(chunk)
+        if digest in known:
+            doc_header, entries = known[digest]
+            stats['reused'] += 1
+        else:
+            doc_header, entries = compile_document(chunk, number)
+            stats['parsed'] += 1
+        if doc_header is None and not entries:
+            continue
+        documents.append(digest)
+        document_entries[digest] = (doc_header, entries)
+        if doc_header is not None:
+            if header:
+                raise ValueError(f'Dokument {number}: zweiter Header im Blueprint')
+            header = doc_header
+        for entry in entries:
+            if entry['id'] in prompts:
+                raise ValueError(f"Dokument {number}: Prompt-ID {entry['id']} ist doppelt")
+            prompts[entry['id']] = entry
+    stats['documents'] = len(documents)
+
+    index = {
+        'format': PROMPT_INDEX_FORMAT,
+        'version': PROMPT_INDEX_VERSION,
+        'source': str(yaml_path.resolve()),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'blueprint': header,
+        'documents': documents,
+        'document_entries': document_entries,
+        'prompts': prompts,
+        'digest': hashlib.blake2b(pickle.dumps(prompts, protocol=4), digest_size=16).hexdigest(),
+    }
+    index_path = Path(index_path)
+    tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return index, stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Kompiliert einen Weval-Blueprint (YAML) in einen Prompt-Index')
+    parser.add_argument('blueprint', type=Path, help='Blueprint-YAML, z.B. mittelhochdeutsch-evaluation.yml')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Ziel des Index (Standard: neben dem Blueprint, Endung .index)')
+    parser.add_argument('--force', action='store_true',
+                        help='Alle Dokumente neu parsen, vorhandenen Index ignorieren')
+    args = parser.parse_args()
+
+    try:
+        import yaml  # noqa: F401
+    except ImportError:
+        print("Error: PyYAML wird benötigt (pip install pyyaml)")
+        sys.exit(1)
+
+    index_path = args.output or args.blueprint.with_suffix('.index')
+    start = time.perf_counter()
+    try:
+        index, stats = compile_blueprint(args.blueprint, index_path, force=args.force)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {args.blueprint} konnte nicht kompiliert werden: {exc}")
+        sys.exit(1)
+    except yaml.YAMLError as exc:
+        print(f"Error: {args.blueprint} ist kein gültiges YAML: {exc}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if stats['up_to_date']:
+        print(f"{index_path} ist aktuell ({len(index['prompts'])} Prompts)")
+        return
+    categories = {}
+    for entry in index['prompts'].values():
+        categories[entry['category']] = categories.get(entry['category'], 0) + 1
+    print(f"{stats['documents']} Dokumente: {stats['parsed']} geparst, {stats['reused']} übernommen "
+          f"({elapsed * 1000:.0f} ms)")
+    print(f"{len(index['prompts'])} Prompts -> {index_path} ({index_path.stat().st_size / 1024:.1f} KB)")
+    for category, count in categories.items():
+        print(f"  {category}: {count}")
+
+if __name__ == "__main__":
+    main()
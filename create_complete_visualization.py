@@ -1,29 +1,38 @@
+import argparse
+import base64
+import gzip
+import hashlib
+import io
+import itertools
 import json
+import os
+import pickle
+import sqlite3
 import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
 from pathlib import Path
 from collections import defaultdict
 
-def get_category(prompt_id):
-    if prompt_id.startswith('mhd-trans'):
-        return 'Übersetzungen'
-    if prompt_id.startswith('mhd-insult'):
-        return 'Schimpfwörter'
-    if prompt_id.startswith('mhd-false-trans'):
-        return 'Falsche Übersetzungen'
-    if prompt_id.startswith('mhd-context-fake'):
-        return 'Erfundener Kontext'
-    if prompt_id.startswith('mhd-history-fake'):
-        return 'Erfundene Geschichte'
-    if prompt_id.startswith('mhd-curse'):
-        return 'Flüche'
-    return 'Andere'
-
-def simplify_model_name(model_id):
-    name = model_id.split('[')[0].strip()
-    if ':' in name:
-        parts = name.split(':')
-        return parts[-1]
-    return name
+import numpy as np
+
+from comparison_loader import (EXTRACT_FIELDS, comparison_stem, expand_inputs, extract_cell, extract_data,
+                               extract_prompt, get_system_prompt_info, load_comparison, load_prompt_index,
+                               simplify_model_name)
+from dedup import DUPLICATE_GROUPS_SHOWN, duplicate_statistics
+from judge_cache import DEFAULT_CACHE_DIR, IDEAL_MODEL_ID, JUDGE_CACHE_NAME, JudgeCache, fill_coverage_from_judge_cache
+from live_run import JSONL_RENDER_INTERVAL, JSONL_SUFFIX, follow_jsonl
+from profiling import PhaseProfiler, mark_phase, write_profile
+from report_cache import CACHE_MAX_BYTES, CACHE_SCHEMA_VERSION, ResultCache, cached, index_kind
+# calculate_statistics, ScoreCube & Co. auch als Attribute dieses Moduls (benchmarks/)
+from report_statistics import (SIGNIFICANCE_MATRIX_MAX_CONFIGS, SIMILARITY_OUTLIER_Z, CriterionCube, ScoreCube,
+                               SimilarityCube, calculate_statistics, config_statistics, criterion_statistics,
+                               rank_statistics, significance_statistics, similarity_statistics, statistics_from_cube)
+from results_db import ResultsDatabase
+from text_search import SEARCH_SCRIPT, search_index
 
 def get_color_class(score):
     if score is None:
@@ -38,242 +47,152 @@ def get_color_class(score):
         return 'poor'
     return 'bad'
 
-def extract_data(data):
-    """Extrahiert alle Daten für die Visualisierung"""
-    
-    # Extrahiere Prompt-Definitionen
-    config = data.get('config', {})
-    prompt_defs = config.get('prompts', [])
-    
-    prompts_data = {}
-    for prompt_def in prompt_defs:
-        prompt_id = prompt_def.get('id')
-        prompt_text = ''
-        messages = prompt_def.get('messages', [])
-        for msg in messages:
-            if msg.get('role') == 'user':
-                prompt_text = msg.get('content', '')
-                break
-        
-        should_criteria = []
-        should_not_criteria = []
-        
-        for point in prompt_def.get('points', []):
-            if isinstance(point, dict):
-                should_criteria.append(point.get('text', ''))
-        
-        for point in prompt_def.get('should_not', []):
-            if isinstance(point, dict):
-                should_not_criteria.append(point.get('text', ''))
-        
-        prompts_data[prompt_id] = {
-            'description': prompt_def.get('description', ''),
-            'prompt': prompt_text,
-            'ideal': prompt_def.get('idealResponse', ''),
-            'should': should_criteria,
-            'should_not': should_not_criteria,
-            'category': get_category(prompt_id)
+# Zusätzliche Felder für die Run-Historie im Aggregations-Modus
+AGGREGATE_FIELDS = {
+    **EXTRACT_FIELDS,
+    'evaluationResults': {'llmCoverageScores': {'*': True}},
+    'runLabel': True,
+    'timestamp': True,
+    'promptIds': True,
+}
+
+class RunAggregator:
+    """Führt mehrere Runs zu einer gemeinsamen Rangliste zusammen
+
+    Runs werden einzeln hinzugefügt. Pro Zelle (Prompt, Konfiguration) bleiben
+    nur Score-Summe, Anzahl und Fehler über alle Runs erhalten, der Speicher
+    wächst also mit der Vereinigung der Prompts/Konfigurationen, nicht mit der
+    Anzahl der Runs.
+    """
+
+    def __init__(self):
+        self.prompts = []
+        self.prompt_categories = []
+        self.models = []
+        self.runs = []
+        self._prompt_index = {}
+        self._model_index = {}
+        self._sums = np.zeros((0, 0))
+        self._counts = np.zeros((0, 0), dtype=np.int64)
+        self._errors = np.zeros((0, 0), dtype=np.int64)
+
+    @staticmethod
+    def _indices(keys, lookup, order):
+        indices = []
+        for key in keys:
+            if key not in lookup:
+                lookup[key] = len(order)
+                order.append(key)
+            indices.append(lookup[key])
+        return np.array(indices, dtype=np.intp)
+
+    def _grow(self):
+        shape = (len(self.prompts), len(self.models))
+        if self._sums.shape == shape:
+            return
+        pad = ((0, shape[0] - self._sums.shape[0]), (0, shape[1] - self._sums.shape[1]))
+        self._sums = np.pad(self._sums, pad)
+        self._counts = np.pad(self._counts, pad)
+        self._errors = np.pad(self._errors, pad)
+
+    @staticmethod
+    def summarize_run(data, source, prompt_index=None):
+        """Reduziert einen Run auf Score-Matrix und Historien-Eintrag (cachebar)"""
+        results, models, prompts, prompts_data = extract_data(data, prompt_index)
+        prompt_ids = data.get('promptIds')
+        if prompt_ids:
+            run_prompts = set(prompt_ids)
+            prompts = [p for p in prompts if p in run_prompts]
+        cube = ScoreCube.from_results(results, models, prompts, prompts_data)
+        
+        model_stats, consolidated_ranking, _, _ = statistics_from_cube(cube)
+        return {
+            'prompts': prompts,
+            'prompt_categories': [prompts_data[p]['category'] for p in prompts],
+            'models': models,
+            'scores': cube.scores,
+            'errors': cube.errors,
+            'run': {
+                'source': str(source),
+                'label': data.get('runLabel') or comparison_stem(source),
+                'timestamp': data.get('timestamp') or '',
+                'prompts': len(prompts),
+                'configs': len(models),
+                'config_avg': {m: s['avg'] for m, s in model_stats.items() if s['count']},
+                'base_best': {s['base_name']: (m, s['avg']) for m, s in consolidated_ranking if s['count']},
+            },
         }
-    
-    # Extrahiere Modelle
-    effective_models = [m for m in data.get('effectiveModels', []) if m != 'IDEAL_BENCHMARK']
-    
-    # Extrahiere Antworten
-    all_responses = data.get('allFinalAssistantResponses', {})
-    
-    # Extrahiere Scores aus evaluationResults.llmCoverageScores
-    eval_results = data.get('evaluationResults', {})
-    llm_scores = eval_results.get('llmCoverageScores', {})
-    
-    # Baue Ergebnis-Matrix auf
-    results = {}
-    for prompt_id in prompts_data.keys():
-        results[prompt_id] = {}
-        prompt_responses = all_responses.get(prompt_id, {})
-        prompt_scores = llm_scores.get(prompt_id, {})
-        
-        for model_id in effective_models:
-            response_text = prompt_responses.get(model_id, '')
-            model_score_data = prompt_scores.get(model_id, {})
-            
-            # Extrahiere Score
-            score = None
-            if isinstance(model_score_data, dict):
-                avg_coverage = model_score_data.get('avgCoverageExtent')
-                if avg_coverage is not None:
-                    score = avg_coverage * 100
-            
-            # Extrahiere Kriterien-Ergebnisse
-            passed_criteria = []
-            failed_criteria = []
-            
-            point_assessments = model_score_data.get('pointAssessments', [])
-            for assessment in point_assessments:
-                criterion_text = assessment.get('keyPointText', '')
-                coverage = assessment.get('coverageExtent', 0) * 100
-                is_inverted = assessment.get('isInverted', False)
-                
-                if is_inverted:
-                    if coverage >= 50:
-                        passed_criteria.append({'text': criterion_text, 'score': coverage})
-                    else:
-                        failed_criteria.append({'text': criterion_text, 'score': coverage})
-                else:
-                    if coverage >= 50:
-                        passed_criteria.append({'text': criterion_text, 'score': coverage})
-                    else:
-                        failed_criteria.append({'text': criterion_text, 'score': coverage})
-            
-            # Handle errors
-            is_error = isinstance(response_text, str) and '<<error>>' in response_text
-            
-            results[prompt_id][model_id] = {
-                'score': score,
-                'output': response_text if isinstance(response_text, str) else '',
-                'passed': passed_criteria,
-                'failed': failed_criteria,
-                'is_error': is_error
-            }
-    
-    return results, effective_models, list(prompts_data.keys()), prompts_data
 
-def get_system_prompt_info(model_id):
-    """Extrahiert System-Prompt-Info aus der Model-ID"""
-    if 'sp_idx:0' in model_id:
-        return 'Kein System-Prompt'
-    elif 'sp_idx:1' in model_id:
-        return 'System: MHD-Experte (präzise)'
-    elif 'sp_idx:2' in model_id:
-        return 'System: MHD-Experte (keine derben Wörter)'
-    return 'Standard'
+    def add_run(self, data, source, prompt_index=None):
+        """Fügt einen Run hinzu (Prompts per promptIds, Modelle per Modell-ID ausgerichtet)"""
+        self.add_summary(self.summarize_run(data, source, prompt_index))
 
-def get_base_model_name(model_id):
-    """Extrahiert den Basis-Modellnamen ohne Konfiguration"""
-    return model_id.split('[')[0].strip()
+    def add_summary(self, summary):
+        """Fügt einen mit summarize_run reduzierten Run hinzu"""
+        prompt_idx = self._indices(summary['prompts'], self._prompt_index, self.prompts)
+        categories = dict(zip(summary['prompts'], summary['prompt_categories']))
+        self.prompt_categories.extend(categories[p] for p in self.prompts[len(self.prompt_categories):])
+        model_idx = self._indices(summary['models'], self._model_index, self.models)
+        self._grow()
+        
+        scores, errors = summary['scores'], summary['errors']
+        valid = ~errors & ~np.isnan(scores)
+        cells = np.ix_(prompt_idx, model_idx)
+        self._sums[cells] += np.where(valid, scores, 0.0)
+        self._counts[cells] += valid
+        self._errors[cells] += errors
+        self.runs.append(summary['run'])
 
-def calculate_statistics(results, models, prompts, prompts_data):
-    """Berechnet Statistiken und Rankings"""
-    
-    # Model Statistics (für alle Konfigurationen)
-    model_stats = {}
-    for model in models:
-        scores = []
-        errors = 0
-        category_scores = defaultdict(list)
-        
-        for prompt_id in prompts:
-            if prompt_id in results and model in results[prompt_id]:
-                result = results[prompt_id][model]
-                if result['is_error']:
-                    errors += 1
-                elif result['score'] is not None:
-                    scores.append(result['score'])
-                    category = prompts_data[prompt_id]['category']
-                    category_scores[category].append(result['score'])
-        
-        if scores:
-            model_stats[model] = {
-                'avg': sum(scores) / len(scores),
-                'min': min(scores),
-                'max': max(scores),
-                'count': len(scores),
-                'errors': errors,
-                'category_avg': {cat: sum(s)/len(s) for cat, s in category_scores.items() if s},
-                'base_name': get_base_model_name(model),
-                'sp_info': get_system_prompt_info(model)
-            }
-        else:
-            model_stats[model] = {
-                'avg': 0,
-                'min': 0,
-                'max': 0,
-                'count': 0,
-                'errors': errors,
-                'category_avg': {},
-                'base_name': get_base_model_name(model),
-                'sp_info': get_system_prompt_info(model)
-            }
-    
-    # Detailed Ranking (alle Konfigurationen)
-    detailed_ranking = sorted(model_stats.items(), key=lambda x: x[1]['avg'], reverse=True)
-    
-    # Consolidated Ranking (beste Konfiguration pro Basis-Modell)
-    base_model_best = {}
-    for model_id, stats in model_stats.items():
-        base_name = stats['base_name']
-        if base_name not in base_model_best or stats['avg'] > base_model_best[base_name][1]['avg']:
-            base_model_best[base_name] = (model_id, stats)
-    
-    consolidated_ranking = sorted(base_model_best.values(), key=lambda x: x[1]['avg'], reverse=True)
-    
-    # Category Best Models (nur beste Konfiguration pro Basis-Modell)
-    categories = set(p['category'] for p in prompts_data.values())
-    category_best = {}
-    for category in categories:
-        cat_scores = {}
-        for base_name, (model_id, stats) in base_model_best.items():
-            if category in stats['category_avg']:
-                cat_scores[model_id] = stats['category_avg'][category]
-        if cat_scores:
-            best_model = max(cat_scores.items(), key=lambda x: x[1])
-            category_best[category] = best_model
-    
-    return model_stats, consolidated_ranking, detailed_ranking, category_best
+    def cube(self):
+        """ScoreCube über alle Runs: pro Zelle der Mittelwert aller Runs
 
-def create_html(data, output_path):
-    print("Extrahiere Daten...")
-    results, models, prompts, prompts_data = extract_data(data)
-    
-    print("Berechne Statistiken...")
-    model_stats, consolidated_ranking, detailed_ranking, category_best = calculate_statistics(results, models, prompts, prompts_data)
-    
-    print("Erstelle HTML...")
-    
-    # Simplified model names
-    model_headers = [simplify_model_name(m) for m in models]
-    
-    # Build HTML
-    html = f'''<!DOCTYPE html>
-<html lang="de">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Mittelhochdeutsch Evaluation - Vollständige Ergebnisse</title>
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-        body {{ 
+        Eine Zelle gilt als Fehler, wenn sie in keinem Run einen Score hatte,
+        aber mindestens einmal fehlschlug.
+        """
+        has_scores = self._counts > 0
+        scores = np.divide(self._sums, self._counts, out=np.full(self._sums.shape, np.nan), where=has_scores)
+        errors = (self._errors > 0) & ~has_scores
+        return ScoreCube.from_arrays(self.prompts, self.models, scores, errors, self.prompt_categories)
+
+    def history(self):
+        """Runs chronologisch sortiert (timestamp, dann runLabel)"""
+        return sorted(self.runs, key=lambda r: (r['timestamp'], r['label']))
+
+# CSS der Reports (von allen HTML-Ausgaben geteilt)
+HTML_STYLE = '''        * { box-sizing: border-box; margin: 0; padding: 0; }
+        body { 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             padding: 20px;
             color: #333;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1800px;
             margin: 0 auto;
             background: white;
             border-radius: 12px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.3);
             overflow: hidden;
-        }}
+        }
         
-        .header {{
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             text-align: center;
-        }}
+        }
         
-        .header h1 {{ font-size: 2.5em; margin-bottom: 10px; }}
-        .header p {{ font-size: 1.1em; opacity: 0.9; }}
+        .header h1 { font-size: 2.5em; margin-bottom: 10px; }
+        .header p { font-size: 1.1em; opacity: 0.9; }
         
-        .tabs {{
+        .tabs {
             display: flex;
             background: #f8f9fa;
             border-bottom: 2px solid #e9ecef;
-        }}
+        }
         
-        .tab {{
+        .tab {
             flex: 1;
             padding: 15px;
             text-align: center;
@@ -281,25 +200,25 @@ def create_html(data, output_path):
             transition: all 0.3s;
             font-weight: 600;
             border-bottom: 3px solid transparent;
-        }}
+        }
         
-        .tab:hover {{ background: #e9ecef; }}
-        .tab.active {{ background: white; border-bottom-color: #667eea; color: #667eea; }}
+        .tab:hover { background: #e9ecef; }
+        .tab.active { background: white; border-bottom-color: #667eea; color: #667eea; }
         
-        .tab-content {{
+        .tab-content {
             display: none;
             padding: 30px;
-        }}
+        }
         
-        .tab-content.active {{ display: block; }}
+        .tab-content.active { display: block; }
         
         /* Leaderboard */
-        .leaderboard {{
+        .leaderboard {
             display: grid;
             gap: 15px;
-        }}
+        }
         
-        .leaderboard-item {{
+        .leaderboard-item {
             display: grid;
             grid-template-columns: 60px 1fr 100px;
             align-items: center;
@@ -308,75 +227,75 @@ def create_html(data, output_path):
             border-radius: 8px;
             border: 2px solid #e9ecef;
             transition: all 0.3s;
-        }}
+        }
         
-        .leaderboard-item:hover {{
+        .leaderboard-item:hover {
             box-shadow: 0 4px 12px rgba(0,0,0,0.1);
             transform: translateY(-2px);
-        }}
+        }
         
-        .rank {{
+        .rank {
             font-size: 2em;
             font-weight: bold;
             color: #667eea;
             text-align: center;
-        }}
+        }
         
-        .rank.gold {{ color: #FFD700; }}
-        .rank.silver {{ color: #C0C0C0; }}
-        .rank.bronze {{ color: #CD7F32; }}
+        .rank.gold { color: #FFD700; }
+        .rank.silver { color: #C0C0C0; }
+        .rank.bronze { color: #CD7F32; }
         
-        .model-info {{
+        .model-info {
             padding: 0 20px;
-        }}
+        }
         
-        .model-name {{
+        .model-name {
             font-size: 1.3em;
             font-weight: 600;
             margin-bottom: 8px;
-        }}
+        }
         
-        .model-details {{
+        .model-details {
             font-size: 0.9em;
             color: #6c757d;
-        }}
+        }
         
-        .model-score {{
+        .model-score {
             text-align: right;
-        }}
+        }
         
-        .score-big {{
+        .score-big {
             font-size: 2.5em;
             font-weight: bold;
             color: #667eea;
-        }}
+        }
         
-        .score-label {{
+        .score-label {
             font-size: 0.8em;
             color: #6c757d;
-        }}
+        }
         
         /* Category Performance */
-        .category-grid {{
+        .category-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
             gap: 20px;
             margin-top: 20px;
-        }}
+        }
         
-        .category-card {{
+        .category-card {
             background: #f8f9fa;
             padding: 20px;
             border-radius: 8px;
             border-left: 4px solid #667eea;
-        }}
+        }
         
-        .category-card h3 {{
+        .category-card h3 {
             color: #667eea;
             margin-bottom: 15px;
-        }}
+        }
         
-        .category-winner {{
+        .category-winner {
             display: flex;
             justify-content: space-between;
             align-items: center;
@@ -384,20 +303,20 @@ def create_html(data, output_path):
             background: white;
             border-radius: 6px;
             margin-top: 10px;
-        }}
+        }
         
         /* Matrix/Heatmap */
-        .matrix-container {{
+        .matrix-container {
             overflow-x: auto;
-        }}
+        }
         
-        .matrix-table {{
+        .matrix-table {
             width: 100%;
             border-collapse: collapse;
             font-size: 0.9em;
-        }}
+        }
         
-        .matrix-table th {{
+        .matrix-table th {
             background: #667eea;
             color: white;
             padding: 12px 8px;
@@ -406,52 +325,52 @@ def create_html(data, output_path):
             position: sticky;
             top: 0;
             z-index: 10;
-        }}
+        }
         
-        .matrix-table th.prompt-header {{
+        .matrix-table th.prompt-header {
             text-align: left;
             min-width: 250px;
-        }}
+        }
         
-        .matrix-table td {{
+        .matrix-table td {
             padding: 8px;
             text-align: center;
             border: 1px solid #e9ecef;
-        }}
+        }
         
-        .matrix-table td.prompt-cell {{
+        .matrix-table td.prompt-cell {
             text-align: left;
             font-weight: 500;
             background: #f8f9fa;
-        }}
+        }
         
-        .category-label {{
+        .category-label {
             font-size: 0.75em;
             color: #6c757d;
             margin-bottom: 4px;
-        }}
+        }
         
-        .score-cell {{
+        .score-cell {
             cursor: pointer;
             transition: all 0.2s;
             font-weight: 600;
-        }}
+        }
         
-        .score-cell:hover {{
+        .score-cell:hover {
             transform: scale(1.1);
             box-shadow: 0 4px 12px rgba(0,0,0,0.2);
             z-index: 5;
-        }}
+        }
         
-        .excellent {{ background: #d4edda; color: #155724; }}
-        .good {{ background: #fff3cd; color: #856404; }}
-        .medium {{ background: #ffe5b4; color: #8b4513; }}
-        .poor {{ background: #f8d7da; color: #721c24; }}
-        .bad {{ background: #dc3545; color: white; }}
-        .error {{ background: #e0e0e0; color: #666; }}
+        .excellent { background: #d4edda; color: #155724; }
+        .good { background: #fff3cd; color: #856404; }
+        .medium { background: #ffe5b4; color: #8b4513; }
+        .poor { background: #f8d7da; color: #721c24; }
+        .bad { background: #dc3545; color: white; }
+        .error { background: #e0e0e0; color: #666; }
         
         /* Modal */
-        .modal {{
+        .modal {
             display: none;
             position: fixed;
             z-index: 1000;
@@ -461,9 +380,9 @@ def create_html(data, output_path):
             height: 100%;
             overflow: auto;
             background-color: rgba(0,0,0,0.7);
-        }}
+        }
         
-        .modal-content {{
+        .modal-content {
             background-color: #fefefe;
             margin: 2% auto;
             padding: 0;
@@ -473,9 +392,9 @@ def create_html(data, output_path):
             max-height: 90vh;
             overflow-y: auto;
             box-shadow: 0 20px 60px rgba(0,0,0,0.5);
-        }}
+        }
         
-        .modal-header {{
+        .modal-header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px 30px;
@@ -483,74 +402,74 @@ def create_html(data, output_path):
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .close {{
+        .close {
             color: white;
             font-size: 32px;
             font-weight: bold;
             cursor: pointer;
-        }}
+        }
         
-        .close:hover {{ transform: scale(1.2); }}
+        .close:hover { transform: scale(1.2); }
         
-        .modal-body {{ padding: 30px; }}
+        .modal-body { padding: 30px; }
         
-        .prompt-info {{
+        .prompt-info {
             background: #f8f9fa;
             padding: 20px;
             border-radius: 8px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .prompt-info h3 {{ color: #667eea; margin-bottom: 10px; }}
+        .prompt-info h3 { color: #667eea; margin-bottom: 10px; }
         
-        .prompt-text, .ideal-response, .model-output {{
+        .prompt-text, .ideal-response, .model-output {
             background: white;
             padding: 15px;
             border-radius: 6px;
             margin: 10px 0;
             white-space: pre-wrap;
             line-height: 1.6;
-        }}
+        }
         
-        .prompt-text {{ border-left: 4px solid #667eea; }}
-        .ideal-response {{ border-left: 4px solid #28a745; background: #d4edda; }}
+        .prompt-text { border-left: 4px solid #667eea; }
+        .ideal-response { border-left: 4px solid #28a745; background: #d4edda; }
         
-        .model-result {{
+        .model-result {
             background: white;
             border: 2px solid #e9ecef;
             border-radius: 8px;
             padding: 20px;
             margin-bottom: 20px;
-        }}
+        }
         
-        .model-result h3 {{
+        .model-result h3 {
             color: #667eea;
             margin-bottom: 15px;
             display: flex;
             justify-content: space-between;
-        }}
+        }
         
-        .score-badge {{
+        .score-badge {
             padding: 5px 15px;
             border-radius: 20px;
             font-size: 0.9em;
             font-weight: bold;
-        }}
+        }
         
-        .criteria-item {{
+        .criteria-item {
             padding: 10px 15px;
             margin: 8px 0;
             border-radius: 6px;
             display: flex;
             justify-content: space-between;
-        }}
+        }
         
-        .criteria-item.passed {{ background: #d4edda; border-left: 4px solid #28a745; }}
-        .criteria-item.failed {{ background: #f8d7da; border-left: 4px solid #dc3545; }}
+        .criteria-item.passed { background: #d4edda; border-left: 4px solid #28a745; }
+        .criteria-item.failed { background: #f8d7da; border-left: 4px solid #dc3545; }
         
-        .legend {{
+        .legend {
             display: flex;
             justify-content: center;
             gap: 20px;
@@ -558,98 +477,246 @@ def create_html(data, output_path):
             background: #f8f9fa;
             margin-top: 20px;
             border-radius: 8px;
-        }}
+        }
         
-        .legend-item {{ display: flex; align-items: center; gap: 8px; }}
-        .legend-color {{ width: 30px; height: 20px; border-radius: 4px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Mittelhochdeutsch Evaluation</h1>
-            <p>Übersetzungsqualität und Faktentreue - {len(prompts)} Prompts × {len(models)} Modelle</p>
-        </div>
+        .legend-item { display: flex; align-items: center; gap: 8px; }
+        .legend-color { width: 30px; height: 20px; border-radius: 4px; }
         
-        <div class="tabs">
-            <div class="tab active" onclick="showTab('leaderboard')">🏆 Leaderboard</div>
-            <div class="tab" onclick="showTab('detailed')">📋 Detailliert</div>
-            <div class="tab" onclick="showTab('categories')">📊 Kategorien</div>
-            <div class="tab" onclick="showTab('heatmap')">🔥 Heatmap</div>
-        </div>
+        .heatmap-search {
+            display: flex;
+            align-items: center;
+            gap: 15px;
+            margin-bottom: 15px;
+        }
         
-        <div id="leaderboard" class="tab-content active">
-            <h2 style="margin-bottom: 10px; color: #667eea;">🏆 Model Ranking</h2>
-            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
-                Beste Konfiguration pro Modell (von {len(detailed_ranking)} getesteten Konfigurationen)
-            </p>
-            <div class="leaderboard">
-'''
-    
-    # Consolidated Leaderboard
-    for idx, (model_id, stats) in enumerate(consolidated_ranking, 1):
-        model_name = simplify_model_name(model_id)
-        rank_class = ''
-        if idx == 1:
-            rank_class = 'gold'
-        elif idx == 2:
-            rank_class = 'silver'
-        elif idx == 3:
-            rank_class = 'bronze'
-        
-        # Berechne Success Rate
-        total_tests = stats['count'] + stats['errors']
-        success_rate = (stats['count'] / total_tests * 100) if total_tests > 0 else 0
+        .heatmap-search input {
+            flex: 1;
+            max-width: 500px;
+            padding: 8px 12px;
+            border: 1px solid #ced4da;
+            border-radius: 6px;
+            font-size: 0.95em;
+        }
         
-        html += f'''
-                <div class="leaderboard-item">
-                    <div class="rank {rank_class}">{idx}</div>
-                    <div class="model-info">
-                        <div class="model-name">{model_name}</div>
-                        <div class="model-details">
-                            {stats['sp_info']}<br>
-                            Min: {stats['min']:.1f}% | Max: {stats['max']:.1f}% | 
-                            Erfolgreiche Tests: {stats['count']}/{total_tests} ({success_rate:.1f}%)
-                            {f' | <span style="color: #dc3545; font-weight: bold;">⚠️ {stats["errors"]} Fehler</span>' if stats['errors'] > 0 else ''}
-                        </div>
-                    </div>
-                    <div class="model-score">
-                        <div class="score-big">{stats['avg']:.1f}%</div>
-                        <div class="score-label">Durchschnitt</div>
-                    </div>
-                </div>
+        .heatmap-search span { color: #6c757d; font-size: 0.9em; }
+        .score-cell.search-miss { opacity: 0.2; }
 '''
-    
-    html += '''
-            </div>
-        </div>
+
+# Ab dieser Zellzahl rendert die Heatmap nur noch die sichtbaren Zellen
+VIRTUAL_HEATMAP_CELLS = 20000
+HEATMAP_CLASS_CODES = {'excellent': 'e', 'good': 'g', 'medium': 'm', 'poor': 'p', 'bad': 'b', 'error': 'x'}
+
+VIRTUAL_HEATMAP_STYLE = '''        
+        /* Virtualisierte Heatmap */
+        .virtual-heatmap {
+            position: relative;
+            height: 70vh;
+            overflow: auto;
+            border: 1px solid #e9ecef;
+            font-size: 0.9em;
+        }
         
-        <div id="detailed" class="tab-content">
-            <h2 style="margin-bottom: 10px; color: #667eea;">📋 Alle Konfigurationen</h2>
-            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
-                Vergleich aller System-Prompt-Varianten pro Modell
-            </p>
-            <div class="leaderboard">
+        .vh-spacer { position: relative; }
+        
+        .vh-cell, .vh-header, .vh-prompt {
+            position: absolute;
+            overflow: hidden;
+            white-space: nowrap;
+            text-overflow: ellipsis;
+            border: 1px solid #e9ecef;
+        }
+        
+        .vh-cell {
+            display: flex;
+            align-items: center;
+            justify-content: center;
+        }
+        
+        .vh-header {
+            background: #667eea;
+            color: white;
+            font-weight: 600;
+            padding: 6px 4px;
+            text-align: center;
+            white-space: normal;
+            z-index: 10;
+        }
+        
+        .vh-prompt {
+            background: #f8f9fa;
+            font-weight: 500;
+            padding: 2px 8px;
+            z-index: 8;
+        }
+        
+        .vh-prompt .category-label { margin-bottom: 0; }
+        .vh-corner { z-index: 12; text-align: left; }
 '''
-    
-    # Detailed Leaderboard
-    for idx, (model_id, stats) in enumerate(detailed_ranking, 1):
-        model_name = simplify_model_name(model_id)
+
+VIRTUAL_HEATMAP_SCRIPT = '''
+        // Virtualisierte Heatmap: nur sichtbare Zeilen und Spalten im DOM,
+        // ein einziger delegierter Klick-Handler für alle Zellen
+        const HEATMAP_ROW_HEIGHT = 44;
+        const HEATMAP_CELL_WIDTH = 90;
+        const HEATMAP_HEADER_HEIGHT = 56;
+        const HEATMAP_PROMPT_WIDTH = 260;
+        const HEATMAP_OVERSCAN = 4;
+        const HEATMAP_CLASSES = {e: 'excellent', g: 'good', m: 'medium', p: 'poor', b: 'bad', x: 'error'};
+        let heatmapFrame = null;
+        // Angezeigte Zeilen bei aktiver Suche (Indizes in heatmapData.prompts), sonst null
+        let heatmapRows = null;
+        
+        function renderHeatmap() {
+            heatmapFrame = null;
+            const viewport = document.getElementById('heatmapViewport');
+            const rows = heatmapRows ? heatmapRows.length : heatmapData.prompts.length;
+            const cols = heatmapData.models.length;
+            // Im versteckten Tab hat der Viewport keine Größe: dann die CSS-Höhe (70vh) annehmen
+            const height = viewport.clientHeight || window.innerHeight * 0.7;
+            const width = viewport.clientWidth || window.innerWidth;
+            const top = viewport.scrollTop;
+            const left = viewport.scrollLeft;
+            const r0 = Math.max(0, Math.floor(top / HEATMAP_ROW_HEIGHT) - HEATMAP_OVERSCAN);
+            const r1 = Math.min(rows, Math.ceil((top + height - HEATMAP_HEADER_HEIGHT) / HEATMAP_ROW_HEIGHT) + HEATMAP_OVERSCAN);
+            const c0 = Math.max(0, Math.floor(left / HEATMAP_CELL_WIDTH) - HEATMAP_OVERSCAN);
+            const c1 = Math.min(cols, Math.ceil((left + width - HEATMAP_PROMPT_WIDTH) / HEATMAP_CELL_WIDTH) + HEATMAP_OVERSCAN);
+        
+            const parts = [];
+            for (let v = r0; v < r1; v++) {
+                const r = heatmapRows ? heatmapRows[v] : v;
+                const y = HEATMAP_HEADER_HEIGHT + v * HEATMAP_ROW_HEIGHT;
+                for (let c = c0; c < c1; c++) {
+                    const i = r * cols + c;
+                    const code = heatmapData.classes[i];
+                    const x = HEATMAP_PROMPT_WIDTH + c * HEATMAP_CELL_WIDTH;
+                    const box = `top:${y}px;left:${x}px;width:${HEATMAP_CELL_WIDTH}px;height:${HEATMAP_ROW_HEIGHT}px`;
+                    if (code === '-') {
+                        parts.push(`<div class="vh-cell score-cell error" style="${box}">N/A</div>`);
+                    } else {
+                        const label = heatmapData.labels[i] === null ? 'N/A' : heatmapData.labels[i] + '%';
+                        const miss = searchMatches && !searchMatches[i] ? ' search-miss' : '';
+                        parts.push(`<div class="vh-cell score-cell ${HEATMAP_CLASSES[code]}${miss}" data-r="${r}" data-c="${c}" style="${box}">${label}</div>`);
+                    }
+                }
+                const [promptId, category] = heatmapData.prompts[r];
+                parts.push(`<div class="vh-prompt" style="top:${y}px;left:${left}px;width:${HEATMAP_PROMPT_WIDTH}px;height:${HEATMAP_ROW_HEIGHT}px" title="${promptId}">` +
+                           `<div class="category-label">${category}</div><div>${promptId}</div></div>`);
+            }
+            for (let c = c0; c < c1; c++) {
+                const x = HEATMAP_PROMPT_WIDTH + c * HEATMAP_CELL_WIDTH;
+                parts.push(`<div class="vh-header" style="top:${top}px;left:${x}px;width:${HEATMAP_CELL_WIDTH}px;height:${HEATMAP_HEADER_HEIGHT}px" title="${heatmapData.models[c]}">${heatmapData.headers[c]}</div>`);
+            }
+            parts.push(`<div class="vh-header vh-corner" style="top:${top}px;left:${left}px;width:${HEATMAP_PROMPT_WIDTH}px;height:${HEATMAP_HEADER_HEIGHT}px">Prompt</div>`);
+            document.getElementById('heatmapSpacer').innerHTML = parts.join('');
+        }
+        
+        function scheduleHeatmapRender() {
+            if (heatmapFrame === null) {
+                heatmapFrame = requestAnimationFrame(renderHeatmap);
+            }
+        }
         
-        # Berechne Success Rate
-        total_tests = stats['count'] + stats['errors']
-        success_rate = (stats['count'] / total_tests * 100) if total_tests > 0 else 0
+        function sizeHeatmap() {
+            const spacer = document.getElementById('heatmapSpacer');
+            const rows = heatmapRows ? heatmapRows.length : heatmapData.prompts.length;
+            spacer.style.width = (HEATMAP_PROMPT_WIDTH + heatmapData.models.length * HEATMAP_CELL_WIDTH) + 'px';
+            spacer.style.height = (HEATMAP_HEADER_HEIGHT + rows * HEATMAP_ROW_HEIGHT) + 'px';
+        }
         
-        html += f'''
+        function filterHeatmap(matches) {
+            if (!document.getElementById('heatmapViewport')) return;
+            const cols = heatmapData.models.length;
+            heatmapRows = null;
+            if (matches) {
+                heatmapRows = [];
+                for (let r = 0; r < heatmapData.prompts.length; r++) {
+                    if (matches.subarray(r * cols, (r + 1) * cols).includes(1)) heatmapRows.push(r);
+                }
+            }
+            sizeHeatmap();
+            document.getElementById('heatmapViewport').scrollTop = 0;
+            renderHeatmap();
+        }
+        
+        function initHeatmap() {
+            const viewport = document.getElementById('heatmapViewport');
+            if (!viewport) return;
+            sizeHeatmap();
+            viewport.addEventListener('scroll', scheduleHeatmapRender);
+            window.addEventListener('resize', scheduleHeatmapRender);
+            document.querySelectorAll('.tab').forEach(t => t.addEventListener('click', scheduleHeatmapRender));
+            viewport.addEventListener('click', function(event) {
+                const cell = event.target.closest('[data-r]');
+                if (cell) {
+                    showDetails(heatmapData.prompts[cell.dataset.r][0], heatmapData.models[cell.dataset.c]);
+                }
+            });
+            renderHeatmap();
+        }
+        
+        initHeatmap();
+'''
+
+def heatmap_payload(report, model_headers):
+    """Kompakte Score-Matrix für die virtualisierte Heatmap
+
+    Pro Prompt x Modell nur ein Zeichen für die Farbklasse ('-' = keine
+    Antwort) und die angezeigte Prozentzahl, zeilenweise flach hintereinander.
+    """
+    results = report['results']
+    classes = []
+    labels = []
+    for prompt_id in report['prompts']:
+        row = results.get(prompt_id, {})
+        for model_id in report['models']:
+            if model_id not in row:
+                classes.append('-')
+                labels.append(None)
+                continue
+            score = row[model_id]['score']
+            classes.append(HEATMAP_CLASS_CODES[get_color_class(score)])
+            labels.append(int(f"{score:.0f}") if score is not None else None)
+    return {
+        'prompts': [[p, report['prompts_data'][p]['category']] for p in report['prompts']],
+        'models': report['models'],
+        'headers': model_headers,
+        'classes': ''.join(classes),
+        'labels': labels,
+    }
+
+RANK_CLASSES = {1: 'gold', 2: 'silver', 3: 'bronze'}
+# Puffergröße der HTML-Ausgabe, die Fragmente werden gesammelt geschrieben
+HTML_WRITE_BUFFER = 1 << 20
+
+def render_leaderboard_item(idx, model_id, stats, rank_class=None, ci=None, places=None):
+    """HTML eines Leaderboard-Eintrags (rank_class=None für das detaillierte Ranking)
+
+    ci: 95%-Konfidenzintervall des Durchschnitts, places: (erster, letzter) Platz der
+    Gleichstands-Gruppe; idx ist dann der erste Platz der Gruppe.
+    """
+    model_name = simplify_model_name(model_id)
+    rank_css = 'rank' if rank_class is None else f'rank {rank_class}'
+    
+    # Berechne Success Rate
+    total_tests = stats['count'] + stats['errors']
+    success_rate = (stats['count'] / total_tests * 100) if total_tests > 0 else 0
+    
+    significance = ''
+    if ci is not None:
+        significance += f'<br>\n                            95%-KI: {ci[0]:.1f}–{ci[1]:.1f}%'
+    if places is not None and places[1] > places[0]:
+        significance += f' | ≈ statistisch gleichauf (Plätze {places[0]}–{places[1]})'
+    
+    return f'''
                 <div class="leaderboard-item">
-                    <div class="rank">{idx}</div>
+                    <div class="{rank_css}">{idx}</div>
                     <div class="model-info">
                         <div class="model-name">{model_name}</div>
                         <div class="model-details">
                             {stats['sp_info']}<br>
                             Min: {stats['min']:.1f}% | Max: {stats['max']:.1f}% | 
                             Erfolgreiche Tests: {stats['count']}/{total_tests} ({success_rate:.1f}%)
-                            {f' | <span style="color: #dc3545; font-weight: bold;">⚠️ {stats["errors"]} Fehler</span>' if stats['errors'] > 0 else ''}
+                            {f' | <span style="color: #dc3545; font-weight: bold;">⚠️ {stats["errors"]} Fehler</span>' if stats['errors'] > 0 else ''}{significance}
                         </div>
                     </div>
                     <div class="model-score">
@@ -658,17 +725,60 @@ def create_html(data, output_path):
                     </div>
                 </div>
 '''
-    
-    html += '''
+
+def iter_ranking_items(ranking, significance=None, kind='detailed', medals=False):
+    """Leaderboard-Einträge eines Rankings; mit significance teilen sich Gleichauf-Gruppen den Platz"""
+    for idx, (model_id, stats) in enumerate(ranking, 1):
+        places = significance[kind][model_id] if significance else None
+        rank = places[0] if places else idx
+        rank_class = RANK_CLASSES.get(rank, '') if medals else None
+        ci = significance['ci'].get(model_id) if significance else None
+        yield render_leaderboard_item(rank, model_id, stats, rank_class, ci, places)
+
+def render_significance_matrix(ranking, significance):
+    """Paarweise Signifikanz der Konfigurationen eines Rankings als Tabelle"""
+    index = {m: j for j, m in enumerate(significance['models'])}
+    p_values = significance['p_values']
+    html = f'''
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Paarweise Signifikanz</h3>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                ▲ Zeile signifikant besser als Spalte, ▼ signifikant schlechter, ≈ kein signifikanter Unterschied
+                (gepaarter Bootstrap über die Prompts, {significance['resamples']} Stichproben, α = {significance['alpha']})
+            </p>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Konfiguration</th>
+'''
+    for model_id, stats in ranking:
+        html += f'                            <th title="{model_id}">{simplify_model_name(model_id)}<br><small>{stats["sp_info"]}</small></th>\n'
+    html += '''                        </tr>
+                    </thead>
+                    <tbody>
+'''
+    for model_id, stats in ranking:
+        html += f'                        <tr>\n                            <td class="prompt-cell">{simplify_model_name(model_id)}<br><small>{stats["sp_info"]}</small></td>\n'
+        for other_id, other_stats in ranking:
+            p = p_values[index[model_id], index[other_id]]
+            if model_id == other_id or np.isnan(p):
+                html += '                            <td class="error">–</td>\n'
+            elif p < significance['alpha']:
+                better = stats['avg'] > other_stats['avg']
+                html += (f'                            <td class="{"excellent" if better else "poor"}" title="p = {p:.4f}">'
+                         f'{"▲" if better else "▼"}<br><small>{"<0.001" if p < 0.001 else f"{p:.3f}"}</small></td>\n')
+            else:
+                html += f'                            <td title="p = {p:.4f}">≈<br><small>{p:.2f}</small></td>\n'
+        html += '                        </tr>\n'
+    html += '''                    </tbody>
+                </table>
             </div>
-        </div>
-        
-        <div id="categories" class="tab-content">
-            <h2 style="margin-bottom: 20px; color: #667eea;">📊 Leistung nach Kategorien</h2>
-            <div class="category-grid">
 '''
-    
-    # Category Performance
+    return html
+
+def render_category_cards(category_best, models, model_stats):
+    """HTML der Kategorie-Karten mit Bestwert und allen Konfigurationen"""
+    html = ''
     for category, (best_model, best_score) in category_best.items():
         model_name = simplify_model_name(best_model)
         html += f'''
@@ -689,57 +799,483 @@ def create_html(data, output_path):
                 color = get_color_class(score)
                 html += f'<div style="display: flex; justify-content: space-between; padding: 5px; margin: 3px 0; background: white; border-radius: 4px;"><span>{model_name_short}</span><span class="{color}" style="padding: 2px 8px; border-radius: 3px;">{score:.1f}%</span></div>'
         html += '</div></div>'
+    return html
+
+def prepare_report(data, prompt_index=None, profiler=None):
+    """Extrahiert die Ergebnis-Matrix eines Runs und berechnet alle Statistiken"""
+    mark_phase(profiler, 'extract')
+    print("Extrahiere Daten...")
+    results, models, prompts, prompts_data = extract_data(data, prompt_index)
     
-    html += '''
-            </div>
-        </div>
-        
-        <div id="heatmap" class="tab-content">
-            <h2 style="margin-bottom: 20px; color: #667eea;">🔥 Detaillierte Heatmap</h2>
-            <div class="matrix-container">
-                <table class="matrix-table">
-                    <thead>
-                        <tr>
-                            <th class="prompt-header">Prompt</th>
-'''
+    mark_phase(profiler, 'statistics')
+    print("Berechne Statistiken...")
+    cube = ScoreCube.from_results(results, models, prompts, prompts_data)
+    model_stats, consolidated_ranking, detailed_ranking, category_best = statistics_from_cube(cube)
+    similarity_cube = SimilarityCube.from_data(data, models, prompts)
+    criterion_cube = CriterionCube.from_data(data, models, prompts, cube.errors)
     
-    for header in model_headers:
-        html += f'                            <th>{header}</th>\n'
+    return {
+        'results': results,
+        'models': models,
+        'prompts': prompts,
+        'prompts_data': prompts_data,
+        'model_stats': model_stats,
+        'consolidated_ranking': consolidated_ranking,
+        'detailed_ranking': detailed_ranking,
+        'category_best': category_best,
+        'significance': significance_statistics(cube, consolidated_ranking, detailed_ranking),
+        'similarity': similarity_statistics(similarity_cube, model_stats) if similarity_cube else None,
+        'duplicates': duplicate_statistics(results, models, prompts, prompts_data),
+        'criteria': criterion_statistics(criterion_cube),
+    }
+
+def _assessment_key(model_score_data):
+    """Alles, was extract_cell und der Kriterien-Cube aus einem llmCoverageScores-Eintrag lesen"""
+    if not isinstance(model_score_data, dict):
+        return model_score_data
+    return (model_score_data.get('avgCoverageExtent'),
+            tuple((a.get('keyPointText', ''), a.get('coverageExtent', 0), a.get('isInverted', False))
+                  for a in model_score_data.get('pointAssessments') or ()))
+
+def prepare_report_incremental(data, previous=None, prompt_index=None, profiler=None):
+    """Wie prepare_report, übernimmt aber alles Unveränderte aus dem vorherigen Stand
+
+    previous ist der zuletzt zurückgegebene state (oder None für einen vollen
+    Lauf). Neu extrahiert werden nur Zellen, deren Antwort, LLM-Bewertung oder
+    Prompt-Definition sich geändert hat, neu berechnet nur die Statistiken der
+    betroffenen Konfigurationen. Verglichen wird direkt mit den im state
+    gespeicherten Werten (Prompt-Definition, Antwort-Text und die von
+    extract_cell gelesenen Felder der Bewertung), ohne JSON zu serialisieren.
+    Gibt (report, state, changes) zurück.
+    """
+    previous = previous or {'prompt_keys': {}, 'cell_keys': {}, 'report': None, 'cube': None, 'criterion_cube': None}
+    prev_report = previous['report']
+    prev_results = prev_report['results'] if prev_report else {}
+    prev_prompts_data = prev_report['prompts_data'] if prev_report else {}
     
-    html += '''
+    mark_phase(profiler, 'extract')
+    print("Vergleiche mit vorherigem Stand...")
+    prompts_data = {}
+    prompt_keys = {}
+    reused_prompts = set()
+    changed_prompts = []
+    for prompt_def in data.get('config', {}).get('prompts', []):
+        prompt_id = prompt_def.get('id')
+        entry = prompt_index['prompts'].get(prompt_id) if prompt_index else None
+        prompt_keys[prompt_id] = (prompt_def, entry)
+        if prompt_id in previous['prompt_keys'] and previous['prompt_keys'][prompt_id] == prompt_keys[prompt_id]:
+            # Gespeicherten Stand weiterverwenden (hält auch den state klein)
+            prompt_keys[prompt_id] = previous['prompt_keys'][prompt_id]
+            prompts_data[prompt_id] = prev_prompts_data[prompt_id]
+            reused_prompts.add(prompt_id)
+            continue
+        prompts_data[prompt_id] = extract_prompt(prompt_def, prompt_index)
+        if prompt_id in previous['prompt_keys']:
+            changed_prompts.append(prompt_id)
+    
+    models = [m for m in data.get('effectiveModels', []) if m != IDEAL_MODEL_ID]
+    prompts = list(prompts_data.keys())
+    all_responses = data.get('allFinalAssistantResponses', {})
+    llm_scores = data.get('evaluationResults', {}).get('llmCoverageScores', {})
+    
+    results = {}
+    cell_keys = {}
+    changed_cells = []
+    extracted_prompts = set()
+    for prompt_id in prompts:
+        results[prompt_id] = {}
+        prompt_responses = all_responses.get(prompt_id, {})
+        prompt_scores = llm_scores.get(prompt_id, {})
+        prev_row = prev_results.get(prompt_id, {})
+        prompt_reused = prompt_id in reused_prompts
+        
+        for model_id in models:
+            response_text = prompt_responses.get(model_id, '')
+            model_score_data = prompt_scores.get(model_id, {})
+            key = (response_text, _assessment_key(model_score_data))
+            prev_key = previous['cell_keys'].get((prompt_id, model_id))
+            if prompt_reused and prev_key == key:
+                # Gespeicherte Objekte behalten: Antwort und Zelle teilen sich im Pickle den Text
+                cell_keys[(prompt_id, model_id)] = prev_key
+                results[prompt_id][model_id] = prev_row[model_id]
+                continue
+            
+            cell_keys[(prompt_id, model_id)] = key
+            cell = extract_cell(response_text, model_score_data)
+            results[prompt_id][model_id] = cell
+            extracted_prompts.add(prompt_id)
+            if prev_key is not None:
+                changed_cells.append({
+                    'prompt': prompt_id,
+                    'model': model_id,
+                    'old_score': prev_row[model_id]['score'],
+                    'new_score': cell['score'],
+                    'prompt_changed': not prompt_reused,
+                    'output_changed': prev_key[0] != key[0],
+                    'assessment_changed': prev_key[1] != key[1],
+                })
+    
+    prev_prompts = prev_report['prompts'] if prev_report else []
+    prev_models = prev_report['models'] if prev_report else []
+    added_prompts = [p for p in prompts if p not in set(prev_prompts)]
+    removed_prompts = [p for p in prev_prompts if p not in prompts_data]
+    added_models = [m for m in models if m not in set(prev_models)]
+    removed_models = [m for m in prev_models if m not in set(models)]
+    
+    # Betroffene Aggregate: Konfigurationen mit geänderten Zellen; ändert sich
+    # die Prompt-Menge, verschieben sich die Durchschnitte aller Konfigurationen
+    if prev_report is None or added_prompts or removed_prompts:
+        affected_models = list(models)
+    else:
+        changed_models = {c['model'] for c in changed_cells} | set(added_models)
+        affected_models = [m for m in models if m in changed_models]
+    
+    mark_phase(profiler, 'statistics')
+    print("Berechne Statistiken...")
+    prev_cube = previous['cube']
+    if prev_cube is not None and prev_cube.prompts == prompts and prev_cube.models == models \
+            and [prompts_data[p]['category'] for p in prompts] == [prev_cube.categories[c] for c in prev_cube.category_idx]:
+        # Nur geänderte Zellen im Cube aktualisieren
+        prompt_lookup = {p: i for i, p in enumerate(prompts)}
+        model_lookup = {m: j for j, m in enumerate(models)}
+        cube = ScoreCube(prompts, models, prev_cube.scores.copy(), prev_cube.errors.copy(),
+                         prev_cube.categories, prev_cube.category_idx, prev_cube.base_models, prev_cube.base_idx)
+        for change in changed_cells:
+            i, j = prompt_lookup[change['prompt']], model_lookup[change['model']]
+            cell = results[change['prompt']][change['model']]
+            cube.scores[i, j] = np.nan if cell['score'] is None else cell['score']
+            cube.errors[i, j] = cell['is_error']
+    else:
+        cube = ScoreCube.from_results(results, models, prompts, prompts_data)
+    
+    recomputed = config_statistics(cube, affected_models) if affected_models else {}
+    model_stats = {m: recomputed[m] if m in recomputed else prev_report['model_stats'][m] for m in models}
+    consolidated_ranking, detailed_ranking, category_best = rank_statistics(cube, model_stats)
+    # Duplikat-Gruppen und Kriterien-Zeilen hängen nur an den Zellen ihres Prompts:
+    # unveränderte Prompts übernehmen sie, die (vektorisierten) Kriterien-Statistiken
+    # laufen danach über den ganzen Cube. Bewusst immer komplett neu berechnet werden
+    # der Bootstrap (jede Stichprobe zieht über alle Prompts und Spalten) und die
+    # Ähnlichkeiten (nicht Teil der verglichenen Zellen).
+    reuse = set()
+    if prev_report is not None and prev_models == models and previous['criterion_cube'] is not None:
+        reuse = reused_prompts - extracted_prompts
+    similarity_cube = SimilarityCube.from_data(data, models, prompts)
+    criterion_cube = CriterionCube.from_scores(llm_scores, models, prompts, cube.errors,
+                                               previous['criterion_cube'], reuse)
+    
+    report = {
+        'results': results,
+        'models': models,
+        'prompts': prompts,
+        'prompts_data': prompts_data,
+        'model_stats': model_stats,
+        'consolidated_ranking': consolidated_ranking,
+        'detailed_ranking': detailed_ranking,
+        'category_best': category_best,
+        'significance': significance_statistics(cube, consolidated_ranking, detailed_ranking),
+        'similarity': similarity_statistics(similarity_cube, model_stats) if similarity_cube else None,
+        'duplicates': duplicate_statistics(results, models, prompts, prompts_data,
+                                           previous=prev_report and prev_report['duplicates'], reuse=reuse),
+        'criteria': criterion_statistics(criterion_cube),
+    }
+    state = {'prompt_keys': prompt_keys, 'cell_keys': cell_keys, 'report': report, 'cube': cube,
+             'criterion_cube': criterion_cube}
+    
+    prev_model_stats = prev_report['model_stats'] if prev_report else {}
+    changes = {
+        'has_previous': prev_report is not None,
+        'added_prompts': added_prompts,
+        'removed_prompts': removed_prompts,
+        'changed_prompts': changed_prompts,
+        'added_models': added_models,
+        'removed_models': removed_models,
+        'changed_cells': changed_cells,
+        'recomputed_configs': [
+            {'model': m, 'old_avg': prev_model_stats[m]['avg'] if m in prev_model_stats else None,
+             'new_avg': model_stats[m]['avg']}
+            for m in affected_models
+        ],
+    }
+    return report, state, changes
+
+def write_change_report(changes, output_path, top=10):
+    """Schreibt den Änderungsbericht als JSON und gibt eine Zusammenfassung aus"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(changes, f, ensure_ascii=False, indent=2)
+    
+    if not changes['has_previous']:
+        print("Kein vorheriger Stand vorhanden, alle Zellen neu berechnet")
+    else:
+        print(f"Geänderte Zellen: {len(changes['changed_cells'])}, "
+              f"neu berechnete Konfigurationen: {len(changes['recomputed_configs'])}")
+        for label, key in (('Neue Prompts', 'added_prompts'), ('Entfernte Prompts', 'removed_prompts'),
+                           ('Geänderte Prompts', 'changed_prompts'), ('Neue Modelle', 'added_models'),
+                           ('Entfernte Modelle', 'removed_models')):
+            if changes[key]:
+                print(f"{label}: {', '.join(changes[key])}")
+        
+        def delta(change):
+            old, new = change['old_score'], change['new_score']
+            return abs((new or 0) - (old or 0))
+        
+        for change in sorted(changes['changed_cells'], key=delta, reverse=True)[:top]:
+            old = 'N/A' if change['old_score'] is None else f"{change['old_score']:.0f}%"
+            new = 'N/A' if change['new_score'] is None else f"{change['new_score']:.0f}%"
+            print(f"  {change['prompt']} / {simplify_model_name(change['model'])} "
+                  f"({get_system_prompt_info(change['model'])}): {old} -> {new}")
+    print(f"Änderungsbericht: {output_path}")
+
+def create_html(data, output_path):
+    render_html(prepare_report(data), output_path)
+
+def write_detail_shards(report, output_path):
+    """Schreibt Prompt, ideale Antwort, Modell-Antworten und Kriterien je Prompt in eine eigene Datei
+
+    Die Shards sind kleine Skripte, die registerDetails(...) aufrufen: per
+    <script src> nachgeladen funktionieren sie auch bei file://-URLs, wo
+    fetch() auf lokale JSON-Dateien blockiert wird.
+    """
+    output_path = Path(output_path)
+    details_dir = output_path.with_name(f'{output_path.stem}_details')
+    details_dir.mkdir(parents=True, exist_ok=True)
+    
+    shards = {}
+    for idx, prompt_id in enumerate(report['prompts']):
+        shard_name = f'p{idx}.js'
+        with open(details_dir / shard_name, 'w', encoding='utf-8') as f:
+            f.write('registerDetails(' + json.dumps(prompt_id, ensure_ascii=False) + ', '
+                    + json.dumps(report['prompts_data'][prompt_id], ensure_ascii=False) + ', '
+                    + json.dumps(report['results'][prompt_id], ensure_ascii=False) + ');\n')
+        shards[prompt_id] = f'{details_dir.name}/{shard_name}'
+    
+    # Veraltete Shards eines früheren, größeren Runs entfernen
+    current = {Path(path).name for path in shards.values()}
+    for stale in details_dir.glob('p*.js'):
+        if stale.name not in current:
+            stale.unlink()
+    return shards
+
+def write_search_shard(index, output_path):
+    """Schreibt den Suchindex als Skript neben die Detail-Shards, Rückgabe: relativer Pfad"""
+    output_path = Path(output_path)
+    details_dir = output_path.with_name(f'{output_path.stem}_details')
+    details_dir.mkdir(parents=True, exist_ok=True)
+    with open(details_dir / 'search.js', 'w', encoding='utf-8') as f:
+        f.write('registerSearchIndex(' + json.dumps(index, ensure_ascii=False, separators=(',', ':')) + ');\n')
+    return f'{details_dir.name}/search.js'
+
+def iter_json_object(obj):
+    """Wie json.dumps(obj, ensure_ascii=False), aber Eintrag für Eintrag
+
+    So entsteht für große dicts (resultsData) nie der ganze JSON-String im
+    Speicher; die Ausgabe ist Byte für Byte dieselbe.
+    """
+    yield '{'
+    for i, (key, value) in enumerate(obj.items()):
+        yield (', ' if i else '') + json.dumps(key, ensure_ascii=False) + ': ' + json.dumps(value, ensure_ascii=False)
+    yield '}'
+
+def pack_report_payload(report, body, index=None):
+    """Kodiert promptsData/resultsData und den Seiteninhalt als gzip-Blob
+
+    Jeder String (Modell-IDs, Kriterien-Texte, Prompts, Antworten, ...) steht
+    genau einmal in der Tabelle 's'; Prompts ('p') und Zellen ('r') verweisen
+    nur noch per Index darauf. 'b' enthält das HTML des Containers, dessen
+    Heatmap die Modell-IDs hundertfach wiederholt. Der Browser entpackt den
+    Blob mit DecompressionStream('gzip') und baut daraus die Seite auf.
+    'x' ist der Suchindex (search_index), falls übergeben.
+    """
+    strings = []
+    string_index = {}
+    
+    def intern(value):
+        if value not in string_index:
+            string_index[value] = len(strings)
+            strings.append(value)
+        return string_index[value]
+    
+    def criteria(items):
+        return [[intern(c['text']), c['score']] for c in items]
+    
+    packed_prompts = []
+    packed_results = []
+    model_refs = [intern(m) for m in report['models']]
+    for prompt_id in report['prompts']:
+        prompt = report['prompts_data'][prompt_id]
+        packed_prompts.append([
+            intern(prompt_id),
+            intern(prompt['description']),
+            intern(prompt['prompt']),
+            intern(prompt['ideal']),
+            [intern(text) for text in prompt['should']],
+            [intern(text) for text in prompt['should_not']],
+            intern(prompt['category']),
+        ])
+        row = report['results'].get(prompt_id, {})
+        packed_row = []
+        for model_id in report['models']:
+            result = row.get(model_id)
+            if result is None:
+                packed_row.append(None)
+                continue
+            packed_row.append([
+                result['score'],
+                1 if result['is_error'] else 0,
+                intern(result['output']),
+                criteria(result['passed']),
+                criteria(result['failed']),
+            ])
+        packed_results.append(packed_row)
+    
+    payload = json.dumps({'s': strings, 'm': model_refs, 'p': packed_prompts, 'r': packed_results, 'b': body, 'x': index},
+                         ensure_ascii=False, separators=(',', ':'))
+    return gzip.compress(payload.encode('utf-8'), compresslevel=9, mtime=0)
+
+def iter_report_body(report, model_headers, heatmap_mode):
+    """Inhalt des Containers (Kopf, Tabs, Leaderboards, Kategorien, Heatmap) als Fragmente"""
+    results = report['results']
+    models = report['models']
+    prompts = report['prompts']
+    prompts_data = report['prompts_data']
+    model_stats = report['model_stats']
+    consolidated_ranking = report['consolidated_ranking']
+    detailed_ranking = report['detailed_ranking']
+    category_best = report['category_best']
+    similarity = report.get('similarity')
+    significance = report.get('significance')
+    duplicates = report.get('duplicates')
+    criteria = report.get('criteria')
+    similarity_tab = ('''
+            <div class="tab" onclick="showTab('similarity')">🧭 Ähnlichkeit</div>''' if similarity else '')
+    duplicates_tab = ('''
+            <div class="tab" onclick="showTab('duplicates')">🔁 Duplikate</div>''' if duplicates and duplicates['groups'] else '')
+    criteria_tab = ('''
+            <div class="tab" onclick="showTab('criteria')">🎯 Kriterien</div>''' if criteria and criteria['criteria'] else '')
+    
+    yield f'''        <div class="header">
+            <h1>Mittelhochdeutsch Evaluation</h1>
+            <p>Übersetzungsqualität und Faktentreue - {len(prompts)} Prompts × {len(models)} Modelle</p>
+        </div>
+        
+        <div class="tabs">
+            <div class="tab active" onclick="showTab('leaderboard')">🏆 Leaderboard</div>
+            <div class="tab" onclick="showTab('detailed')">📋 Detailliert</div>
+            <div class="tab" onclick="showTab('categories')">📊 Kategorien</div>
+            <div class="tab" onclick="showTab('heatmap')">🔥 Heatmap</div>{similarity_tab}{duplicates_tab}{criteria_tab}
+        </div>
+        
+        <div id="leaderboard" class="tab-content active">
+            <h2 style="margin-bottom: 10px; color: #667eea;">🏆 Model Ranking</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                Beste Konfiguration pro Modell (von {len(detailed_ranking)} getesteten Konfigurationen)
+            </p>
+            <div class="leaderboard">
+'''
+    
+    # Consolidated Leaderboard
+    yield from iter_ranking_items(consolidated_ranking, significance, 'consolidated', medals=True)
+    
+    yield '''
+            </div>
+'''
+    if significance and 1 < len(consolidated_ranking) <= SIGNIFICANCE_MATRIX_MAX_CONFIGS:
+        yield render_significance_matrix(consolidated_ranking, significance)
+    
+    yield '''        </div>
+        
+        <div id="detailed" class="tab-content">
+            <h2 style="margin-bottom: 10px; color: #667eea;">📋 Alle Konfigurationen</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                Vergleich aller System-Prompt-Varianten pro Modell
+            </p>
+            <div class="leaderboard">
+'''
+    
+    # Detailed Leaderboard
+    yield from iter_ranking_items(detailed_ranking, significance, 'detailed')
+    
+    yield '''
+            </div>
+'''
+    if significance and 1 < len(detailed_ranking) <= SIGNIFICANCE_MATRIX_MAX_CONFIGS:
+        yield render_significance_matrix(detailed_ranking, significance)
+    
+    yield '''        </div>
+        
+        <div id="categories" class="tab-content">
+            <h2 style="margin-bottom: 20px; color: #667eea;">📊 Leistung nach Kategorien</h2>
+            <div class="category-grid">
+'''
+    
+    # Category Performance
+    yield render_category_cards(category_best, models, model_stats)
+    
+    yield '''
+            </div>
+        </div>
+        
+        <div id="heatmap" class="tab-content">
+            <h2 style="margin-bottom: 20px; color: #667eea;">🔥 Detaillierte Heatmap</h2>
+            <div class="heatmap-search">
+                <input type="search" id="heatmapSearch" placeholder="Suche in Prompts, Antworten und Kriterien, z.B. magedîn antwort:magd"
+                       oninput="searchHeatmap(this.value)">
+                <span id="heatmapSearchStatus"></span>
+            </div>
+            <div class="matrix-container">
+'''
+    
+    if heatmap_mode == 'virtual':
+        # Zellen baut das Script aus heatmapData, nur für den sichtbaren Ausschnitt
+        yield '''                <div class="virtual-heatmap" id="heatmapViewport">
+                    <div class="vh-spacer" id="heatmapSpacer"></div>
+                </div>
+'''
+    else:
+        yield '''                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Prompt</th>
+'''
+        
+        for header in model_headers:
+            yield f'                            <th>{header}</th>\n'
+        
+        yield '''
                         </tr>
                     </thead>
                     <tbody>
 '''
-    
-    # Heatmap rows
-    for prompt_id in prompts:
-        category = prompts_data[prompt_id]['category']
-        html += f'''
+        
+        # Heatmap rows
+        for prompt_id in prompts:
+            category = prompts_data[prompt_id]['category']
+            yield f'''
                         <tr>
                             <td class="prompt-cell">
                                 <div class="category-label">{category}</div>
                                 <div>{prompt_id}</div>
                             </td>
 '''
+            
+            for model_id in models:
+                if prompt_id in results and model_id in results[prompt_id]:
+                    result = results[prompt_id][model_id]
+                    score = result['score']
+                    color_class = get_color_class(score)
+                    score_display = f"{score:.0f}%" if score is not None else "N/A"
+                    
+                    yield f'                            <td class="score-cell {color_class}" onclick="showDetails(\'{prompt_id}\', \'{model_id}\')">{score_display}</td>\n'
+                else:
+                    yield '                            <td class="score-cell error">N/A</td>\n'
+            
+            yield '                        </tr>\n'
         
-        for model_id in models:
-            if prompt_id in results and model_id in results[prompt_id]:
-                result = results[prompt_id][model_id]
-                score = result['score']
-                color_class = get_color_class(score)
-                score_display = f"{score:.0f}%" if score is not None else "N/A"
-                
-                html += f'                            <td class="score-cell {color_class}" onclick="showDetails(\'{prompt_id}\', \'{model_id}\')">{score_display}</td>\n'
-            else:
-                html += '                            <td class="score-cell error">N/A</td>\n'
-        
-        html += '                        </tr>\n'
-    
-    html += '''
+        yield '''
                     </tbody>
                 </table>
-                
+'''
+    
+    yield '''                
                 <div class="legend">
                     <div class="legend-item">
                         <div class="legend-color excellent"></div>
@@ -764,8 +1300,511 @@ def create_html(data, output_path):
                 </div>
             </div>
         </div>
-    </div>
+'''
+    
+    if similarity:
+        yield from iter_similarity_tab(similarity, results, model_stats)
+    if duplicates and duplicates['groups']:
+        yield from iter_duplicates_tab(duplicates, model_stats)
+    if criteria and criteria['criteria']:
+        yield from iter_criteria_tab(criteria)
+
+def iter_similarity_tab(similarity, results, model_stats):
+    """Tab mit Ähnlichkeit zur Idealantwort, Clustern und auffälligen Antworten"""
+    def number(value, digits=3):
+        return '–' if value is None else f'{value:.{digits}f}'
     
+    correlation = similarity['rank_correlation']
+    yield f'''
+        <div id="similarity" class="tab-content">
+            <h2 style="margin-bottom: 10px; color: #667eea;">🧭 Ähnlichkeit zur Idealantwort</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                Embedding-Ähnlichkeit der Antworten zu IDEAL_BENCHMARK über den ganzen Run und je Prompt
+                {f'(Rangkorrelation mit dem Coverage-Score: ρ = {correlation:.2f})' if correlation is not None else ''}
+            </p>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th>#</th>
+                            <th class="prompt-header">Konfiguration</th>
+                            <th>Gesamt</th>
+                            <th>Ø Prompts</th>
+                            <th>σ</th>
+                            <th>Prompts</th>
+                            <th>Coverage</th>
+                            <th>Ausreißer</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+'''
+    
+    for idx, row in enumerate(similarity['ranking'], 1):
+        stats = model_stats[row['model']]
+        coverage = f'<td class="{get_color_class(stats["avg"])}">{stats["avg"]:.1f}%</td>' if stats['count'] else '<td class="error">–</td>'
+        yield f'''                        <tr>
+                            <td>{idx if row['overall'] is not None or row['mean'] is not None else '–'}</td>
+                            <td class="prompt-cell">{simplify_model_name(row['model'])}<br><small>{stats['sp_info']}</small></td>
+                            <td>{number(row['overall'])}</td>
+                            <td>{number(row['mean'])}</td>
+                            <td>{number(row['std'])}</td>
+                            <td>{row['prompts']}</td>
+                            {coverage}
+                            <td>{row['outliers'] or ''}</td>
+                        </tr>
+'''
+    
+    yield f'''
+                    </tbody>
+                </table>
+            </div>
+            
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Cluster ähnlicher Konfigurationen</h3>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                Average Linkage über die Gesamt-Matrix, zusammengefasst solange die mittlere Ähnlichkeit ≥ {similarity['threshold']:.2f} ist
+            </p>
+            <div class="category-grid">
+'''
+    
+    singles = [c['members'][0] for c in similarity['clusters'] if len(c['members']) == 1]
+    groups = [c for c in similarity['clusters'] if len(c['members']) > 1]
+    cards = [(f'Cluster {idx} ({len(c["members"])} Konfigurationen)', f'Ø Ähnlichkeit {number(c["cohesion"])}', c['members'])
+             for idx, c in enumerate(groups, 1)]
+    if singles:
+        cards.append(('Ohne Cluster', f'{len(singles)} Konfigurationen', singles))
+    if similarity['without_data']:
+        cards.append(('Keine Ähnlichkeitsdaten', 'z.B. nur fehlgeschlagene Antworten', similarity['without_data']))
+    for title, subtitle, members in cards:
+        yield f'''
+                <div class="category-card">
+                    <h3>{title}</h3>
+                    <div class="category-winner"><span>{subtitle}</span></div>
+                    <div style="margin-top: 15px; font-size: 0.9em;">
+'''
+        for model_id in members:
+            yield f'                        <div style="padding: 5px; margin: 3px 0; background: white; border-radius: 4px;">{simplify_model_name(model_id)} <small>{model_stats[model_id]["sp_info"]}</small></div>\n'
+        yield '                    </div>\n                </div>\n'
+    
+    yield '''
+            </div>
+'''
+    
+    if similarity['matrix'] is not None:
+        matrix_models = similarity['matrix_models']
+        off_diagonal = [v for a, row in enumerate(similarity['matrix']) for b, v in enumerate(row) if a != b and v is not None]
+        low, high = (min(off_diagonal), max(off_diagonal)) if off_diagonal else (0.0, 1.0)
+        yield '''
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Ähnlichkeitsmatrix (nach Clustern sortiert)</h3>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Konfiguration</th>
+'''
+        for model_id in matrix_models:
+            yield f'                            <th title="{model_id}">{simplify_model_name(model_id)}<br><small>{get_system_prompt_info(model_id)}</small></th>\n'
+        yield '''                        </tr>
+                    </thead>
+                    <tbody>
+'''
+        for a, model_id in enumerate(matrix_models):
+            yield f'                        <tr>\n                            <td class="prompt-cell">{simplify_model_name(model_id)}<br><small>{get_system_prompt_info(model_id)}</small></td>\n'
+            for b, value in enumerate(similarity['matrix'][a]):
+                if value is None:
+                    yield '                            <td class="error">–</td>\n'
+                    continue
+                shade = 1.0 if a == b else (value - low) / (high - low) if high > low else 0.5
+                yield f'                            <td style="background: rgba(102, 126, 234, {0.1 + 0.8 * shade:.2f});">{value:.2f}</td>\n'
+            yield '                        </tr>\n'
+        yield '''                    </tbody>
+                </table>
+            </div>
+'''
+    
+    yield f'''
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Auffällige Antworten</h3>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                {similarity['outlier_total']} Antworten ähneln den anderen Antworten ihres Prompts deutlich weniger als üblich
+                (robuster z-Wert ≤ -{SIMILARITY_OUTLIER_Z} über Median und MAD je Prompt); Klick öffnet die Details
+            </p>
+'''
+    
+    if similarity['outliers']:
+        yield '''            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Prompt</th>
+                            <th class="prompt-header">Konfiguration</th>
+                            <th>Ø zu anderen</th>
+                            <th>Median Prompt</th>
+                            <th>z</th>
+                            <th>zur Idealantwort</th>
+                            <th>Score</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+'''
+        for outlier in similarity['outliers']:
+            prompt_id, model_id = outlier['prompt'], outlier['model']
+            result = results.get(prompt_id, {}).get(model_id)
+            score = result['score'] if result else None
+            score_display = f"{score:.0f}%" if score is not None else "N/A"
+            yield f'''                        <tr style="cursor: pointer;" onclick="showDetails('{prompt_id}', '{model_id}')">
+                            <td class="prompt-cell">{prompt_id}</td>
+                            <td class="prompt-cell">{simplify_model_name(model_id)}<br><small>{get_system_prompt_info(model_id)}</small></td>
+                            <td>{outlier['peer']:.3f}</td>
+                            <td>{outlier['median']:.3f}</td>
+                            <td>{outlier['z']:.1f}</td>
+                            <td>{number(outlier['ideal'])}</td>
+                            <td class="{get_color_class(score)}">{score_display}</td>
+                        </tr>
+'''
+        yield '''                    </tbody>
+                </table>
+            </div>
+'''
+    
+    yield '''        </div>
+'''
+
+def iter_duplicates_tab(duplicates, model_stats):
+    """Tab mit Gruppen nahezu gleicher Antworten und häufig übereinstimmenden Konfigurationen"""
+    def configs(model_ids):
+        return ', '.join(f'{simplify_model_name(m)} <small>{get_system_prompt_info(m)}</small>' for m in model_ids)
+    
+    groups = duplicates['groups']
+    yield f'''
+        <div id="duplicates" class="tab-content">
+            <h2 style="margin-bottom: 10px; color: #667eea;">🔁 Nahezu gleiche Antworten</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                {len(groups)} Gruppen mit {duplicates['grouped']} von {duplicates['responses']} Antworten
+                ({duplicates['identical_groups']} davon wortgleich), geschätzte Jaccard-Ähnlichkeit ≥ {duplicates['threshold']:.2f}
+                über {duplicates['shingle']}-Zeichen-Shingles (MinHash, {duplicates['permutations']} Werte in {duplicates['bands']} Bändern).
+                Ein Judge könnte {duplicates['reusable']} Kriterien-Bewertungen aus der jeweils ersten Antwort der Gruppe übernehmen.
+            </p>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Prompt</th>
+                            <th class="prompt-header">Konfigurationen</th>
+                            <th>Ø Ähnlichkeit</th>
+                            <th>min</th>
+                            <th>Score-Spanne</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+'''
+    
+    for group in groups[:DUPLICATE_GROUPS_SHOWN]:
+        prompt_id = group['prompt']
+        if group['score_min'] is None:
+            spread = '<td class="error">N/A</td>'
+        else:
+            spread = (f'<td>{group["score_min"]:.0f}–{group["score_max"]:.0f}% '
+                      f'<small>(Δ {group["score_max"] - group["score_min"]:.0f})</small></td>')
+        yield f'''                        <tr style="cursor: pointer;" onclick="showDetails('{prompt_id}', '{group['models'][0]}')">
+                            <td class="prompt-cell">{prompt_id}</td>
+                            <td class="prompt-cell">{configs(group['models'])}</td>
+                            <td>{'wortgleich' if group['identical'] else f"{group['similarity']:.2f}"}</td>
+                            <td>{group['min_similarity']:.2f}</td>
+                            {spread}
+                        </tr>
+'''
+    
+    yield '''                    </tbody>
+                </table>
+            </div>
+'''
+    if len(groups) > DUPLICATE_GROUPS_SHOWN:
+        yield f'''            <p style="margin-top: 10px; color: #6c757d; font-size: 0.9em;">
+                … und {len(groups) - DUPLICATE_GROUPS_SHOWN} weitere Gruppen (sortiert nach Score-Spanne)
+            </p>
+'''
+    
+    if duplicates['pairs']:
+        yield '''
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Konfigurationen mit den meisten gleichen Antworten</h3>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Konfiguration</th>
+                            <th class="prompt-header">Konfiguration</th>
+                            <th>Prompts</th>
+                            <th>Ø Coverage</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+'''
+        for pair in duplicates['pairs']:
+            first, second = pair['models']
+            averages = ' / '.join(f"{model_stats[m]['avg']:.1f}%" if model_stats[m]['count'] else '–' for m in (first, second))
+            yield f'''                        <tr>
+                            <td class="prompt-cell">{configs([first])}</td>
+                            <td class="prompt-cell">{configs([second])}</td>
+                            <td>{pair['prompts']}</td>
+                            <td>{averages}</td>
+                        </tr>
+'''
+        yield '''                    </tbody>
+                </table>
+            </div>
+'''
+    
+    yield '''        </div>
+'''
+
+def iter_criteria_tab(criteria):
+    """Tab mit schwersten Kriterien, Trennschärfe und should_not-Fallen"""
+    def percent(value):
+        return '–' if value is None else f'{value * 100:.0f}%'
+    
+    def table(title, note, entries):
+        if not entries:
+            return
+        yield f'''
+            <h3 style="margin: 30px 0 5px; color: #667eea;">{title}</h3>
+            <p style="margin-bottom: 15px; color: #6c757d; font-size: 0.9em;">{note}</p>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Prompt</th>
+                            <th class="prompt-header">Kriterium</th>
+                            <th>Ø Erfüllung</th>
+                            <th>Erfüllt</th>
+                            <th>Nicht erfüllt</th>
+                            <th>Trennschärfe</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+'''
+        for entry in entries:
+            kind = '🚫 ' if entry['inverted'] else ''
+            discrimination = '–' if entry['discrimination'] is None else f"{entry['discrimination']:+.2f}"
+            yield f'''                        <tr style="cursor: pointer;" onclick="showDetails('{entry['prompt']}', '{entry['example']}')">
+                            <td class="prompt-cell">{entry['prompt']}</td>
+                            <td class="prompt-cell">{kind}{entry['text']}</td>
+                            <td class="{get_color_class(entry['fulfilment'] * 100)}">{percent(entry['fulfilment'])}</td>
+                            <td>{percent(entry['pass_rate'])}</td>
+                            <td>{entry['failed']} / {entry['configs']}</td>
+                            <td>{discrimination}</td>
+                        </tr>
+'''
+        yield '''                    </tbody>
+                </table>
+            </div>
+'''
+    
+    yield f'''
+        <div id="criteria" class="tab-content">
+            <h2 style="margin-bottom: 10px; color: #667eea;">🎯 Einzelkriterien über alle Konfigurationen</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                {criteria['criteria']} Kriterien ({criteria['should']} should, {criteria['should_not']} should_not) aus
+                {criteria['assessments']} Bewertungen, insgesamt {percent(criteria['pass_rate'])} erfüllt
+                (Erfüllungsgrad ≥ {criteria['threshold']:.1f}). Ø Erfüllung should: {percent(criteria['should_fulfilment'])},
+                should_not (Falle vermieden): {percent(criteria['should_not_fulfilment'])}.
+                Trennschärfe = Korrelation zwischen Kriterium und mittlerer Erfüllung der Konfiguration über alle
+                anderen Kriterien, berechnet für {criteria['discriminating']} Kriterien mit mindestens
+                {criteria['min_configs']} bewerteten Konfigurationen ({criteria['negative_total']} davon negativ).
+                Klick auf eine Zeile öffnet die Antwort mit dem niedrigsten Erfüllungsgrad.
+            </p>
+'''
+    yield from table('Schwerste Kriterien', 'should-Kriterien mit dem niedrigsten mittleren Erfüllungsgrad',
+                     criteria['hardest'])
+    yield from table('🚫 Schwerste should_not-Fallen',
+                     'should_not-Kriterien, bei denen die meisten Konfigurationen den unerwünschten Inhalt liefern',
+                     criteria['traps'])
+    yield from table('Trennschärfste Kriterien',
+                     'Kriterien, die starke und schwache Konfigurationen am deutlichsten unterscheiden',
+                     criteria['top_discrimination'])
+    yield from table('Negative Trennschärfe',
+                     'Kriterien, die eher schwache Konfigurationen erfüllen - Kriterium oder Bewertung prüfen',
+                     criteria['negative'])
+    
+    if criteria['config_traps']:
+        yield '''
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Konfigurationen mit den meisten should_not-Fallen</h3>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Konfiguration</th>
+                            <th>Gefallen</th>
+                            <th>Anteil</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+'''
+        for row in criteria['config_traps']:
+            yield f'''                        <tr>
+                            <td class="prompt-cell">{simplify_model_name(row['model'])} <small>{get_system_prompt_info(row['model'])}</small></td>
+                            <td>{row['falls']} / {row['assessed']}</td>
+                            <td>{percent(row['rate'])}</td>
+                        </tr>
+'''
+        yield '''                    </tbody>
+                </table>
+            </div>
+'''
+    
+    yield '''        </div>
+'''
+
+def render_html(report, output_path, details_mode='inline', heatmap_mode='auto'):
+    results = report['results']
+    models = report['models']
+    prompts = report['prompts']
+    prompts_data = report['prompts_data']
+    consolidated_ranking = report['consolidated_ranking']
+    detailed_ranking = report['detailed_ranking']
+    
+    print("Erstelle HTML...")
+    
+    # Simplified model names
+    model_headers = [simplify_model_name(m) for m in models]
+    
+    if heatmap_mode == 'auto':
+        heatmap_mode = 'virtual' if len(prompts) * len(models) > VIRTUAL_HEATMAP_CELLS else 'table'
+    if heatmap_mode == 'virtual':
+        extra_style = VIRTUAL_HEATMAP_STYLE
+        heatmap_script = ('        \n        const heatmapData = '
+                          + json.dumps(heatmap_payload(report, model_headers), ensure_ascii=False,
+                                       separators=(',', ':'))
+                          + ';\n' + VIRTUAL_HEATMAP_SCRIPT)
+    else:
+        extra_style = ''
+        heatmap_script = ''
+    
+    # Suchindex: eingebettet, im Blob (compact) oder als Shard beim ersten Suchen (lazy)
+    index = search_index(report)
+    search_index_url = None
+    if details_mode == 'compact':
+        embedded_index = None
+    elif details_mode == 'lazy':
+        embedded_index = None
+        search_index_url = write_search_shard(index, output_path)
+    else:
+        embedded_index = index
+    search_script = ('        \n        let searchIndex = '
+                     + json.dumps(embedded_index, ensure_ascii=False, separators=(',', ':'))
+                     + ';\n        const searchIndexUrl = ' + json.dumps(search_index_url, ensure_ascii=False)
+                     + ';' + SEARCH_SCRIPT)
+    
+    if details_mode == 'compact':
+        # Eine einzige Datei: Seiteninhalt und Details internieren, komprimieren und
+        # erst im Browser entpacken (der Blob steht unten anstelle des Containers)
+        data_script = ['''        const promptsData = {};
+        const resultsData = {};
+        
+        async function unpackData() {
+            const packedData = document.getElementById('packedData').textContent.trim();
+            const bytes = Uint8Array.from(atob(packedData), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            const packed = JSON.parse(await new Response(stream).text());
+            const s = packed.s;
+            searchIndex = packed.x;
+            const criteria = items => items.map(([text, score]) => ({text: s[text], score: score}));
+            packed.p.forEach(([id, description, prompt, ideal, should, shouldNot, category], i) => {
+                const promptId = s[id];
+                promptsData[promptId] = {
+                    description: s[description], prompt: s[prompt], ideal: s[ideal],
+                    should: should.map(k => s[k]), should_not: shouldNot.map(k => s[k]), category: s[category]
+                };
+                resultsData[promptId] = {};
+                packed.r[i].forEach((cell, j) => {
+                    if (cell === null) return;
+                    const [score, isError, output, passed, failed] = cell;
+                    resultsData[promptId][s[packed.m[j]]] = {
+                        score: score, output: s[output], passed: criteria(passed), failed: criteria(failed),
+                        is_error: isError === 1
+                    };
+                });
+            });
+            document.getElementById('reportContainer').innerHTML = packed.b;
+            if (window.initHeatmap) initHeatmap();
+        }
+        
+        unpackData().catch(error => {
+            document.getElementById('reportContainer').innerHTML =
+                '<p>Report konnte nicht entpackt werden (Browser mit DecompressionStream nötig): ' + error + '</p>';
+        });''']
+        details_loader = ''
+    elif details_mode == 'lazy':
+        # Nur die Scores stehen in der Seite, Details werden beim Klick nachgeladen
+        detail_shards = write_detail_shards(report, output_path)
+        data_script = ['''        const promptsData = {};
+        const resultsData = {};
+        const detailShards = ''' + json.dumps(detail_shards, ensure_ascii=False) + ''';
+        const pendingDetails = {};
+        
+        function registerDetails(promptId, promptData, promptResults) {
+            promptsData[promptId] = promptData;
+            resultsData[promptId] = promptResults;
+            (pendingDetails[promptId] || []).forEach(p => p.resolve());
+            delete pendingDetails[promptId];
+        }
+        
+        function loadDetails(promptId) {
+            return new Promise((resolve, reject) => {
+                if (promptId in resultsData) {
+                    resolve();
+                    return;
+                }
+                if (!pendingDetails[promptId]) {
+                    pendingDetails[promptId] = [];
+                    const script = document.createElement('script');
+                    script.src = detailShards[promptId];
+                    script.onerror = () => {
+                        (pendingDetails[promptId] || []).forEach(p => p.reject());
+                        delete pendingDetails[promptId];
+                        script.remove();
+                    };
+                    document.head.appendChild(script);
+                }
+                pendingDetails[promptId].push({resolve, reject});
+            });
+        }''']
+        details_loader = '''        
+        const renderDetails = showDetails;
+        showDetails = function(promptId, modelId) {
+            if (promptId in resultsData) {
+                renderDetails(promptId, modelId);
+                return;
+            }
+            document.getElementById('modalTitle').textContent = promptId;
+            document.getElementById('modalBody').innerHTML = '<p>Lade Details...</p>';
+            document.getElementById('detailModal').style.display = 'block';
+            loadDetails(promptId).then(
+                () => renderDetails(promptId, modelId),
+                () => {
+                    document.getElementById('modalBody').innerHTML =
+                        '<p>Details konnten nicht geladen werden: ' + detailShards[promptId] + '</p>';
+                });
+        };
+'''
+    else:
+        data_script = itertools.chain(['        const promptsData = '], iter_json_object(prompts_data),
+                                      [';\n        const resultsData = '], iter_json_object(results), [';'])
+        details_loader = ''
+    
+    # Build HTML: Kopf, Container, Modal und Script als Folge von Fragmenten
+    def iter_document(body):
+        yield f'''<!DOCTYPE html>
+<html lang="de">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Mittelhochdeutsch Evaluation - Vollständige Ergebnisse</title>
+    <style>
+{HTML_STYLE}{extra_style}    </style>
+</head>
+<body>
+'''
+        yield from body
+        yield '''    
     <div id="detailModal" class="modal">
         <div class="modal-content">
             <div class="modal-header">
@@ -777,8 +1816,9 @@ def create_html(data, output_path):
     </div>
     
     <script>
-        const promptsData = ''' + json.dumps(prompts_data, ensure_ascii=False) + ''';
-        const resultsData = ''' + json.dumps(results, ensure_ascii=False) + ''';
+'''
+        yield from data_script
+        yield '''
         
         function showTab(tabName) {
             document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
@@ -880,6 +1920,166 @@ def create_html(data, output_path):
                 closeModal();
             }
         });
+''' + details_loader + search_script + heatmap_script + '''    </script>
+</body>
+</html>'''
+    
+    if details_mode == 'compact':
+        # Seiteninhalt mit in den Blob packen, im HTML bleibt nur ein Platzhalter
+        packed = pack_report_payload(report, ''.join(iter_report_body(report, model_headers, heatmap_mode)), index)
+        packed_data = base64.b64encode(packed).decode('ascii')
+        body = ['    <div class="container" id="reportContainer">\n'
+                '        <p>Entpacke Report...</p>\n'
+                '    </div>\n'
+                '    <script type="application/octet-stream" id="packedData">\n',
+                '\n'.join(packed_data[i:i + 120] for i in range(0, len(packed_data), 120)),
+                '\n    </script>\n']
+    else:
+        body = itertools.chain(['    <div class="container">\n'],
+                               iter_report_body(report, model_headers, heatmap_mode),
+                               ['    </div>\n'])
+    
+    # Fragmente direkt in die (gepufferte) Datei schreiben, das Dokument liegt nie
+    # komplett im Speicher; erst am Ende ersetzt es eine vorhandene Ausgabe
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8', buffering=HTML_WRITE_BUFFER) as f:
+        f.writelines(iter_document(body))
+    os.replace(tmp_path, output_path)
+    
+    print("\nVisualisierung erstellt!")
+    print(f"{len(prompts)} Prompts x {len(models)} Modelle ({len(detailed_ranking)} Konfigurationen)")
+    print(f"Top 3: {', '.join([simplify_model_name(m) for m, _ in consolidated_ranking[:3]])}")
+    print(f"Datei: {output_path}")
+
+def create_aggregate_html(aggregator, output_path):
+    print("Berechne Statistiken...")
+    cube = aggregator.cube()
+    model_stats, consolidated_ranking, detailed_ranking, category_best = statistics_from_cube(cube)
+    significance = significance_statistics(cube, consolidated_ranking, detailed_ranking)
+    history = aggregator.history()
+    
+    print("Erstelle HTML...")
+    
+    html = f'''<!DOCTYPE html>
+<html lang="de">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Mittelhochdeutsch Evaluation - Zusammenfassung aller Runs</title>
+    <style>
+{HTML_STYLE}    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Mittelhochdeutsch Evaluation</h1>
+            <p>{len(history)} Runs - {len(cube.prompts)} Prompts × {len(cube.models)} Konfigurationen</p>
+        </div>
+        
+        <div class="tabs">
+            <div class="tab active" onclick="showTab('leaderboard')">🏆 Leaderboard</div>
+            <div class="tab" onclick="showTab('detailed')">📋 Detailliert</div>
+            <div class="tab" onclick="showTab('categories')">📊 Kategorien</div>
+            <div class="tab" onclick="showTab('history')">📈 Verlauf</div>
+        </div>
+        
+        <div id="leaderboard" class="tab-content active">
+            <h2 style="margin-bottom: 10px; color: #667eea;">🏆 Model Ranking (alle Runs)</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                Beste Konfiguration pro Modell, Scores je Prompt über alle Runs gemittelt
+            </p>
+            <div class="leaderboard">
+'''
+    html += ''.join(iter_ranking_items(consolidated_ranking, significance, 'consolidated', medals=True))
+    
+    html += '''
+            </div>
+'''
+    if 1 < len(consolidated_ranking) <= SIGNIFICANCE_MATRIX_MAX_CONFIGS:
+        html += render_significance_matrix(consolidated_ranking, significance)
+    html += '''        </div>
+        
+        <div id="detailed" class="tab-content">
+            <h2 style="margin-bottom: 10px; color: #667eea;">📋 Alle Konfigurationen</h2>
+            <div class="leaderboard">
+'''
+    html += ''.join(iter_ranking_items(detailed_ranking, significance, 'detailed'))
+    
+    html += '''
+            </div>
+'''
+    if 1 < len(detailed_ranking) <= SIGNIFICANCE_MATRIX_MAX_CONFIGS:
+        html += render_significance_matrix(detailed_ranking, significance)
+    html += '''        </div>
+        
+        <div id="categories" class="tab-content">
+            <h2 style="margin-bottom: 20px; color: #667eea;">📊 Leistung nach Kategorien</h2>
+            <div class="category-grid">
+'''
+    html += render_category_cards(category_best, cube.models, model_stats)
+    
+    html += '''
+            </div>
+        </div>
+        
+        <div id="history" class="tab-content">
+            <h2 style="margin-bottom: 20px; color: #667eea;">📈 Score-Verlauf pro Modell</h2>
+            <p style="margin-bottom: 20px; color: #6c757d; font-size: 0.95em;">
+                Durchschnitt der besten Konfiguration pro Modell und Run
+            </p>
+            <div class="matrix-container">
+                <table class="matrix-table">
+                    <thead>
+                        <tr>
+                            <th class="prompt-header">Modell</th>
+'''
+    for run in history:
+        html += f'                            <th>{run["label"]}<br><small>{run["timestamp"][:10]}</small></th>\n'
+    html += '                            <th>Δ</th>\n                        </tr>\n                    </thead>\n                    <tbody>\n'
+    
+    for model_id, stats in consolidated_ranking:
+        base_name = stats['base_name']
+        html += f'                        <tr>\n                            <td class="prompt-cell">{simplify_model_name(model_id)}</td>\n'
+        run_scores = []
+        for run in history:
+            if base_name in run['base_best']:
+                best_model, score = run['base_best'][base_name]
+                run_scores.append(score)
+                html += f'                            <td class="{get_color_class(score)}" title="{get_system_prompt_info(best_model)}">{score:.1f}%</td>\n'
+            else:
+                html += '                            <td class="error">–</td>\n'
+        delta = f'{run_scores[-1] - run_scores[0]:+.1f}' if len(run_scores) > 1 else '–'
+        html += f'                            <td>{delta}</td>\n                        </tr>\n'
+    
+    html += '''
+                    </tbody>
+                </table>
+            </div>
+            
+            <h3 style="margin: 30px 0 15px; color: #667eea;">Runs</h3>
+            <table class="matrix-table">
+                <thead>
+                    <tr><th class="prompt-header">Run</th><th>Zeitpunkt</th><th>Prompts</th><th>Konfigurationen</th><th class="prompt-header">Datei</th></tr>
+                </thead>
+                <tbody>
+'''
+    for run in history:
+        html += f'                    <tr><td class="prompt-cell">{run["label"]}</td><td>{run["timestamp"]}</td><td>{run["prompts"]}</td><td>{run["configs"]}</td><td class="prompt-cell">{run["source"]}</td></tr>\n'
+    
+    html += '''
+                </tbody>
+            </table>
+        </div>
+    </div>
+    
+    <script>
+        function showTab(tabName) {
+            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+            document.querySelectorAll('.tab-content').forEach(c => c.classList.remove('active'));
+            event.target.classList.add('active');
+            document.getElementById(tabName).classList.add('active');
+        }
     </script>
 </body>
 </html>'''
@@ -887,33 +2087,386 @@ def create_html(data, output_path):
     with open(output_path, 'w', encoding='utf-8') as f:
         f.write(html)
     
-    print("\nVisualisierung erstellt!")
-    print(f"{len(prompts)} Prompts x {len(models)} Modelle ({len(detailed_ranking)} Konfigurationen)")
+    print("\nZusammenfassung erstellt!")
+    print(f"{len(history)} Runs, {len(cube.prompts)} Prompts x {len(cube.models)} Konfigurationen")
     print(f"Top 3: {', '.join([simplify_model_name(m) for m, _ in consolidated_ranking[:3]])}")
     print(f"Datei: {output_path}")
 
+def load_run(json_path, member=None, judge_cache=None):
+    """Lädt einen Run und ergänzt fehlende Bewertungen aus dem Judge-Cache"""
+    data = load_comparison(json_path, member=member)
+    if judge_cache is not None:
+        print(f"Judge-Cache: {fill_coverage_from_judge_cache(data, judge_cache)} Zellen ergänzt")
+    return data
+
+def batch_output_path(json_path, output_dir):
+    return Path(output_dir) / f'{comparison_stem(json_path)}_visualization.html'
+
+def script_sources():
+    """Dieses Script und alle geladenen Module aus seinem Verzeichnis (mhd_text.py, report_statistics.py, ...)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = {os.path.abspath(__file__)}
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path and os.path.dirname(os.path.abspath(path)) == script_dir:
+            paths.add(os.path.abspath(path))
+    return [Path(path) for path in sorted(paths)]
+
+def is_up_to_date(json_path, output_path):
+    """Ausgabe ist neuer als die Eingabe und als Script und Module (Template- und Statistik-Änderungen)"""
+    try:
+        output_mtime = Path(output_path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    sources = (Path(json_path), *script_sources())
+    return all(output_mtime >= source.stat().st_mtime_ns for source in sources)
+
+def render_file(json_path, output_path, member=None, details_mode='inline', heatmap_mode='auto',
+                cache_dir=None, cache_max_bytes=CACHE_MAX_BYTES, prompt_index=None, judge_cache_path=None):
+    """Rendert eine Eingabedatei im Batch-Modus (auch in einem Worker-Prozess)
+
+    Die Ausgaben von render_html werden verschluckt, damit sich parallele Worker
+    nicht gegenseitig ins Terminal schreiben. Fehler werden nicht geworfen, sondern
+    im Ergebnis gemeldet.
+    """
+    start = time.perf_counter()
+    result = {'input': str(json_path), 'output': str(output_path), 'error': None}
+    try:
+        cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+        judge_cache = JudgeCache(judge_cache_path, readonly=True) if judge_cache_path is not None else None
+        with redirect_stdout(io.StringIO()):
+            report = cached(cache, json_path, index_kind('report', prompt_index, judge_cache),
+                            lambda: prepare_report(load_run(json_path, member, judge_cache), prompt_index),
+                            member)
+            render_html(report, output_path, details_mode, heatmap_mode)
+        result['cells'] = len(report['prompts']) * len(report['models'])
+        result['output_bytes'] = Path(output_path).stat().st_size
+    except Exception as exc:
+        result['error'] = f'{type(exc).__name__}: {exc}'
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def render_batch(json_paths, output_dir, jobs=None, force=False, **options):
+    """Rendert viele Eingaben parallel in einem Prozess-Pool
+
+    Ausgaben, die neuer als ihre Eingabe sind, werden übersprungen (außer mit force).
+    Ein Fehler in einer Datei bricht den Batch nicht ab, auch nicht der Absturz
+    eines Worker-Prozesses. Liefert die Liste der Ergebnisse von render_file.
+    """
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    pending = []
+    skipped = 0
+    for json_path in json_paths:
+        output_path = batch_output_path(json_path, output_dir)
+        if not force and is_up_to_date(json_path, output_path):
+            skipped += 1
+        else:
+            pending.append((json_path, output_path))
+    # Große Dateien zuerst, damit am Ende keine einzelne lange Datei übrig bleibt
+    pending.sort(key=lambda item: item[0].stat().st_size, reverse=True)
+    input_bytes = sum(json_path.stat().st_size for json_path, _ in pending)
+    print(f"{len(json_paths)} Dateien: {len(pending)} zu rendern, {skipped} aktuell "
+          f"({min(jobs, len(pending)) if pending else 0} Prozesse)")
+    
+    results = []
+    
+    def report_result(result):
+        results.append(result)
+        status = f"FEHLER {result['error']}" if result['error'] else f"{result['output_bytes'] / 1e6:.1f} MB"
+        print(f"[{len(results)}/{len(pending)}] {result['input']} ({result['seconds']:.1f}s): {status}")
+    
+    if jobs == 1 or len(pending) <= 1:
+        for json_path, output_path in pending:
+            report_result(render_file(json_path, output_path, **options))
+    else:
+        broken = []
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            futures = {pool.submit(render_file, json_path, output_path, **options): (json_path, output_path)
+                       for json_path, output_path in pending}
+            for future in as_completed(futures):
+                try:
+                    report_result(future.result())
+                except BrokenProcessPool:
+                    broken.append(futures[future])
+        # Ein abgestürzter Worker (z.B. OOM-Kill) reißt alle offenen Aufträge mit;
+        # diese einzeln in eigenen Prozessen wiederholen, um den Verursacher zu isolieren
+        for json_path, output_path in broken:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                try:
+                    result = pool.submit(render_file, json_path, output_path, **options).result()
+                except BrokenProcessPool as exc:
+                    result = {'input': str(json_path), 'output': str(output_path),
+                              'error': f'Worker-Prozess abgebrochen ({exc})', 'seconds': 0.0}
+            report_result(result)
+    
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r['error']]
+    rendered = len(results) - len(failed)
+    print(f"\nBatch fertig in {elapsed:.1f}s: {rendered} gerendert, {skipped} übersprungen, {len(failed)} fehlgeschlagen")
+    if rendered and elapsed > 0:
+        cells = sum(r['cells'] for r in results if not r['error'])
+        output_bytes = sum(r['output_bytes'] for r in results if not r['error'])
+        print(f"Durchsatz: {rendered / elapsed:.2f} Dateien/s, {input_bytes / 1e6 / elapsed:.1f} MB/s Eingabe, "
+              f"{cells / elapsed:.0f} Zellen/s, {output_bytes / 1e6:.1f} MB HTML")
+    for result in failed:
+        print(f"  {result['input']}: {result['error']}")
+    return results
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python create_complete_visualization.py <path_to_comparison_json>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='Erstellt die HTML-Visualisierung aus einer Weval-Comparison-JSON.')
+    parser.add_argument('inputs', nargs='+',
+                        help='Comparison-JSON, auch komprimiert (.zip, .gz, .bz2, .xz); '
+                             'mit --aggregate auch mehrere Dateien, Verzeichnisse oder Glob-Muster')
+    parser.add_argument('--member',
+                        help='Name oder Glob-Muster des JSON-Eintrags in einem .zip-Archiv')
+    parser.add_argument('--aggregate', action='store_true',
+                        help='Alle Runs zu einem gemeinsamen Leaderboard mit Score-Verlauf zusammenführen')
+    parser.add_argument('--batch', action='store_true',
+                        help='Jede Eingabe (Dateien, Verzeichnisse, Glob-Muster) als eigenen Report rendern, '
+                             'parallel in einem Prozess-Pool')
+    parser.add_argument('-j', '--jobs', type=int,
+                        help=f'Anzahl paralleler Prozesse im Batch-Modus (Standard: {os.cpu_count()})')
+    parser.add_argument('--force', action='store_true',
+                        help='Im Batch-Modus auch Reports neu rendern, die neuer als ihre Eingabe sind')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Ziel-HTML (Standard: results/<name>_visualization.html); '
+                             'mit --batch das Ausgabeverzeichnis')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Cache für extrahierte Daten und Statistiken nicht verwenden')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR,
+                        help=f'Cache-Verzeichnis (Standard: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-max-mb', type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+                        help='Maximale Cache-Größe in MB, älteste Einträge werden zuerst gelöscht')
+    details_group = parser.add_mutually_exclusive_group()
+    details_group.add_argument('--lazy-details', dest='details_mode', action='store_const', const='lazy',
+                               help='Nur Scores in die Seite einbetten; Antworten und Kriterien als Shards '
+                                    '(<name>_details/) schreiben und beim Klick auf eine Zelle nachladen')
+    details_group.add_argument('--compact', dest='details_mode', action='store_const', const='compact',
+                               help='Einzelne, kleine HTML-Datei: Details mit internierten Strings '
+                                    'gzip-komprimiert einbetten und im Browser entpacken')
+    parser.set_defaults(details_mode='inline')
+    parser.add_argument('--heatmap', choices=('auto', 'table', 'virtual'), default='auto',
+                        help='Heatmap als Tabelle oder virtualisiert (nur sichtbare Zellen im DOM); '
+                             f'auto wählt ab {VIRTUAL_HEATMAP_CELLS} Zellen die virtualisierte Variante')
+    parser.add_argument('--prompt-index', type=Path,
+                        help='Mit compile_blueprint.py kompilierter Blueprint-Index: Kategorien und fehlende '
+                             'Prompt-Felder kommen aus dem Blueprint statt aus den Prompt-IDs')
+    parser.add_argument('--judge-cache', action='store_true',
+                        help=f'Fehlende LLM-Bewertungen aus dem Judge-Cache von run_evaluation.py ergänzen '
+                             f'(<cache-dir>/{JUDGE_CACHE_NAME}); vorhandene Scores bleiben unverändert')
+    parser.add_argument('--from-db', type=Path, metavar='DB',
+                        help='Run aus einer mit export_results_db.py geschriebenen SQLite-Datenbank rendern; '
+                             "die Eingabe ist dann Run-ID, 'latest' (jüngster timestamp), Dateiname der Quelle oder runLabel")
+    parser.add_argument('--profile', action='store_true',
+                        help='Phasen (Laden, Extraktion, Statistik, Rendern) messen: Wand- und CPU-Zeit, Peak-RSS, '
+                             'Objektzahlen; Bericht als <name>_profile.json neben der HTML-Datei')
+    parser.add_argument('--cprofile', action='store_true',
+                        help='Mit --profile: cProfile über den ganzen Lauf (<name>_profile.prof, Top-Funktionen im Bericht)')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Mit --profile: Python-Heap per tracemalloc je Phase und Snapshot-Dump '
+                             '(<name>_profile_tracemalloc.dump); verlangsamt den Lauf deutlich')
+    parser.add_argument('--follow', action='store_true',
+                        help='JSON-Lines eines laufenden Runs (run_evaluation.py --jsonl) weiter verfolgen: '
+                             'Statistiken mit jeder Zelle aktualisieren, Report regelmäßig neu rendern, '
+                             "bis der Run endet (Strg+C bricht ab)")
+    parser.add_argument('--render-interval', type=float, default=JSONL_RENDER_INTERVAL,
+                        help=f'Mit --follow höchstens alle N Sekunden neu rendern (Standard: {JSONL_RENDER_INTERVAL:.0f})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Nur gegenüber dem letzten Render dieser Ausgabedatei geänderte Zellen neu '
+                             'berechnen und einen Änderungsbericht (<name>_changes.json) schreiben')
+    args = parser.parse_args()
     
-    json_path = Path(sys.argv[1])
-    if not json_path.exists():
-        print(f"Error: File not found at {json_path}")
-        sys.exit(1)
+    if args.aggregate and args.batch:
+        parser.error('--aggregate und --batch schließen sich aus')
+    if not (args.aggregate or args.batch) and len(args.inputs) > 1:
+        parser.error('mehrere Eingaben nur mit --aggregate oder --batch')
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs muss mindestens 1 sein')
+    if args.from_db and (args.aggregate or args.batch):
+        parser.error('--from-db rendert einen einzelnen Run und ist nicht mit --aggregate oder --batch kombinierbar')
+    if (args.cprofile or args.tracemalloc) and not args.profile:
+        parser.error('--cprofile und --tracemalloc nur zusammen mit --profile')
+    if args.profile and args.batch:
+        parser.error('--profile misst einen einzelnen Prozess und ist nicht mit --batch kombinierbar')
+    jsonl_input = (not (args.aggregate or args.batch or args.from_db)
+                   and Path(args.inputs[0]).suffix.lower() == JSONL_SUFFIX)
+    if args.follow and not jsonl_input:
+        parser.error(f'--follow nur mit einer einzelnen {JSONL_SUFFIX}-Eingabe')
+    if jsonl_input and (args.incremental or args.profile or args.judge_cache):
+        parser.error(f'{JSONL_SUFFIX}-Eingaben sind nicht mit --incremental, --profile oder --judge-cache kombinierbar')
+    if args.incremental and args.batch:
+        parser.error('--incremental ist nicht mit --batch kombinierbar')
+    if args.incremental and (args.aggregate or args.no_cache):
+        parser.error('--incremental speichert den vorherigen Stand im Cache und ist nicht mit '
+                     '--aggregate oder --no-cache kombinierbar')
+    
+    profiler = PhaseProfiler(args.cprofile, args.tracemalloc) if args.profile else None
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    # Mit --profile sollen Laden, Extraktion und Statistik gemessen werden, nicht ein Cache-Treffer
+    report_cache = cache if profiler is None else None
+    if profiler is not None and cache is not None and not args.incremental:
+        print("--profile: Report-Cache wird umgangen, alle Phasen werden gemessen")
+    prompt_index = None
+    if args.prompt_index:
+        try:
+            prompt_index = load_prompt_index(args.prompt_index)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as exc:
+            print(f"Error: Prompt-Index {args.prompt_index} konnte nicht gelesen werden: {exc}")
+            sys.exit(1)
+    judge_cache = None
+    if args.judge_cache:
+        if args.aggregate:
+            parser.error('--judge-cache ist nicht mit --aggregate kombinierbar (dort werden keine Antworten geladen)')
+        try:
+            judge_cache = JudgeCache(args.cache_dir / JUDGE_CACHE_NAME, readonly=True)
+            judge_cache.fingerprint()
+        except sqlite3.Error as exc:
+            print(f"Error: Judge-Cache {args.cache_dir / JUDGE_CACHE_NAME} konnte nicht gelesen werden: {exc}")
+            sys.exit(1)
     
     # Output in results-Verzeichnis neben dem Script
     script_dir = Path(__file__).parent
     output_dir = script_dir / 'results'
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_html_path = output_dir / f'{json_path.stem}_visualization.html'
     
-    print("Lade JSON-Daten...")
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if args.aggregate:
+        try:
+            json_paths = expand_inputs(args.inputs)
+        except FileNotFoundError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        
+        aggregator = RunAggregator()
+        for json_path in json_paths:
+            def summarize():
+                mark_phase(profiler, 'load', json_path)
+                print(f"Lade {json_path}...")
+                return RunAggregator.summarize_run(
+                    load_comparison(json_path, AGGREGATE_FIELDS, member=args.member), json_path, prompt_index)
+            try:
+                summary = cached(report_cache, json_path, index_kind('run', prompt_index), summarize, args.member,
+                                 profiler)
+            except (ValueError, zipfile.BadZipFile, OSError, EOFError) as exc:
+                print(f"Error: {json_path} konnte nicht gelesen werden: {exc}")
+                sys.exit(1)
+            aggregator.add_summary(summary)
+        
+        output_html_path = args.output or output_dir / 'aggregate_visualization.html'
+        mark_phase(profiler, 'render')
+        create_aggregate_html(aggregator, output_html_path)
+        if profiler is not None:
+            profiler.counts['runs'] = len(json_paths)
+            write_profile(profiler, output_html_path, 'aggregate', json_paths,
+                          report_cache='bypassed' if cache is not None else 'off')
+        return
+    
+    if args.batch:
+        try:
+            json_paths = expand_inputs(args.inputs)
+        except FileNotFoundError as exc:
+            print(f"Error: {exc}")
+            sys.exit(1)
+        batch_dir = args.output or output_dir
+        batch_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Gleiche Namen aus verschiedenen Verzeichnissen würden dieselbe Ausgabe überschreiben
+        outputs = defaultdict(list)
+        for json_path in json_paths:
+            outputs[batch_output_path(json_path, batch_dir)].append(json_path)
+        collisions = [paths for paths in outputs.values() if len(paths) > 1]
+        if collisions:
+            print("Error: mehrere Eingaben ergeben dieselbe Ausgabedatei: "
+                  + '; '.join(', '.join(map(str, paths)) for paths in collisions))
+            sys.exit(1)
+        
+        results = render_batch(json_paths, batch_dir, jobs=args.jobs, force=args.force,
+                               member=args.member, details_mode=args.details_mode, heatmap_mode=args.heatmap,
+                               cache_dir=None if args.no_cache else args.cache_dir,
+                               cache_max_bytes=args.cache_max_mb * 1024 * 1024, prompt_index=prompt_index,
+                               judge_cache_path=judge_cache and judge_cache.path)
+        if any(result['error'] for result in results):
+            sys.exit(1)
+        return
+    
+    if args.from_db:
+        try:
+            database = ResultsDatabase(args.from_db, readonly=True)
+            run = database.find_run(args.inputs[0])
+        except (sqlite3.Error, ValueError, LookupError) as exc:
+            print(f"Error: {args.from_db} konnte nicht gelesen werden: {exc}")
+            sys.exit(1)
+        json_path = Path(run['source'])
+        
+        def load():
+            data = database.load_run(run['run_id'], judgements=False)
+            if judge_cache is not None:
+                print(f"Judge-Cache: {fill_coverage_from_judge_cache(data, judge_cache)} Zellen ergänzt")
+            return data
+    else:
+        json_path = Path(args.inputs[0])
+        if not json_path.exists():
+            print(f"Error: File not found at {json_path}")
+            sys.exit(1)
+        
+        def load():
+            return load_run(json_path, args.member, judge_cache)
     
-    create_html(data, output_html_path)
+    output_html_path = args.output or output_dir / f'{comparison_stem(json_path)}_visualization.html'
+    
+    if jsonl_input:
+        def render(report):
+            render_html(report, output_html_path, args.details_mode, args.heatmap)
+        try:
+            follow_jsonl(json_path, render, prompt_index, args.follow, args.render_interval)
+        except (ValueError, OSError) as exc:
+            print(f"Error: {json_path} konnte nicht gelesen werden: {exc}")
+            sys.exit(1)
+        return
+    
+    if args.incremental:
+        # Zustand des letzten Renders dieser Ausgabedatei
+        state_key = f'state-v{CACHE_SCHEMA_VERSION}-' + hashlib.sha256(
+            str(output_html_path.resolve()).encode('utf-8')).hexdigest()[:32]
+        mark_phase(profiler, 'load')
+        print("Lade JSON-Daten...")
+        try:
+            data = load()
+        except (ValueError, zipfile.BadZipFile, OSError, EOFError, sqlite3.Error) as exc:
+            print(f"Error: {json_path} konnte nicht gelesen werden: {exc}")
+            sys.exit(1)
+        mark_phase(profiler, 'cache-load')
+        previous = cache.get(state_key)
+        report, state, changes = prepare_report_incremental(data, previous, prompt_index, profiler)
+        del data, previous
+        mark_phase(profiler, 'cache-store')
+        cache.put(state_key, state)
+        mark_phase(profiler, 'render')
+        write_change_report(changes, output_html_path.with_name(f'{output_html_path.stem}_changes.json'))
+        render_html(report, output_html_path, args.details_mode, args.heatmap)
+        if profiler is not None:
+            write_profile(profiler, output_html_path, 'incremental', [args.from_db or json_path], report,
+                          previous_state=changes['has_previous'])
+        return
+    
+    def prepare():
+        mark_phase(profiler, 'load')
+        print(f"Lade Run {run['run_id']} aus {args.from_db}..." if args.from_db else "Lade JSON-Daten...")
+        return prepare_report(load(), prompt_index, profiler)
+    try:
+        # Der Report-Cache ist an die Eingabedatei gebunden; die Datenbank ist selbst schon schnell
+        report = cached(None if args.from_db else report_cache, json_path,
+                        index_kind('report', prompt_index, judge_cache), prepare, args.member, profiler)
+    except (ValueError, zipfile.BadZipFile, OSError, EOFError, sqlite3.Error) as exc:
+        print(f"Error: {json_path} konnte nicht gelesen werden: {exc}")
+        sys.exit(1)
+    
+    mark_phase(profiler, 'render')
+    render_html(report, output_html_path, args.details_mode, args.heatmap)
+    if profiler is not None:
+        write_profile(profiler, output_html_path, 'single', [args.from_db or json_path], report,
+                      report_cache='bypassed' if cache is not None and not args.from_db else 'off')
 
 if __name__ == "__main__":
     main()
-
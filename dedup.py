@@ -0,0 +1,262 @@
+"""Nahezu gleiche Antworten finden: MinHash-Signaturen und LSH über Zeichen-Shingles
+
+duplicate_statistics gruppiert die Antworten je Prompt für den Duplikate-Tab der
+Visualisierung; minhash_signatures und MinHashLSH sind davon unabhängig nutzbar.
+"""
+
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+# Nahezu gleiche Antworten: MinHash über Zeichen-Shingles, LSH-Bänder liefern Kandidaten,
+# bestätigt wird über den aus den Signaturen geschätzten Jaccard-Wert
+DUPLICATE_SHINGLE = 5
+# Signaturlänge (Zweierpotenz: die oberen Bits eines Shingle-Hashes wählen die Position)
+DUPLICATE_PERMUTATIONS = 128
+# 32 Bänder × 4 Positionen: Kandidat ab Jaccard ≈ 0,42 (Wahrscheinlichkeit 1 - (1 - J^4)^32)
+DUPLICATE_BANDS = 32
+DUPLICATE_THRESHOLD = 0.8
+DUPLICATE_SEED = 0
+DUPLICATE_GROUPS_SHOWN = 50
+DUPLICATE_PAIRS_SHOWN = 20
+
+# Rollender Hash und Finalizer, auch für die Wörter des Suchindex der Visualisierung
+HASH_MULTIPLIER = np.uint64(1000003)
+_MIX_MULTIPLIER = np.uint64(0xff51afd7ed558ccd)
+_MIX_SHIFT = np.uint64(33)
+_EMPTY_BIN = np.uint64(2 ** 64 - 1)
+
+def mix64(values):
+    """Finalizer aus MurmurHash3: ähnliche Eingaben ergeben unabhängige Hashes"""
+    values = values ^ (values >> _MIX_SHIFT)
+    values *= _MIX_MULTIPLIER
+    return values ^ (values >> _MIX_SHIFT)
+
+def minhash_signatures(texts, num_perm=DUPLICATE_PERMUTATIONS, k=DUPLICATE_SHINGLE, seed=DUPLICATE_SEED):
+    """MinHash-Signaturen (Texte × num_perm) über die Zeichen-k-Gramme aller Texte auf einmal
+
+    Die Texte werden normalisiert (casefold, Leerraum zusammengefasst) und,
+    getrennt durch NUL, als ein Array von Codepoints gehasht; k-Gramme über eine
+    Textgrenze fallen weg. One Permutation Hashing: statt num_perm Hashes pro
+    Shingle wählen die oberen Bits eines Hashes die Position, dort zählt das
+    Minimum. Leere Positionen (kurze Texte) übernehmen den Wert der nächsten
+    belegten Position (Rotation), damit gleiche Texte gleiche Signaturen haben.
+    """
+    bits = num_perm.bit_length() - 1
+    if num_perm != 1 << bits:
+        raise ValueError(f'num_perm muss eine Zweierpotenz sein, nicht {num_perm}')
+    # Kurze Texte auffüllen, damit jeder Text mindestens ein k-Gramm hat
+    joined = '\x00'.join(text.replace('\x00', ' ') if len(text) >= 2 * k
+                         else ' '.join(text.replace('\x00', ' ').split()).ljust(k, '\x01') for text in texts)
+    joined = ' '.join(joined.casefold().split()).replace(' \x00', '\x00').replace('\x00 ', '\x00').strip()
+    codes = np.frombuffer((joined + '\x00').encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    text_id = np.cumsum(codes == 0) - (codes == 0)
+    n = max(len(codes) - k + 1, 0)
+    hashes = np.full(n, np.uint64(seed))
+    for t in range(k):
+        hashes = hashes * HASH_MULTIPLIER + codes[t:t + n]
+    hashes = mix64(hashes)
+    # Nur k-Gramme ohne Trennzeichen: gleiche Text-ID am Anfang und Ende, Ende kein NUL
+    inside = (text_id[:n] == text_id[k - 1:]) & (codes[k - 1:] != 0)
+    hashes, owner = hashes[inside], text_id[:n][inside]
+    
+    signatures = np.full(len(texts) * num_perm, _EMPTY_BIN)
+    np.minimum.at(signatures, owner * num_perm + (hashes >> np.uint64(64 - bits)).astype(np.int64), hashes)
+    signatures = signatures.reshape(len(texts), num_perm)
+    empty = signatures == _EMPTY_BIN
+    filled = signatures.copy()
+    # Texte ganz aus Leerraum haben kein k-Gramm
+    blank = empty.all(axis=1)
+    filled[blank] = 0
+    empty[blank] = False
+    shift = 1
+    while empty.any():
+        neighbour = np.roll(signatures, -shift, axis=1)
+        take = empty & (neighbour != _EMPTY_BIN)
+        filled[take] = mix64(neighbour[take] + np.uint64(shift))
+        empty &= ~take
+        shift += 1
+    return filled
+
+class MinHashLSH:
+    """Findet nahezu gleiche Texte, ohne alle Paare zu vergleichen
+
+    Der Anteil gleicher Positionen zweier MinHash-Signaturen schätzt die
+    Jaccard-Ähnlichkeit ihrer Shingle-Mengen. Die Signaturen werden in Bänder
+    zerlegt; Texte mit einem gleichen Band (im selben scope, z.B. Prompt) sind
+    Kandidaten und werden mit dem ersten Text ihres Buckets verglichen. Der
+    Aufwand wächst damit linear mit der Zahl der Texte statt mit der der Paare.
+    """
+
+    def __init__(self, num_perm=DUPLICATE_PERMUTATIONS, bands=DUPLICATE_BANDS, seed=DUPLICATE_SEED):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+        self.keys = []
+        self._texts = []
+        self._scopes = []
+        self._scope_ids = {}
+        self.signatures = None
+        rng = np.random.default_rng(seed)
+        self._band_multipliers = rng.integers(1, 2 ** 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+    def add(self, key, text, scope=None):
+        self.keys.append(key)
+        self._texts.append(text)
+        self._scopes.append(self._scope_ids.setdefault(scope, len(self._scope_ids)))
+        self.signatures = None
+        return len(self.keys) - 1
+
+    def _band_hashes(self, signatures):
+        banded = signatures.reshape(len(signatures), self.bands, self.rows)
+        return mix64((banded * self._band_multipliers).sum(axis=2, dtype=np.uint64))
+
+    def _build(self):
+        if self.signatures is None:
+            self.signatures = minhash_signatures(self._texts, self.num_perm, seed=self.seed)
+            self._scope_array = np.array(self._scopes, dtype=np.int64)
+            self._bands = self._band_hashes(self.signatures)
+
+    def similarity(self, i, j):
+        """Geschätzte Jaccard-Ähnlichkeit zweier eingefügter Texte"""
+        self._build()
+        return float((self.signatures[i] == self.signatures[j]).mean())
+
+    def candidate_pairs(self):
+        """(i, j)-Arrays: jeder Text eines Buckets mit dem ersten Text dieses Buckets"""
+        self._build()
+        if not self.keys:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        pairs = set()
+        scope_key = self._scope_array.astype(np.uint64) * _MIX_MULTIPLIER
+        for band in range(self.bands):
+            keys = self._bands[:, band] ^ scope_key
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]]))
+            first = np.repeat(order[starts], np.diff(np.append(starts, len(order))))
+            candidate = order != first
+            pairs.update(zip(first[candidate].tolist(), order[candidate].tolist()))
+        if not pairs:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        first, other = np.array(sorted(pairs), dtype=np.intp).T
+        same_scope = self._scope_array[first] == self._scope_array[other]
+        return first[same_scope], other[same_scope]
+
+    def query(self, text, scope=None, threshold=DUPLICATE_THRESHOLD):
+        """Ähnlichster eingefügter Text desselben scope als (key, Ähnlichkeit) ab threshold, sonst None
+
+        Damit lassen sich z.B. Judge-Urteile einer schon bewerteten, nahezu
+        gleichen Antwort desselben Prompts wiederverwenden.
+        """
+        self._build()
+        if scope not in self._scope_ids or not self.keys:
+            return None
+        signature = minhash_signatures([text], self.num_perm, seed=self.seed)
+        candidates = np.flatnonzero((self._bands == self._band_hashes(signature)).any(axis=1)
+                                    & (self._scope_array == self._scope_ids[scope]))
+        if not len(candidates):
+            return None
+        agreement = (self.signatures[candidates] == signature).mean(axis=1)
+        best = int(np.argmax(agreement))
+        if agreement[best] < threshold:
+            return None
+        return self.keys[candidates[best]], float(agreement[best])
+
+    def groups(self, threshold=DUPLICATE_THRESHOLD):
+        """Gruppen (Listen von Indizes, in Einfügereihenfolge), verbunden über Paare mit Ähnlichkeit ≥ threshold"""
+        first, other = self.candidate_pairs()
+        agreement = (self.signatures[first] == self.signatures[other]).mean(axis=1)
+        parent = list(range(len(self.keys)))
+        
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        for a, b in zip(first[agreement >= threshold].tolist(), other[agreement >= threshold].tolist()):
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        groups = defaultdict(list)
+        for i in range(len(self.keys)):
+            groups[find(i)].append(i)
+        return [members for members in groups.values() if len(members) > 1]
+
+def duplicate_statistics(results, models, prompts, prompts_data, threshold=DUPLICATE_THRESHOLD,
+                         previous=None, reuse=()):
+    """Gruppen nahezu gleicher Antworten je Prompt über alle Konfigurationen
+
+    Fehlgeschlagene und leere Antworten zählen nicht. Je Gruppe: Ähnlichkeit
+    (Mittel und Minimum der Paare) und die Spanne der Scores; weichen nahezu
+    gleiche Antworten im Score stark ab, bewerten die Judges uneinheitlich.
+    'reusable' zählt die Kriterien-Bewertungen, die ein Judge-Lauf innerhalb
+    der Gruppen wiederverwenden könnte. Gruppen hängen nur an den Antworten
+    ihres Prompts: für die Prompts in reuse werden sie aus previous (einem
+    früheren Ergebnis mit denselben Konfigurationen) übernommen statt neu gehasht.
+    """
+    lsh = MinHashLSH()
+    for prompt_id in prompts:
+        if prompt_id in reuse:
+            continue
+        row = results.get(prompt_id, {})
+        for model_id in models:
+            cell = row.get(model_id)
+            if cell is None or cell['is_error'] or not cell['output'].strip():
+                continue
+            lsh.add((prompt_id, model_id), cell['output'], scope=prompt_id)
+    
+    by_prompt = {prompt_id: previous['by_prompt'][prompt_id] if prompt_id in reuse else {'responses': 0, 'groups': []}
+                 for prompt_id in prompts}
+    for prompt_id, _ in lsh.keys:
+        by_prompt[prompt_id]['responses'] += 1
+    for members in lsh.groups(threshold):
+        prompt_id = lsh.keys[members[0]][0]
+        group_models = [lsh.keys[i][1] for i in members]
+        signatures = lsh.signatures[members]
+        agreement = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)[np.triu_indices(len(members), 1)]
+        outputs = {results[prompt_id][m]['output'] for m in group_models}
+        scores = [results[prompt_id][m]['score'] for m in group_models if results[prompt_id][m]['score'] is not None]
+        by_prompt[prompt_id]['groups'].append({
+            'prompt': prompt_id,
+            'models': group_models,
+            'similarity': float(agreement.mean()),
+            'min_similarity': float(agreement.min()),
+            'identical': len(outputs) == 1,
+            'score_min': min(scores) if scores else None,
+            'score_max': max(scores) if scores else None,
+        })
+    
+    groups = [group for prompt_id in prompts for group in by_prompt[prompt_id]['groups']]
+    pairs = defaultdict(int)
+    reusable = 0
+    for group in groups:
+        prompt = prompts_data[group['prompt']]
+        reusable += (len(group['models']) - 1) * (len(prompt['should']) + len(prompt['should_not']))
+        for a, b in itertools.combinations(group['models'], 2):
+            pairs[(a, b)] += 1
+    
+    def spread(group):
+        if group['score_min'] is None:
+            return -1.0
+        return group['score_max'] - group['score_min']
+    
+    prompt_order = {prompt_id: i for i, prompt_id in enumerate(prompts)}
+    groups.sort(key=lambda g: (-spread(g), -len(g['models']), prompt_order[g['prompt']]))
+    return {
+        'threshold': threshold,
+        'shingle': DUPLICATE_SHINGLE,
+        'permutations': lsh.num_perm,
+        'bands': lsh.bands,
+        'responses': sum(entry['responses'] for entry in by_prompt.values()),
+        'grouped': sum(len(g['models']) for g in groups),
+        'identical_groups': sum(1 for g in groups if g['identical']),
+        'reusable': reusable,
+        'groups': groups,
+        'pairs': [{'models': list(pair), 'prompts': count}
+                  for pair, count in sorted(pairs.items(), key=lambda item: (-item[1], item[0]))[:DUPLICATE_PAIRS_SHOWN]],
+        'by_prompt': by_prompt,
+    }
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Exportiert Runs (Comparison-JSONs) in eine indizierte SQLite-Datenbank
+
+Jeder Run wird in normalisierte Tabellen (runs, configs, prompts, criteria,
+cells, assessments, judgements, Ähnlichkeiten) zerlegt und in einer Transaktion
+angehängt; schon enthaltene Runs werden übersprungen, sodass sich derselbe Befehl
+nach jedem neuen Run wiederholen lässt:
+
+    python export_results_db.py results/*.json
+    python export_results_db.py --list
+    sqlite3 results/results.sqlite "SELECT config, COUNT(*) FROM criterion_results
+        WHERE criterion LIKE 'Übersetzt ''êre''%' AND coverage < 0.5 GROUP BY config"
+
+Die Visualisierung rendert einen Run direkt aus der Datenbank:
+
+    python create_complete_visualization.py --from-db results/results.sqlite latest
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+from comparison_loader import expand_inputs
+from results_db import RESULTS_DB_NAME, ResultsDatabase
+
+DEFAULT_DB_PATH = Path(__file__).parent / 'results' / RESULTS_DB_NAME
+
+def main():
+    parser = argparse.ArgumentParser(description='Exportiert Comparison-JSONs in eine SQLite-Datenbank')
+    parser.add_argument('inputs', nargs='*',
+                        help='Comparison-JSONs (auch komprimiert), Verzeichnisse oder Glob-Muster')
+    parser.add_argument('-o', '--db', type=Path, default=DEFAULT_DB_PATH,
+                        help=f'Ziel-Datenbank (Standard: {DEFAULT_DB_PATH})')
+    parser.add_argument('--member', help='Name oder Glob-Muster des JSON-Eintrags in .zip-Archiven')
+    parser.add_argument('--list', action='store_true', help='Enthaltene Runs auflisten')
+    args = parser.parse_args()
+    if not args.inputs and not args.list:
+        parser.error('keine Eingaben (oder --list)')
+
+    try:
+        database = ResultsDatabase(args.db)
+    except (sqlite3.Error, ValueError) as exc:
+        print(f"Error: {args.db} konnte nicht geöffnet werden: {exc}")
+        sys.exit(1)
+    try:
+        json_paths = expand_inputs(args.inputs)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    imported = skipped = 0
+    totals = {}
+    failed = False
+    for json_path in json_paths:
+        run_start = time.perf_counter()
+        try:
+            counts = database.import_run(json_path, args.member)
+        except (ValueError, zipfile.BadZipFile, OSError, EOFError, sqlite3.Error) as exc:
+            print(f"Error: {json_path} konnte nicht importiert werden: {exc}")
+            failed = True
+            continue
+        if counts is None:
+            skipped += 1
+            print(f"{json_path}: bereits enthalten")
+            continue
+        imported += 1
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        print(f"{json_path}: Run {counts['run_id']}, {counts['prompts']} Prompts, {counts['cells']} Zellen, "
+              f"{counts['assessments']} Bewertungen, {counts['judgements']} Judge-Urteile "
+              f"({(time.perf_counter() - run_start) * 1000:.0f} ms)")
+    if json_paths:
+        print(f"\n{imported} importiert, {skipped} übersprungen in {time.perf_counter() - start:.1f}s "
+              f"({totals.get('cells', 0)} Zellen, {totals.get('assessments', 0)} Bewertungen) -> {args.db}")
+
+    if args.list:
+        for run in database.runs():
+            print(f"{run['run_id']:>4}  {run['timestamp'] or '-':<20}  {run['run_label'] or '-':<18}  {run['source']}")
+    database.close()
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Persistenter Cache einzelner Judge-Urteile und ihr Eintrag in der Comparison-JSON
+
+run_evaluation.py speichert jedes Urteil unter (Judge-Modell, Kriterium,
+isInverted, SHA-256 der Antwort) und bewertet bei Wiederholungen nur neue oder
+geänderte Antworten. Die Visualisierung öffnet denselben Cache nur lesend und
+ergänzt mit --judge-cache fehlende llmCoverageScores:
+
+    python create_complete_visualization.py results/run_comparison.json --judge-cache
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+# Gemeinsames Cache-Verzeichnis (Judge-Cache, Report-Cache der Visualisierung)
+DEFAULT_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'mhd-visualization'
+
+IDEAL_MODEL_ID = 'IDEAL_BENCHMARK'
+
+JUDGE_CACHE_NAME = 'judgements.sqlite'
+JUDGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+def response_hash(response_text):
+    return hashlib.sha256(response_text.encode('utf-8')).hexdigest()
+
+def point_key(criterion, is_inverted, response_digest):
+    """Inhaltsadresse eines Kriteriums für eine Antwort (unabhängig vom Judge)"""
+    return hashlib.blake2b(f'{criterion}\0{int(bool(is_inverted))}\0{response_digest}'.encode('utf-8'),
+                           digest_size=16).hexdigest()
+
+class JudgeCache:
+    """Persistenter Cache einzelner Judge-Urteile (SQLite)
+
+    Ein Urteil ist durch (Judge-Modell, Kriterium, isInverted, SHA-256 der Antwort)
+    adressiert; gespeichert wird der unveränderte Wert des Judges (vor dem Invertieren)
+    und seine Begründung. Unveränderte Antworten müssen so nicht erneut bewertet
+    werden. Überschreitet der Cache max_bytes, werden die am längsten ungenutzten
+    Urteile gelöscht. Mit readonly=True wird nichts geschrieben (Visualisierung).
+    """
+
+    def __init__(self, path, max_bytes=JUDGE_CACHE_MAX_BYTES, readonly=False):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.readonly = readonly
+        self.hits = 0
+        self.misses = 0
+        self._used = set()
+        self._pending = 0
+        if readonly:
+            self._db = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute('''CREATE TABLE IF NOT EXISTS judgements (
+                judge TEXT NOT NULL, point TEXT NOT NULL, extent REAL NOT NULL, reflection TEXT NOT NULL,
+                size INTEGER NOT NULL, used REAL NOT NULL, PRIMARY KEY (point, judge)) WITHOUT ROWID''')
+            self._db.execute('CREATE INDEX IF NOT EXISTS judgements_used ON judgements (used)')
+            self._db.commit()
+        self._bytes = None
+
+    def get(self, judge, point):
+        """(Wert, Begründung) eines Judges für ein Kriterium oder None"""
+        row = self._db.execute('SELECT extent, reflection FROM judgements WHERE point = ? AND judge = ?',
+                               (point, judge)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add((point, judge))
+        return row
+
+    def lookup(self, point):
+        """Alle gespeicherten Urteile zu einem Kriterium: Liste von (Judge, Wert, Begründung)"""
+        rows = self._db.execute('SELECT judge, extent, reflection FROM judgements WHERE point = ? ORDER BY judge',
+                                (point,)).fetchall()
+        if rows:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return rows
+
+    def put(self, judge, point, extent, reflection):
+        size = len(judge) + len(point) + len(reflection.encode('utf-8')) + 48
+        self._db.execute('INSERT OR REPLACE INTO judgements VALUES (?, ?, ?, ?, ?, ?)',
+                         (judge, point, extent, reflection, size, time.time()))
+        if self._bytes is not None:
+            self._bytes += size
+        self._pending += 1
+        if self._pending >= 256:
+            self.flush()
+
+    def fingerprint(self):
+        """Ändert sich, sobald Urteile hinzukommen oder verdrängt werden (für den Report-Cache)"""
+        count, total = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM judgements').fetchone()
+        return f'{count}-{total}'
+
+    def flush(self):
+        """Schreibt Zugriffszeiten und neue Urteile und hält max_bytes ein"""
+        if self.readonly:
+            return
+        if self._used:
+            now = time.time()
+            self._db.executemany('UPDATE judgements SET used = ? WHERE point = ? AND judge = ?',
+                                 [(now, point, judge) for point, judge in self._used])
+            self._used.clear()
+        if self._bytes is None:
+            self._bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM judgements').fetchone()[0]
+        while self._bytes > self.max_bytes:
+            oldest = self._db.execute('SELECT point, judge, size FROM judgements ORDER BY used LIMIT 1000').fetchall()
+            if not oldest:
+                break
+            for point, judge, size in oldest:
+                if self._bytes <= self.max_bytes:
+                    break
+                self._db.execute('DELETE FROM judgements WHERE point = ? AND judge = ?', (point, judge))
+                self._bytes -= size
+        self._db.commit()
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+def consensus_assessment(criterion, is_inverted, verdicts, judges=None):
+    """pointAssessment aus den Urteilen [(Judge, Wert, Begründung)] der Judges
+
+    Der Konsens ist der Mittelwert; bei should_not-Kriterien (is_inverted) bewertet
+    der Judge, ob das Unerwünschte vorkommt, erfüllt ist der Punkt also zu 1 - Wert.
+    judges sind alle befragten Judges (auch fehlgeschlagene), Standard: die aus verdicts.
+    """
+    judges = judges or [judge for judge, _, _ in verdicts]
+    assessment = {
+        'keyPointText': criterion,
+        'individualJudgements': [{'judgeModelId': judge, 'coverageExtent': extent, 'reflection': reflection}
+                                 for judge, extent, reflection in verdicts],
+        'judgeModelId': f"consensus({', '.join(judges)})" if len(judges) > 1 else judges[0],
+        'multiplier': 1,
+        'isInverted': is_inverted,
+    }
+    if not verdicts:
+        assessment['coverageExtent'] = None
+        return assessment
+    extent = sum(v[1] for v in verdicts) / len(verdicts)
+    assessment['coverageExtent'] = round(1.0 - extent if is_inverted else extent, 4)
+    assessment['reflection'] = (('[INVERTED] ' if is_inverted else '')
+                                + f'Consensus from {len(verdicts)} judge(s). Average score: {extent:.2f}.')
+    if len(verdicts) < len(judges):
+        assessment['error'] = f'{len(judges) - len(verdicts)} of {len(judges)} judges failed to return a valid assessment.'
+    return assessment
+
+def coverage_cell(assessments):
+    """Eintrag in llmCoverageScores aus den pointAssessments einer Zelle"""
+    scored = [a for a in assessments if a['coverageExtent'] is not None]
+    cell = {'keyPointsCount': len(assessments), 'pointAssessments': assessments}
+    if scored:
+        cell['avgCoverageExtent'] = round(sum(a['coverageExtent'] * a['multiplier'] for a in scored)
+                                          / sum(a['multiplier'] for a in scored), 4)
+    elif assessments:
+        cell['error'] = 'Keine gültige Bewertung durch die Judges'
+    return cell
+
+def fill_coverage_from_judge_cache(data, judge_cache):
+    """Ergänzt fehlende llmCoverageScores-Zellen aus dem Judge-Cache
+
+    Eine Zelle wird nur ergänzt, wenn für jedes ihrer Kriterien mindestens ein
+    gespeichertes Urteil zu genau dieser Antwort existiert. Vorhandene Scores
+    bleiben unverändert. Liefert die Anzahl ergänzter Zellen.
+    """
+    responses = data.get('allFinalAssistantResponses', {})
+    scores = data.setdefault('evaluationResults', {}).setdefault('llmCoverageScores', {})
+    models = [m for m in data.get('effectiveModels', []) if m != IDEAL_MODEL_ID]
+    filled = 0
+    for prompt_def in data.get('config', {}).get('prompts', []):
+        prompt_id = prompt_def.get('id')
+        points = ([(p.get('text', ''), False) for p in prompt_def.get('points', []) if isinstance(p, dict)]
+                  + [(p.get('text', ''), True) for p in prompt_def.get('should_not', []) if isinstance(p, dict)])
+        if not points:
+            continue
+        prompt_scores = scores.setdefault(prompt_id, {})
+        for model_id in models:
+            cell = prompt_scores.get(model_id)
+            if isinstance(cell, dict) and cell.get('avgCoverageExtent') is not None:
+                continue
+            response_text = responses.get(prompt_id, {}).get(model_id)
+            if not isinstance(response_text, str) or '<<error>>' in response_text:
+                continue
+            digest = response_hash(response_text)
+            assessments = []
+            for criterion, is_inverted in points:
+                verdicts = judge_cache.lookup(point_key(criterion, is_inverted, digest))
+                if not verdicts:
+                    break
+                assessments.append(consensus_assessment(criterion, is_inverted, verdicts))
+            else:
+                prompt_scores[model_id] = coverage_cell(assessments)
+                filled += 1
+    return filled
@@ -0,0 +1,314 @@
+"""Laufende Runs aus JSON-Lines (run_evaluation.py --jsonl) verfolgen
+
+JsonLinesTail liest neue, vollständige Zeilen einer wachsenden Datei, LiveRun
+schreibt daraus Ergebnis-Matrix und Statistiken Zelle für Zelle fort und liefert
+einen Report im Format von prepare_report; follow_jsonl verbindet beides und
+übergibt den Report zum Rendern.
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from comparison_loader import (extract_cell, extract_prompt, get_base_model_name, get_system_prompt_info,
+                               simplify_model_name)
+from dedup import duplicate_statistics
+from judge_cache import IDEAL_MODEL_ID
+from report_statistics import (CriterionCube, ScoreCube, criterion_statistics, rank_statistics,
+                               significance_statistics)
+
+# JSON-Lines eines laufenden Runs (run_evaluation.py --jsonl): Kopfzeile 'run' mit
+# Konfiguration und Prompts, je fertiger Zelle ein 'result', am Ende 'end'
+JSONL_SUFFIX = '.jsonl'
+JSONL_POLL_INTERVAL = 1.0
+JSONL_RENDER_INTERVAL = 10.0
+_JSONL_RECORD_START = b'{"type":'
+
+class JsonLinesTail:
+    """Liest die neuen, vollständigen Zeilen einer wachsenden JSON-Lines-Datei
+
+    Eine noch unvollständige letzte Zeile bleibt im Puffer, bis der Schreiber
+    sie mit einem Zeilenumbruch abschließt. Wurde eine Zeile abgebrochen (z.B.
+    Absturz des Schreibers) und danach weitergeschrieben, wird der Rest ab dem
+    letzten Record-Anfang gelesen; in Strings ist '{"type":' immer escaped.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.skipped = 0
+        self._partial = b''
+        self._inode = None
+
+    @property
+    def pending(self):
+        """Bytes einer noch nicht abgeschlossenen letzten Zeile"""
+        return len(self._partial)
+
+    def read(self):
+        """Liefert (records, reset); reset=True, wenn die Datei ersetzt oder gekürzt wurde"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return [], False
+        reset = self._inode is not None and (stat.st_ino != self._inode or stat.st_size < self.offset)
+        if reset:
+            self.offset = 0
+            self._partial = b''
+        self._inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return [], reset
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(stat.st_size - self.offset)
+        self.offset += len(chunk)
+        lines = (self._partial + chunk).split(b'\n')
+        self._partial = lines.pop()
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                start = line.rfind(_JSONL_RECORD_START)
+                try:
+                    if start <= 0:
+                        raise ValueError
+                    records.append(json.loads(line[start:]))
+                except ValueError:
+                    self.skipped += 1
+                    print(f"Warnung: ungültige Zeile in {self.path} übersprungen ({len(line)} Bytes)")
+                    continue
+                self.skipped += 1
+                print(f"Warnung: abgebrochene Zeile in {self.path} übersprungen ({start} Bytes)")
+        return records, reset
+
+class LiveRun:
+    """Ergebnis-Matrix und Statistiken eines laufenden Runs, Zelle für Zelle aus JSON-Lines-Records
+
+    Pro Konfiguration (und Kategorie) werden Summe, Anzahl, Fehler sowie
+    Minimum/Maximum der Scores fortgeschrieben, sodass eine neue Zelle die
+    Statistiken in O(1) aktualisiert. Kommt eine Zelle erneut (Wiederholung), wird
+    der alte Beitrag abgezogen; nur Minimum/Maximum dieser Spalte werden dann beim
+    nächsten Abruf neu bestimmt. Noch fehlende Zellen fehlen in results.
+    report() hasht Duplikate und baut Kriterien-Zeilen nur für Prompts mit neuen
+    Zellen seit dem letzten Aufruf neu auf; der Bootstrap der Signifikanz läuft
+    bewusst jedes Mal über die ganze Matrix.
+    """
+
+    def __init__(self, prompt_index=None):
+        self.prompt_index = prompt_index
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.prompts = []
+        self.prompts_data = {}
+        self.models = []
+        self.results = {}
+        self.coverage = {}
+        self.cells = 0
+        self.ended = None
+        self.ignored = 0
+        self._dirty_prompts = set()
+        self._duplicates = None
+        self._criterion_cube = None
+        self._allocate()
+
+    @property
+    def total(self):
+        return len(self.prompts) * len(self.models)
+
+    def add(self, record):
+        """Verarbeitet einen Record; True, wenn sich die Ergebnis-Matrix geändert hat"""
+        kind = record.get('type') if isinstance(record, dict) else None
+        if kind == 'run':
+            self._start(record)
+            return True
+        if kind == 'end':
+            self.ended = record
+            return False
+        if kind == 'result' and self.header is not None:
+            return self._add_result(record)
+        self.ignored += 1
+        return False
+
+    def _start(self, header):
+        self.reset()
+        self.header = header
+        for prompt_def in header.get('config', {}).get('prompts', []):
+            self.prompts_data[prompt_def.get('id')] = extract_prompt(prompt_def, self.prompt_index)
+        self.prompts = list(self.prompts_data.keys())
+        self.models = [m for m in header.get('effectiveModels', []) if m != IDEAL_MODEL_ID]
+        self.results = {prompt_id: {} for prompt_id in self.prompts}
+        self.coverage = {prompt_id: {} for prompt_id in self.prompts}
+        self._allocate()
+
+    def _allocate(self):
+        self._prompt_lookup = {p: i for i, p in enumerate(self.prompts)}
+        self._model_lookup = {m: j for j, m in enumerate(self.models)}
+        self._categories = list(dict.fromkeys(self.prompts_data[p]['category'] for p in self.prompts))
+        category_lookup = {c: k for k, c in enumerate(self._categories)}
+        self._category_idx = [category_lookup[self.prompts_data[p]['category']] for p in self.prompts]
+        
+        shape = (len(self.prompts), len(self.models))
+        self.scores = np.full(shape, np.nan)
+        self.errors = np.zeros(shape, dtype=bool)
+        self._sum = np.zeros(len(self.models))
+        self._count = np.zeros(len(self.models), dtype=np.int64)
+        self._error_count = np.zeros(len(self.models), dtype=np.int64)
+        self._min = np.full(len(self.models), np.inf)
+        self._max = np.full(len(self.models), -np.inf)
+        self._category_sum = np.zeros((len(self._categories), len(self.models)))
+        self._category_count = np.zeros((len(self._categories), len(self.models)), dtype=np.int64)
+        self._stale_extremes = set()
+
+    def _account(self, i, j, sign):
+        if self.errors[i, j]:
+            self._error_count[j] += sign
+            return
+        score = self.scores[i, j]
+        if np.isnan(score):
+            return
+        c = self._category_idx[i]
+        self._sum[j] += sign * score
+        self._count[j] += sign
+        self._category_sum[c, j] += sign * score
+        self._category_count[c, j] += sign
+        if sign > 0:
+            self._min[j] = min(self._min[j], score)
+            self._max[j] = max(self._max[j], score)
+        else:
+            self._stale_extremes.add(j)
+
+    def _add_result(self, record):
+        i = self._prompt_lookup.get(record.get('promptId'))
+        j = self._model_lookup.get(record.get('modelId'))
+        if i is None or j is None:
+            self.ignored += 1
+            return False
+        prompt_id, model_id = self.prompts[i], self.models[j]
+        coverage = record.get('coverage') or {}
+        cell = extract_cell(record.get('response', ''), coverage)
+        if model_id in self.results[prompt_id]:
+            self._account(i, j, -1)
+        else:
+            self.cells += 1
+        self.results[prompt_id][model_id] = cell
+        self.coverage[prompt_id][model_id] = coverage
+        self._dirty_prompts.add(prompt_id)
+        self.scores[i, j] = np.nan if cell['score'] is None else cell['score']
+        self.errors[i, j] = cell['is_error']
+        self._account(i, j, 1)
+        return True
+
+    def model_stats(self):
+        """Statistiken pro Konfiguration wie config_statistics, aus den fortgeschriebenen Summen"""
+        for j in self._stale_extremes:
+            column = self.scores[:, j][~self.errors[:, j] & ~np.isnan(self.scores[:, j])]
+            self._min[j] = column.min(initial=np.inf)
+            self._max[j] = column.max(initial=-np.inf)
+        self._stale_extremes.clear()
+        
+        model_stats = {}
+        for j, model in enumerate(self.models):
+            count = int(self._count[j])
+            model_stats[model] = {
+                'avg': float(self._sum[j] / count) if count else 0,
+                'min': float(self._min[j]) if count else 0,
+                'max': float(self._max[j]) if count else 0,
+                'count': count,
+                'errors': int(self._error_count[j]),
+                'category_avg': {
+                    category: float(self._category_sum[c, j] / self._category_count[c, j])
+                    for c, category in enumerate(self._categories) if self._category_count[c, j]
+                },
+                'base_name': get_base_model_name(model),
+                'sp_info': get_system_prompt_info(model)
+            }
+        return model_stats
+
+    def cube(self):
+        return ScoreCube.from_arrays(self.prompts, self.models, self.scores, self.errors,
+                                     [self.prompts_data[p]['category'] for p in self.prompts])
+
+    def leaderboard(self):
+        """Detailliertes Ranking des aktuellen Stands (ohne Bootstrap, für Fortschrittsanzeigen)"""
+        return sorted(self.model_stats().items(), key=lambda x: x[1]['avg'], reverse=True)
+
+    def report(self):
+        """Report im Format von prepare_report für den bisherigen Stand"""
+        cube = self.cube()
+        model_stats = self.model_stats()
+        consolidated_ranking, detailed_ranking, category_best = rank_statistics(cube, model_stats)
+        reuse = set(self.prompts) - self._dirty_prompts if self._criterion_cube is not None else set()
+        self._criterion_cube = CriterionCube.from_scores(self.coverage, self.models, self.prompts, self.errors,
+                                                         self._criterion_cube, reuse)
+        self._duplicates = duplicate_statistics(self.results, self.models, self.prompts, self.prompts_data,
+                                                previous=self._duplicates, reuse=reuse)
+        self._dirty_prompts.clear()
+        return {
+            'results': self.results,
+            'models': self.models,
+            'prompts': self.prompts,
+            'prompts_data': self.prompts_data,
+            'model_stats': model_stats,
+            'consolidated_ranking': consolidated_ranking,
+            'detailed_ranking': detailed_ranking,
+            'category_best': category_best,
+            'significance': significance_statistics(cube, consolidated_ranking, detailed_ranking),
+            'similarity': None,
+            'duplicates': self._duplicates,
+            'criteria': criterion_statistics(self._criterion_cube),
+        }
+
+def print_live_status(live, elapsed, top=5):
+    """Fortschritt und die besten Konfigurationen des laufenden Runs"""
+    done = f"{live.cells}/{live.total} Zellen ({live.cells / live.total * 100:.0f}%)" if live.total else "0 Zellen"
+    print(f"[{elapsed:.0f}s] {done}" + (" - Run beendet" if live.ended else ""))
+    for rank, (model_id, stats) in enumerate(live.leaderboard()[:top], 1):
+        print(f"  {rank}. {simplify_model_name(model_id)} ({stats['sp_info']}): {stats['avg']:.1f}% "
+              f"aus {stats['count']} Scores" + (f", {stats['errors']} Fehler" if stats['errors'] else ''))
+
+def follow_jsonl(jsonl_path, render, prompt_index=None, follow=False, render_interval=JSONL_RENDER_INTERVAL):
+    """Liest einen JSON-Lines-Run und übergibt den Report an render; mit follow wird die Datei weiter verfolgt
+
+    Neue Zellen aktualisieren die Statistiken sofort; render(report) wird höchstens
+    alle render_interval Sekunden und zum Schluss (end-Record oder Strg+C) aufgerufen.
+    """
+    tail = JsonLinesTail(jsonl_path)
+    live = LiveRun(prompt_index)
+    start = time.perf_counter()
+    last_render = None
+    dirty = False
+    try:
+        while True:
+            records, reset = tail.read()
+            if reset:
+                print(f"{jsonl_path} wurde ersetzt oder gekürzt, lese neu")
+                live.reset()
+            for record in records:
+                dirty |= live.add(record)
+            now = time.perf_counter()
+            finished = not follow or live.ended is not None
+            if dirty and live.header is not None and (finished or last_render is None
+                                                      or now - last_render >= render_interval):
+                print_live_status(live, now - start)
+                render(live.report())
+                last_render = now
+                dirty = False
+            if finished:
+                break
+            time.sleep(JSONL_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        print("\nAbgebrochen")
+        if dirty and live.header is not None:
+            render(live.report())
+    if live.header is None:
+        raise ValueError(f"{jsonl_path} enthält keinen 'run'-Record")
+    if tail.pending:
+        print(f"Unvollständige letzte Zeile ({tail.pending} Bytes) noch nicht gelesen")
+    return live
@@ -0,0 +1,37 @@
+"""Einheitliche Orthographie mittelhochdeutscher Texte für Vergleich und Suche
+
+normalize_text gleicht Antworten mit den Zielwörtern der Kriterien ab
+(prescore_criteria.py) und normalisiert die Wörter des Suchindex der
+Visualisierung; NORMALIZE_SCRIPT ist dieselbe Normalisierung für das Suchfeld im
+Browser. Beide werden aus MHD_LETTERS erzeugt, damit Index und Suche nicht
+auseinanderlaufen.
+"""
+
+import json
+import unicodedata
+
+# Kleinbuchstaben vor der Zerlegung, damit Umlaute nicht mit dem Grundvokal
+# zusammenfallen ('schœne'/'schön' -> 'schoene'/'schoen', aber 'schon' bleibt 'schon')
+MHD_LETTERS = {
+    'ʒ': 'z', 'ȥ': 'z', 'ſ': 's', 'ß': 'ss', 'œ': 'oe', 'æ': 'ae', 'ø': 'oe',
+    'ä': 'ae', 'ö': 'oe', 'ü': 'ue',
+}
+SUPERSCRIPT_E = '\u0364'  # uͤ, oͤ: übergeschriebenes e der Handschriften
+
+_MHD_TABLE = str.maketrans(MHD_LETTERS)
+
+def normalize_text(text):
+    """Kleinschreibung und einheitliche Orthographie für den Vergleich"""
+    text = unicodedata.normalize('NFC', text.casefold()).translate(_MHD_TABLE)
+    text = unicodedata.normalize('NFD', text).replace(SUPERSCRIPT_E, 'e')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+# normalizeSearchText(text) wie normalize_text; toLowerCase lässt 'ß' stehen, das dann
+# über SEARCH_LETTERS wie bei casefold zu 'ss' wird
+NORMALIZE_SCRIPT = '''        const SEARCH_LETTERS = %s;
+        
+        function normalizeSearchText(text) {
+            return text.toLowerCase().normalize('NFC').replace(/[%s]/g, ch => SEARCH_LETTERS[ch])
+                .normalize('NFD').replace(/\\u%04x/g, 'e').replace(/\\p{Mn}/gu, '');
+        }
+''' % (json.dumps(MHD_LETTERS, ensure_ascii=False), ''.join(MHD_LETTERS), ord(SUPERSCRIPT_E))
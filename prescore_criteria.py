@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""Lexikalische Vorbewertung von should/should_not-Kriterien ohne LLM-Judge
+
+Viele Kriterien des Blueprints prüfen eine Übersetzung mit festen Zielwörtern:
+
+    Übersetzt 'wuohs' als 'wuchs' oder 'wuchs auf/heran'.     (should)
+    Übersetzt 'ellende' als 'elend', 'arm' oder 'unglücklich'. (should_not)
+
+Die Zielwörter (die zitierten Begriffe nach 'als') aller Kriterien werden in
+einen Aho-Corasick-Automaten kompiliert, jede Antwort wird einmal durchlaufen
+und liefert alle Treffer für alle ihre Kriterien. Sicher entscheiden lassen sich
+nur zwei Fälle: ein should-Kriterium, dessen Zielwort als ganzes Wort vorkommt,
+ist erfüllt; ein should_not-Kriterium, von dessen Zielwörtern keines (auch nicht
+als Wortanfang) vorkommt, ist nicht gezeigt. Alles andere bleibt beim Judge.
+
+Antworten und Begriffe werden gleich normalisiert (Kleinschreibung, ʒ -> z,
+ſ -> s, œ/ö -> oe, Zirkumflexe und andere Akzente entfernt), sodass etwa
+'süeʒiu' und 'Süeziu', 'schœne' und 'schoene' oder 'magedîn' und 'magedin'
+dasselbe Wort sind.
+
+run_evaluation.py --prescore überspringt damit Judge-Aufrufe. Dieses Skript
+misst auf einer vorhandenen Comparison-JSON, wie oft die Vorbewertung mit den
+Judges übereinstimmt:
+
+    python prescore_criteria.py results/run_comparison.json --show 10
+"""
+
+import argparse
+import re
+import sys
+import time
+from collections import deque
+
+from mhd_text import normalize_text
+
+PRESCORER_ID = 'lexical-prescorer'
+
+_QUOTED_RE = re.compile(r"(?<!\w)'([^']+)'(?!\w)|\"([^\"]+)\"|„([^“”\"]+)[“”\"]|‚([^‘’']+)[‘’']"
+                        r"|«([^»]+)»|»([^«]+)«|“([^”]+)”")
+_TRANSLATION_RE = re.compile(r'^(Übersetzt|Erklärt|Gibt|Nennt)\b')
+_CONNECTOR_RE = re.compile(r'\bals\b')
+# Was zwischen den Zielwörtern einer Aufzählung stehen darf
+_LIST_SEPARATOR_RE = re.compile(r'^(\s*(,|oder|bzw\.|und|/)\s*)*$')
+
+def expand_alternatives(term):
+    """'wuchs auf/heran' -> ['wuchs auf', 'wuchs heran']; die Alternative ersetzt das letzte Wort"""
+    first, *alternatives = [part.strip() for part in term.split('/')]
+    variants = [first]
+    head = first.rsplit(' ', 1)[0] + ' ' if ' ' in first else ''
+    for alternative in alternatives:
+        if alternative:
+            variants.append(alternative if ' ' in alternative else head + alternative)
+    return variants
+
+def criterion_terms(criterion):
+    """(Quellbegriffe, Zielbegriffe, Rest nach der Aufzählung) oder None
+
+    Nur Kriterien der Form "Übersetzt/Erklärt ... 'x' als 'a', 'b' oder 'c'" haben
+    Zielbegriffe; alle anderen (Verwechselt, Erfindet, ...) sind Sache des Judges.
+    """
+    if not _TRANSLATION_RE.match(criterion):
+        return None
+    quotes = [(m.start(), m.end(), next(g for g in m.groups() if g is not None))
+              for m in _QUOTED_RE.finditer(criterion)]
+    if not quotes:
+        return None
+    connector = _CONNECTOR_RE.search(criterion, quotes[0][1])
+    if connector is None:
+        return None
+    sources = [term for _, end, term in quotes if end <= connector.start()]
+    following = [(start, end, term) for start, end, term in quotes if start >= connector.end()]
+    if not sources or not following or criterion[connector.end():following[0][0]].strip():
+        return None
+    # Nur die zusammenhängende Aufzählung direkt nach 'als' zählt
+    targets = [following[0][2]]
+    end = following[0][1]
+    for start, next_end, term in following[1:]:
+        if not _LIST_SEPARATOR_RE.match(criterion[end:start]):
+            break
+        targets.append(term)
+        end = next_end
+    return sources, targets, criterion[end:].strip(' .')
+
+class TermMatcher:
+    """Aho-Corasick-Automat über normalisierte Begriffe
+
+    Ein Durchlauf über den Text findet alle (auch überlappende) Vorkommen aller
+    Begriffe, unabhängig von ihrer Anzahl.
+    """
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        goto = [{}]
+        output = [[]]
+        for term_id, term in enumerate(self.terms):
+            node = 0
+            for ch in term:
+                child = goto[node].get(ch)
+                if child is None:
+                    child = len(goto)
+                    goto[node][ch] = child
+                    goto.append({})
+                    output.append([])
+                node = child
+            output[node].append(term_id)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(ch, 0)
+                output[child] = output[child] + output[fail[child]]
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find(self, text):
+        """Treffer in text als (ganze Wörter, Wortanfänge): Mengen von Begriffs-IDs"""
+        goto, fail, output, terms = self._goto, self._fail, self._output, self.terms
+        words = set()
+        prefixes = set()
+        node = 0
+        for end, ch in enumerate(text, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for term_id in output[node]:
+                start = end - len(terms[term_id])
+                if start and text[start - 1].isalnum():
+                    continue
+                prefixes.add(term_id)
+                if end == len(text) or not text[end].isalnum():
+                    words.add(term_id)
+        return words, prefixes
+
+class LexicalPrescorer:
+    """Sichere Urteile für Kriterien mit festen Zielbegriffen
+
+    add_criterion registriert ein Kriterium eines Prompts, scan liefert für eine
+    Antwort {(Kriterium, is_inverted): (Rohwert, Begründung)} im Format eines
+    Judge-Urteils (Rohwert wie beim Judge: bei should_not 0 = nicht gezeigt).
+    """
+
+    def __init__(self):
+        self._term_ids = {}
+        self._rules = {}
+        self._matcher = None
+
+    def _term_id(self, term):
+        if term not in self._term_ids:
+            self._term_ids[term] = len(self._term_ids)
+            self._matcher = None
+        return self._term_ids[term]
+
+    def add_criterion(self, prompt_id, criterion, is_inverted, prompt_text=''):
+        """Registriert ein Kriterium; False, wenn es sich nicht lexikalisch prüfen lässt"""
+        parsed = criterion_terms(criterion)
+        if parsed is None:
+            return False
+        sources, targets, rest = parsed
+        variants = {normalize_text(v) for term in targets for v in expand_alternatives(term)}
+        variants.discard('')
+        if not is_inverted:
+            # Ein erfülltes should-Kriterium braucht die ganze Bedingung: kein Zusatz außer
+            # einer Alternative ('oder erklärt ...'), und das Zielwort darf nicht schon im
+            # Prompt oder unter den Quellbegriffen stehen (die Antwort zitiert oft den Text)
+            if rest and not rest.startswith('oder'):
+                return False
+            known = normalize_text(prompt_text + ' ' + ' '.join(sources))
+            variants = {v for v in variants
+                        if not re.search(rf'(?<!\w){re.escape(v)}(?!\w)', known)}
+        if not variants:
+            return False
+        self._rules.setdefault(prompt_id, {})[(criterion, is_inverted)] = (
+            sorted(variants), [self._term_id(v) for v in sorted(variants)])
+        return True
+
+    def __len__(self):
+        """Anzahl registrierter Kriterien über alle Prompts"""
+        return sum(len(rules) for rules in self._rules.values())
+
+    def criteria(self, prompt_id):
+        return self._rules.get(prompt_id, {})
+
+    def scan(self, prompt_id, response):
+        rules = self._rules.get(prompt_id)
+        if not rules:
+            return {}
+        if self._matcher is None:
+            self._matcher = TermMatcher(self._term_ids)
+        words, prefixes = self._matcher.find(normalize_text(response))
+        verdicts = {}
+        for (criterion, is_inverted), (variants, term_ids) in rules.items():
+            if not is_inverted:
+                found = [v for v, term_id in zip(variants, term_ids) if term_id in words]
+                if found:
+                    verdicts[(criterion, False)] = (
+                        1.0, f"Lexical pre-score: target term '{found[0]}' appears in the response.")
+            elif not any(term_id in prefixes for term_id in term_ids):
+                verdicts[(criterion, True)] = (
+                    0.0, 'Lexical pre-score: none of the terms '
+                         + ', '.join(f"'{v}'" for v in variants) + ' appear in the response.')
+        return verdicts
+
+def prompt_texts(data):
+    """Nutzer-Nachrichten jedes Prompts aus promptContexts, sonst aus config.prompts"""
+    texts = {}
+    for prompt in (data.get('config') or {}).get('prompts') or []:
+        if isinstance(prompt, dict) and prompt.get('id'):
+            context = prompt.get('messages') or prompt.get('promptText') or ''
+            texts[prompt['id']] = context
+    texts.update(data.get('promptContexts') or {})
+    for prompt_id, context in texts.items():
+        if isinstance(context, list):
+            context = '\n'.join(str(m.get('content') or '') for m in context
+                                if isinstance(m, dict) and m.get('role') == 'user')
+        texts[prompt_id] = str(context)
+    return texts
+
+def agreement_report(data):
+    """Vergleicht die Vorbewertung mit den Judge-Urteilen einer Comparison-JSON
+
+    Liefert ein Dict mit Zählern und der Liste der Abweichungen. Ein Urteil der
+    Vorbewertung (immer coverageExtent 1) stimmt überein, wenn der Konsens der
+    Judges mindestens 0.5 beträgt. Urteile, die schon im Lauf vorbewertet wurden,
+    zählen nicht mit.
+    """
+    coverage = (data.get('evaluationResults') or {}).get('llmCoverageScores') or {}
+    responses = data.get('allFinalAssistantResponses') or {}
+    contexts = prompt_texts(data)
+    prescorer = LexicalPrescorer()
+    report = {'rules': 0, 'assessed': 0, 'prescored': {False: 0, True: 0},
+              'agree': {False: 0, True: 0}, 'exact': 0, 'abs_error': 0.0, 'disagreements': [],
+              'responses': 0, 'chars': 0, 'scan_seconds': 0.0}
+    cells = []
+    for prompt_id, row in coverage.items():
+        for config, cell in (row or {}).items():
+            assessments = (cell or {}).get('pointAssessments') or []
+            response = (responses.get(prompt_id) or {}).get(config)
+            if assessments and isinstance(response, str):
+                cells.append((prompt_id, config, assessments, response))
+                for a in assessments:
+                    key = (a.get('keyPointText', ''), bool(a.get('isInverted')))
+                    if key not in prescorer.criteria(prompt_id):
+                        prescorer.add_criterion(prompt_id, *key, prompt_text=contexts.get(prompt_id, ''))
+    report['rules'] = len(prescorer)
+
+    start = time.perf_counter()
+    scanned = [(prompt_id, config, assessments, prescorer.scan(prompt_id, response))
+               for prompt_id, config, assessments, response in cells]
+    report['scan_seconds'] = time.perf_counter() - start
+    report['responses'] = len(cells)
+    report['chars'] = sum(len(response) for _, _, _, response in cells)
+
+    for prompt_id, config, assessments, verdicts in scanned:
+        for a in assessments:
+            if a.get('coverageExtent') is None or PRESCORER_ID in str(a.get('judgeModelId')):
+                continue
+            report['assessed'] += 1
+            inverted = bool(a.get('isInverted'))
+            verdict = verdicts.get((a.get('keyPointText', ''), inverted))
+            if verdict is None:
+                continue
+            judged = float(a['coverageExtent'])
+            report['prescored'][inverted] += 1
+            report['abs_error'] += 1.0 - judged
+            report['exact'] += judged == 1.0
+            if judged >= 0.5:
+                report['agree'][inverted] += 1
+            else:
+                report['disagreements'].append((prompt_id, config, a.get('keyPointText', ''), judged, verdict[1]))
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Misst die lexikalische Vorbewertung gegen die Judges einer Comparison-JSON')
+    parser.add_argument('comparison', help='Comparison-JSON mit llmCoverageScores und Antworten')
+    parser.add_argument('--show', type=int, default=0, metavar='N', help='Die ersten N Abweichungen ausgeben')
+    args = parser.parse_args()
+
+    from comparison_loader import EXTRACT_FIELDS, load_comparison
+    try:
+        data = load_comparison(args.comparison, fields={**EXTRACT_FIELDS, 'promptContexts': True})
+    except (OSError, ValueError) as exc:
+        print(f"Error: {args.comparison} konnte nicht gelesen werden: {exc}")
+        sys.exit(1)
+
+    report = agreement_report(data)
+    prescored = sum(report['prescored'].values())
+    agree = sum(report['agree'].values())
+    print(f"{report['rules']} lexikalisch prüfbare Kriterien, {report['responses']} Antworten "
+          f"({report['chars'] / 1e6:.1f} Mio. Zeichen) in {report['scan_seconds'] * 1000:.0f} ms durchsucht")
+    if not report['assessed']:
+        print("Keine Judge-Urteile zum Vergleichen.")
+        return
+    print(f"Vorab entschieden: {prescored} von {report['assessed']} Urteilen "
+          f"({prescored / report['assessed']:.1%}; should: {report['prescored'][False]}, "
+          f"should_not: {report['prescored'][True]})")
+    if prescored:
+        print(f"Übereinstimmung mit den Judges: {agree} von {prescored} ({agree / prescored:.1%}; "
+              f"should: {report['agree'][False]}/{report['prescored'][False]}, "
+              f"should_not: {report['agree'][True]}/{report['prescored'][True]}), "
+              f"exakt {report['exact']}, mittlere Abweichung {report['abs_error'] / prescored:.3f}")
+    for prompt_id, config, criterion, judged, reason in report['disagreements'][:args.show]:
+        print(f"  {prompt_id} / {config}: {criterion}\n    Judges {judged:.2f} - {reason}")
+
+if __name__ == "__main__":
+    main()
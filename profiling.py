@@ -0,0 +1,201 @@
+"""Phasenmessung für --profile: Wand- und CPU-Zeit, Peak-RSS und Objekte je Phase
+
+Die Visualisierung markiert mit mark_phase den Beginn jeder Phase (Laden,
+Extraktion, Statistik, Cache, Rendern); write_profile schreibt das Ergebnis als
+<name>_profile.json neben den Report und druckt die Übersicht.
+"""
+
+import gc
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROFILE_TOP_N = 25
+TRACEMALLOC_FRAMES = 5
+
+def _proc_status_kb(field):
+    """Wert aus /proc/self/status in kB (None außerhalb von Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _rss_mb(field):
+    kb = _proc_status_kb(field)
+    if kb is None:
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            kb /= 1024
+    return kb / 1024
+
+class PhaseProfiler:
+    """Misst die Phasen eines Laufs für --profile
+
+    mark(name) beendet die laufende Phase und beginnt die nächste, passend zu den
+    Statusmeldungen ("Extrahiere Daten..."). Pro Phase werden Wandzeit, CPU-Zeit,
+    Peak-RSS (VmHWM, vor jeder Phase zurückgesetzt; ohne /proc nur der Peak des
+    Prozesses), Änderung des RSS sowie die Anzahl der vom GC verfolgten Objekte
+    festgehalten. Mit trace_memory kommt der Python-Heap laut tracemalloc dazu
+    (Snapshot an der Phasengrenze mit dem höchsten Stand), mit cprofile läuft
+    cProfile über den ganzen Lauf. Die Messung der Objekte liegt außerhalb der
+    gemessenen Zeiten.
+    """
+
+    def __init__(self, cprofile=False, trace_memory=False):
+        self.phases = []
+        self.counts = {}
+        self._current = None
+        self._objects = None
+        self._started = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._tracemalloc = None
+        self._snapshot = None
+        self._snapshot_bytes = -1
+        if trace_memory:
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._cprofile = None
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def mark(self, name, label=None):
+        """Beendet die laufende Phase und beginnt name (None: nur beenden)"""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if self._current is not None:
+            phase = self._current
+            phase['wall_seconds'] = wall - phase.pop('_wall')
+            phase['cpu_seconds'] = cpu - phase.pop('_cpu')
+            phase['peak_rss_mb'] = _rss_mb('VmHWM')
+            phase['rss_delta_mb'] = _rss_mb('VmRSS') - phase.pop('_rss')
+            if self._tracemalloc is not None:
+                current, peak = self._tracemalloc.get_traced_memory()
+                phase['traced_mb'] = current / 2**20
+                phase['traced_peak_mb'] = peak / 2**20
+                if current > self._snapshot_bytes:
+                    self._snapshot = self._tracemalloc.take_snapshot()
+                    self._snapshot_bytes = current
+            self._objects = len(gc.get_objects())
+            phase['objects'] = self._objects
+            phase['objects_delta'] = self._objects - phase.pop('_objects')
+            self.phases.append(phase)
+            self._current = None
+        if name is None:
+            return
+        phase = {'name': name}
+        if label is not None:
+            phase['label'] = str(label)
+        phase['_objects'] = self._objects if self._objects is not None else len(gc.get_objects())
+        try:
+            with open('/proc/self/clear_refs', 'w') as f:
+                f.write('5')
+        except OSError:
+            pass
+        if self._tracemalloc is not None:
+            self._tracemalloc.reset_peak()
+        phase['_rss'] = _rss_mb('VmRSS')
+        self._current = phase
+        phase['_cpu'] = time.process_time()
+        phase['_wall'] = time.perf_counter()
+
+    def finish(self, profile_path, **info):
+        """Beendet die Messung, schreibt profile_path (JSON) samt Dumps und liefert das Profil"""
+        self.mark(None)
+        profile_path = Path(profile_path)
+        profile = {
+            'started': self._started,
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            **info,
+            'total': {
+                'wall_seconds': time.perf_counter() - self._wall,
+                'cpu_seconds': time.process_time() - self._cpu,
+                'peak_rss_mb': max([p['peak_rss_mb'] for p in self.phases], default=_rss_mb('VmHWM')),
+            },
+            'counts': self.counts,
+            'phases': self.phases,
+        }
+        if self._cprofile is not None:
+            import pstats
+            self._cprofile.disable()
+            dump_path = profile_path.with_suffix('.prof')
+            self._cprofile.dump_stats(dump_path)
+            functions = sorted(pstats.Stats(self._cprofile).stats.items(), key=lambda item: item[1][3], reverse=True)
+            profile['cprofile'] = {
+                'dump': str(dump_path),
+                'top_cumulative': [
+                    {'function': pstats.func_std_string(func), 'calls': calls, 'own_seconds': own,
+                     'cumulative_seconds': cumulative}
+                    for func, (_, calls, own, cumulative, _) in functions[:PROFILE_TOP_N]],
+            }
+        if self._tracemalloc is not None:
+            dump_path = profile_path.with_name(f'{profile_path.stem}_tracemalloc.dump')
+            self._snapshot.dump(str(dump_path))
+            profile['tracemalloc'] = {
+                'dump': str(dump_path),
+                'snapshot_mb': self._snapshot_bytes / 2**20,
+                'top_lines': [{'location': str(stat.traceback[0]), 'size_mb': stat.size / 2**20, 'blocks': stat.count}
+                              for stat in self._snapshot.statistics('lineno')[:PROFILE_TOP_N]],
+            }
+            self._tracemalloc.stop()
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        return profile
+
+def mark_phase(profiler, name, label=None):
+    if profiler is not None:
+        profiler.mark(name, label)
+
+def report_counts(report):
+    """Umfang eines Reports für das Profil"""
+    cells = [cell for row in report['results'].values() for cell in row.values()]
+    return {
+        'prompts': len(report['prompts']),
+        'configs': len(report['models']),
+        'cells': len(cells),
+        'scored_cells': sum(cell['score'] is not None for cell in cells),
+        'criteria_assessments': sum(len(cell['passed']) + len(cell['failed']) for cell in cells),
+        'response_chars': sum(len(cell['output']) for cell in cells),
+    }
+
+def write_profile(profiler, output_html_path, mode, inputs, report=None, **info):
+    """Schließt die Messung ab, schreibt <name>_profile.json neben die HTML-Datei und druckt die Übersicht"""
+    if report is not None:
+        profiler.counts.update(report_counts(report))
+    inputs = [Path(path) for path in inputs]
+    profiler.counts['input_bytes'] = sum(path.stat().st_size for path in inputs if path.is_file())
+    profiler.counts['output_bytes'] = Path(output_html_path).stat().st_size
+    profile_path = Path(output_html_path).with_name(f'{Path(output_html_path).stem}_profile.json')
+    profile = profiler.finish(profile_path, mode=mode, inputs=[str(path) for path in inputs],
+                              output=str(output_html_path), **info)
+    print_profile(profile, profile_path)
+    return profile
+
+def print_profile(profile, profile_path):
+    print(f"\nProfil: {profile_path}")
+    print(f"  {'Phase':<12} {'Wand [s]':>9} {'CPU [s]':>9} {'Peak RSS [MB]':>14} {'ΔRSS [MB]':>10} {'Objekte':>11}")
+    for phase in profile['phases']:
+        print(f"  {phase['name']:<12} {phase['wall_seconds']:>9.3f} {phase['cpu_seconds']:>9.3f} "
+              f"{phase['peak_rss_mb']:>14.1f} {phase['rss_delta_mb']:>+10.1f} {phase['objects_delta']:>+11,}"
+              + (f"  {Path(phase['label']).name}" if 'label' in phase else ''))
+    total = profile['total']
+    print(f"  {'gesamt':<12} {total['wall_seconds']:>9.3f} {total['cpu_seconds']:>9.3f} {total['peak_rss_mb']:>14.1f}")
+    if 'cprofile' in profile:
+        print(f"  cProfile: {profile['cprofile']['dump']} (python -m pstats)")
+    if 'tracemalloc' in profile:
+        print(f"  tracemalloc: {profile['tracemalloc']['dump']} ({profile['tracemalloc']['snapshot_mb']:.1f} MB im Snapshot)")
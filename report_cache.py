@@ -0,0 +1,156 @@
+"""Persistenter Report-Cache der Visualisierung und von serve_results.py
+
+Einträge (Pickle) sind an Größe und SHA-256 der Eingabedatei gebunden, der
+Cache bleibt per LRU unter einer Größengrenze. cached() kapselt Nachschlagen,
+Berechnen und Speichern für die Aufrufer.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+
+from comparison_loader import file_sha256
+from judge_cache import DEFAULT_CACHE_DIR
+from profiling import mark_phase
+
+# Bei Änderungen an extract_data/calculate_statistics/summarize_run erhöhen,
+# damit alte Cache-Einträge nicht mehr verwendet werden
+CACHE_SCHEMA_VERSION = 9
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# SHA-256 der Eingabedatei in einem Cache-Schlüssel (siehe ResultCache.key)
+_CACHE_KEY_HASH_RE = re.compile(r'-v\d+-\d+-([0-9a-f]{64})(?:-|$)')
+
+class ResultCache:
+    """Persistenter Cache für extrahierte und berechnete Run-Daten
+
+    Einträge werden per Pickle gespeichert und über Größe und SHA-256 der
+    Eingabedatei plus CACHE_SCHEMA_VERSION adressiert. Der Hash wird nur neu
+    berechnet, wenn sich Größe, mtime oder ctime der Datei geändert haben. Überschreitet
+    der Cache max_bytes, werden die am längsten ungenutzten Einträge gelöscht;
+    index.json behält nur Hashes, die noch ein Eintrag verwendet.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._index_path = self.cache_dir / 'index.json'
+        self._index = None
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _write_atomic(self, path, write):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _content_hash(self, json_path):
+        stat = json_path.stat()
+        index = self._load_index()
+        path_key = str(json_path.resolve())
+        entry = index.get(path_key)
+        # ctime lässt sich (anders als mtime) nicht zurücksetzen: gleich große, neu
+        # geschriebene Dateien mit wiederhergestellter mtime werden so auch neu gehasht
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns \
+                and entry.get('ctime_ns') == stat.st_ctime_ns:
+            return entry['sha256']
+        
+        index[path_key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'ctime_ns': stat.st_ctime_ns,
+                           'sha256': file_sha256(json_path)}
+        self._write_atomic(self._index_path, lambda f: f.write(json.dumps(index).encode('utf-8')))
+        return index[path_key]['sha256']
+
+    def key(self, json_path, kind, member=None):
+        """Cache-Schlüssel für eine Eingabedatei (kind trennt z.B. 'report' und 'run')"""
+        json_path = Path(json_path)
+        key = f'{kind}-v{CACHE_SCHEMA_VERSION}-{json_path.stat().st_size}-{self._content_hash(json_path)}'
+        if member is not None:
+            key += '-' + hashlib.sha256(member.encode('utf-8')).hexdigest()[:16]
+        return key
+
+    def get(self, key):
+        entry_path = self.cache_dir / f'{key}.pickle'
+        try:
+            with open(entry_path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            # Beschädigter Eintrag: verwerfen und neu berechnen
+            entry_path.unlink(missing_ok=True)
+            return None
+        os.utime(entry_path)
+        return value
+
+    def put(self, key, value):
+        entry_path = self.cache_dir / f'{key}.pickle'
+        self._write_atomic(entry_path, lambda f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict()
+
+    def evict(self):
+        """Löscht die am längsten ungenutzten Einträge, bis max_bytes eingehalten ist"""
+        entries = []
+        for entry_path in self.cache_dir.glob('*.pickle'):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        total = sum(size for _, size, _ in entries)
+        kept = []
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                kept.append(entry_path)
+                continue
+            entry_path.unlink(missing_ok=True)
+            total -= size
+        self._prune_index(kept)
+
+    def _prune_index(self, entry_paths):
+        """Entfernt Index-Einträge, deren Hash kein verbliebener Cache-Eintrag mehr nutzt"""
+        used = {m.group(1) for m in (_CACHE_KEY_HASH_RE.search(p.stem) for p in entry_paths) if m}
+        index = self._load_index()
+        stale = [path_key for path_key, entry in index.items() if entry['sha256'] not in used]
+        if not stale:
+            return
+        for path_key in stale:
+            del index[path_key]
+        self._write_atomic(self._index_path, lambda f: f.write(json.dumps(index).encode('utf-8')))
+
+def index_kind(kind, prompt_index, judge_cache=None):
+    """Cache-Art für Einträge, die mit Prompt-Index bzw. Judge-Cache berechnet wurden"""
+    if prompt_index is not None:
+        kind += f"-{prompt_index['digest'][:16]}"
+    if judge_cache is not None:
+        kind += f'-j{judge_cache.fingerprint()}'
+    return kind
+
+def cached(cache, json_path, kind, compute, member=None, profiler=None):
+    """Liefert den Cache-Eintrag für json_path oder berechnet und speichert ihn"""
+    if cache is None:
+        return compute()
+    mark_phase(profiler, 'cache-load')
+    key = cache.key(json_path, kind, member)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        mark_phase(profiler, 'cache-store')
+        cache.put(key, value)
+    else:
+        print(f"Cache-Treffer für {json_path}")
+    return value
@@ -0,0 +1,625 @@
+"""Statistiken eines Reports: Score-Matrix, Rankings, Bootstrap-Signifikanz, Ähnlichkeit, Kriterien
+
+Alles hier arbeitet auf den extrahierten Daten (comparison_loader.extract_data)
+bzw. auf den daraus gebauten Würfeln (ScoreCube, SimilarityCube, CriterionCube)
+und liefert die Abschnitte, die prepare_report zum Report zusammensetzt.
+"""
+
+import numpy as np
+
+from comparison_loader import (get_base_model_name, get_system_prompt_info, nan_mean, optional,
+                               reduce_prompt_similarities, similarity_array)
+from judge_cache import IDEAL_MODEL_ID
+
+class ScoreCube:
+    """Dichte Prompts × Konfigurationen-Darstellung der Ergebnis-Matrix
+
+    scores: float-Array (NaN = kein Score), errors: Fehler-Maske,
+    category_idx / base_idx: Index-Vektoren in categories / base_models.
+    """
+
+    def __init__(self, prompts, models, scores, errors, categories, category_idx, base_models, base_idx):
+        self.prompts = prompts
+        self.models = models
+        self.scores = scores
+        self.errors = errors
+        self.categories = categories
+        self.category_idx = category_idx
+        self.base_models = base_models
+        self.base_idx = base_idx
+
+    @classmethod
+    def from_results(cls, results, models, prompts, prompts_data):
+        missing = {'score': None, 'is_error': False}
+        cells = [[row.get(m, missing) for m in models] for row in (results.get(p, {}) for p in prompts)]
+        scores = np.array([[c['score'] for c in row] for row in cells], dtype=float).reshape(len(prompts), len(models))
+        errors = np.array([[c['is_error'] for c in row] for row in cells], dtype=bool).reshape(len(prompts), len(models))
+        prompt_categories = [prompts_data[p]['category'] for p in prompts]
+        return cls.from_arrays(prompts, models, scores, errors, prompt_categories)
+
+    @classmethod
+    def from_arrays(cls, prompts, models, scores, errors, prompt_categories):
+        # Kategorien und Basis-Modelle in Reihenfolge des ersten Auftretens
+        categories = list(dict.fromkeys(prompt_categories))
+        category_lookup = {c: idx for idx, c in enumerate(categories)}
+        category_idx = np.array([category_lookup[c] for c in prompt_categories], dtype=np.intp)
+
+        base_models = list(dict.fromkeys(get_base_model_name(m) for m in models))
+        base_lookup = {b: idx for idx, b in enumerate(base_models)}
+        base_idx = np.array([base_lookup[get_base_model_name(m)] for m in models], dtype=np.intp)
+
+        return cls(prompts, models, scores, errors, categories, category_idx, base_models, base_idx)
+
+    @property
+    def valid(self):
+        """Zellen mit Score und ohne Fehler"""
+        return ~self.errors & ~np.isnan(self.scores)
+
+    def config_stats(self):
+        """avg/min/max/count/errors pro Konfiguration (0 bei fehlenden Scores)"""
+        valid = self.valid
+        count = valid.sum(axis=0)
+        has_scores = count > 0
+        totals = self._column_sums(np.where(valid, self.scores, 0.0))
+        avg = np.divide(totals, count, out=np.zeros(len(self.models)), where=has_scores)
+        low = np.where(valid, self.scores, np.inf).min(axis=0, initial=np.inf)
+        high = np.where(valid, self.scores, -np.inf).max(axis=0, initial=-np.inf)
+        return {
+            'avg': avg,
+            'min': np.where(has_scores, low, 0.0),
+            'max': np.where(has_scores, high, 0.0),
+            'count': count,
+            'errors': self.errors.sum(axis=0),
+        }
+
+    def category_stats(self):
+        """Kategorie-Durchschnitte (Kategorien × Konfigurationen, NaN = keine Scores)"""
+        valid = self.valid
+        valid_scores = np.where(valid, self.scores, 0.0)
+        totals = np.zeros((len(self.categories), len(self.models)))
+        counts = np.zeros((len(self.categories), len(self.models)), dtype=np.int64)
+        for c in range(len(self.categories)):
+            rows = self.category_idx == c
+            totals[c] = self._column_sums(valid_scores[rows])
+            counts[c] = valid[rows].sum(axis=0)
+        return np.divide(totals, counts, out=np.full(totals.shape, np.nan), where=counts > 0)
+
+    @staticmethod
+    def _column_sums(values):
+        # Zeilenweise über die transponierte Kopie summieren: die Summe einer
+        # Konfiguration hängt so nicht davon ab, welche anderen Spalten im Cube
+        # stehen (wichtig für inkrementelle Neuberechnung einzelner Spalten)
+        return np.ascontiguousarray(values.T).sum(axis=1)
+
+    def select_configs(self, columns):
+        """Teil-Cube mit den angegebenen Konfigurations-Spalten"""
+        return ScoreCube(self.prompts, [self.models[j] for j in columns],
+                         self.scores[:, columns], self.errors[:, columns],
+                         self.categories, self.category_idx, self.base_models, self.base_idx[columns])
+
+    def bootstrap_means(self, resamples, seed=0, batch=None):
+        """Mittelwerte je Konfiguration für resamples Bootstrap-Stichproben über die Prompts
+
+        Jede Stichprobe zieht die Prompts mit Zurücklegen, gemeinsam für alle
+        Konfigurationen (gepaarte Vergleiche). Als Multinomial-Gewichte geschrieben
+        ist eine ganze Charge von Stichproben ein Matrixprodukt Gewichte × Scores.
+        Liefert ein resamples × Konfigurationen-Array (NaN = keine Scores gezogen).
+        """
+        valid = self.valid
+        scores = np.where(valid, self.scores, 0.0)
+        present = valid.astype(float)
+        n_prompts = len(self.prompts)
+        batch = batch or BOOTSTRAP_BATCH
+        rng = np.random.default_rng(seed)
+        means = np.full((resamples, len(self.models)), np.nan)
+        if n_prompts == 0:
+            return means
+        probabilities = np.full(n_prompts, 1.0 / n_prompts)
+        for start in range(0, resamples, batch):
+            size = min(batch, resamples - start)
+            weights = rng.multinomial(n_prompts, probabilities, size=size).astype(float)
+            totals = weights @ scores
+            counts = weights @ present
+            np.divide(totals, counts, out=means[start:start + size], where=counts > 0)
+        return means
+
+    def best_config_per_base(self, avg):
+        """Index der besten Konfiguration je Basis-Modell (bei Gleichstand die erste)"""
+        order = np.lexsort((np.arange(len(self.models)), -avg, self.base_idx))
+        _, first = np.unique(self.base_idx[order], return_index=True)
+        return order[first]
+
+def calculate_statistics(results, models, prompts, prompts_data):
+    """Berechnet Statistiken und Rankings"""
+    cube = ScoreCube.from_results(results, models, prompts, prompts_data)
+    return statistics_from_cube(cube)
+
+def statistics_from_cube(cube):
+    """Berechnet Statistiken und Rankings aus einem ScoreCube"""
+    model_stats = config_statistics(cube)
+    return (model_stats, *rank_statistics(cube, model_stats))
+
+def config_statistics(cube, models=None):
+    """Statistiken pro Konfiguration (nur für models, Standard: alle)"""
+    if models is not None:
+        model_lookup = {m: j for j, m in enumerate(cube.models)}
+        cube = cube.select_configs([model_lookup[m] for m in models])
+    config_stats = cube.config_stats()
+    category_avgs = cube.category_stats()
+    
+    # Model Statistics (für alle Konfigurationen)
+    model_stats = {}
+    for j, model in enumerate(cube.models):
+        count = int(config_stats['count'][j])
+        model_stats[model] = {
+            'avg': float(config_stats['avg'][j]) if count else 0,
+            'min': float(config_stats['min'][j]) if count else 0,
+            'max': float(config_stats['max'][j]) if count else 0,
+            'count': count,
+            'errors': int(config_stats['errors'][j]),
+            'category_avg': {
+                cat: float(category_avgs[c, j])
+                for c, cat in enumerate(cube.categories) if not np.isnan(category_avgs[c, j])
+            },
+            'base_name': get_base_model_name(model),
+            'sp_info': get_system_prompt_info(model)
+        }
+    return model_stats
+
+def rank_statistics(cube, model_stats):
+    """Rankings und Kategorie-Sieger aus den Statistiken pro Konfiguration"""
+    models = cube.models
+    
+    # Detailed Ranking (alle Konfigurationen)
+    detailed_ranking = sorted(model_stats.items(), key=lambda x: x[1]['avg'], reverse=True)
+    
+    # Consolidated Ranking (beste Konfiguration pro Basis-Modell)
+    avg = np.array([model_stats[m]['avg'] for m in models], dtype=float)
+    best_idx = cube.best_config_per_base(avg)
+    base_model_best = {}
+    for j in best_idx:
+        base_model_best[cube.base_models[cube.base_idx[j]]] = (models[j], model_stats[models[j]])
+    
+    consolidated_ranking = sorted(base_model_best.values(), key=lambda x: x[1]['avg'], reverse=True)
+    
+    # Category Best Models (nur beste Konfiguration pro Basis-Modell)
+    best_category_avgs = np.array([
+        [model_stats[models[j]]['category_avg'].get(category, np.nan) for j in best_idx]
+        for category in cube.categories
+    ], dtype=float).reshape(len(cube.categories), len(best_idx))
+    category_best = {}
+    for category in set(cube.categories):
+        row = best_category_avgs[cube.categories.index(category)]
+        if np.isnan(row).all():
+            continue
+        b = int(np.nanargmax(row))
+        category_best[category] = (models[best_idx[b]], float(row[b]))
+    
+    return consolidated_ranking, detailed_ranking, category_best
+
+# Bootstrap über Prompts für Konfidenzintervalle und paarweise Vergleiche (fester Seed,
+# damit wiederholte Renders identisch sind)
+BOOTSTRAP_RESAMPLES = 10000
+BOOTSTRAP_SEED = 0
+BOOTSTRAP_BATCH = 500
+SIGNIFICANCE_ALPHA = 0.05
+# Signifikanz-Matrix im Report nur bis zu dieser Anzahl Konfigurationen zeigen
+SIGNIFICANCE_MATRIX_MAX_CONFIGS = 40
+
+def pairwise_p_values(means, batch=BOOTSTRAP_BATCH):
+    """Zweiseitige Bootstrap-p-Werte für alle Paare von Konfigurationen
+
+    Anteil der Stichproben, in denen a vor b liegt (Gleichstand zählt halb),
+    p = 2 · min(Anteil, 1 - Anteil). NaN, wo kein Paar vergleichbar war.
+    """
+    n_models = means.shape[1]
+    greater = np.zeros((n_models, n_models), dtype=np.int64)
+    for start in range(0, len(means), batch):
+        block = means[start:start + batch]
+        greater += (block[:, :, None] > block[:, None, :]).sum(axis=0)
+    finite = (~np.isnan(means)).astype(float)
+    comparable = finite.T @ finite
+    # Gleichstände = vergleichbare Stichproben, in denen keiner vorne liegt
+    wins = greater + 0.5 * (comparable - greater - greater.T)
+    share = np.divide(wins, comparable, out=np.full(wins.shape, np.nan), where=comparable > 0)
+    p_values = np.minimum(1.0, 2 * np.minimum(share, 1 - share))
+    np.fill_diagonal(p_values, 1.0)
+    return p_values
+
+def tie_groups(ranking, p_values, model_index, alpha=SIGNIFICANCE_ALPHA):
+    """Platzbereich (erster, letzter) je Konfiguration eines nach avg sortierten Rankings
+
+    Eine Konfiguration gehört zur Gruppe des vorherigen Eintrags, solange sie sich
+    nicht signifikant vom Ersten dieser Gruppe unterscheidet.
+    """
+    groups = []
+    for model_id, _ in ranking:
+        if groups:
+            p = p_values[model_index[groups[-1][0]], model_index[model_id]]
+            if not np.isnan(p) and p >= alpha:
+                groups[-1].append(model_id)
+                continue
+        groups.append([model_id])
+    ranks = {}
+    position = 1
+    for group in groups:
+        for model_id in group:
+            ranks[model_id] = (position, position + len(group) - 1)
+        position += len(group)
+    return ranks
+
+def significance_statistics(cube, consolidated_ranking, detailed_ranking, resamples=BOOTSTRAP_RESAMPLES):
+    """95%-Konfidenzintervalle, paarweise p-Werte und Gleichstands-Gruppen der Rankings"""
+    means = cube.bootstrap_means(resamples, BOOTSTRAP_SEED)
+    has_scores = (~np.isnan(means)).any(axis=0)
+    bounds = np.full((2, len(cube.models)), np.nan)
+    if has_scores.any():
+        bounds[:, has_scores] = np.nanpercentile(means[:, has_scores], [2.5, 97.5], axis=0)
+    p_values = pairwise_p_values(means)
+    model_index = {m: j for j, m in enumerate(cube.models)}
+    return {
+        'resamples': resamples,
+        'alpha': SIGNIFICANCE_ALPHA,
+        'ci': {m: (float(bounds[0, j]), float(bounds[1, j])) for j, m in enumerate(cube.models) if has_scores[j]},
+        'models': cube.models,
+        'p_values': p_values,
+        'consolidated': tie_groups(consolidated_ranking, p_values, model_index),
+        'detailed': tie_groups(detailed_ranking, p_values, model_index),
+    }
+
+# Schnitt für Cluster: mittlere paarweise Ähnlichkeit der zusammengefassten Konfigurationen
+SIMILARITY_CLUSTER_THRESHOLD = 0.85
+# Robuster z-Wert (Median/MAD je Prompt), ab dem eine Antwort als Ausreißer gilt
+SIMILARITY_OUTLIER_Z = 3.5
+SIMILARITY_OUTLIER_MIN_CONFIGS = 4
+SIMILARITY_OUTLIERS_SHOWN = 30
+# Ähnlichkeitsmatrix im Report nur bis zu dieser Anzahl Konfigurationen zeigen
+SIMILARITY_MATRIX_MAX_CONFIGS = 40
+
+class SimilarityCube:
+    """Embedding-Ähnlichkeiten eines Runs als dichte Arrays über die Konfigurationen
+
+    matrix: Konfigurationen × Konfigurationen über den ganzen Run, ideal: Ähnlichkeit
+    jeder Konfiguration zu IDEAL_BENCHMARK, prompt_ideal / prompt_peer: Prompts ×
+    Konfigurationen mit der Ähnlichkeit zur Idealantwort bzw. der mittleren
+    Ähnlichkeit zu den anderen Antworten desselben Prompts. NaN = keine Daten.
+    """
+
+    def __init__(self, prompts, models, matrix, ideal, prompt_ideal, prompt_peer):
+        self.prompts = prompts
+        self.models = models
+        self.matrix = matrix
+        self.ideal = ideal
+        self.prompt_ideal = prompt_ideal
+        self.prompt_peer = prompt_peer
+
+    @classmethod
+    def from_data(cls, data, models, prompts):
+        """Aus evaluationResults.similarityMatrix / perPromptSimilarities (None ohne Daten)"""
+        eval_results = data.get('evaluationResults', {})
+        overall = eval_results.get('similarityMatrix') or {}
+        per_prompt = eval_results.get('perPromptSimilarities') or {}
+        if not overall and not per_prompt:
+            return None
+        
+        dense = similarity_array(overall, [IDEAL_MODEL_ID] + models)
+        model_lookup = {m: j for j, m in enumerate(models)}
+        prompt_ideal = np.full((len(prompts), len(models)), np.nan)
+        prompt_peer = np.full((len(prompts), len(models)), np.nan)
+        for i, prompt_id in enumerate(prompts):
+            if not per_prompt.get(prompt_id):
+                continue
+            configs, ideal, peer = reduce_prompt_similarities(per_prompt[prompt_id])
+            columns = np.array([model_lookup.get(m, -1) for m in configs], dtype=np.intp)
+            known = columns >= 0
+            prompt_ideal[i, columns[known]] = ideal[known]
+            prompt_peer[i, columns[known]] = peer[known]
+        return cls(prompts, models, dense[1:, 1:], dense[0, 1:], prompt_ideal, prompt_peer)
+
+    def ideal_stats(self):
+        """Ähnlichkeit zur Idealantwort: gesamt, Mittel/Streuung über Prompts, Anzahl Prompts"""
+        valid = ~np.isnan(self.prompt_ideal)
+        count = valid.sum(axis=0)
+        mean = nan_mean(self.prompt_ideal, axis=0)
+        deviation = np.where(valid, self.prompt_ideal - mean, 0.0)
+        std = np.sqrt(np.divide((deviation ** 2).sum(axis=0), count,
+                                out=np.full(len(self.models), np.nan), where=count > 0))
+        return {'overall': self.ideal, 'mean': mean, 'std': std, 'count': count}
+
+    def clusters(self, threshold=SIMILARITY_CLUSTER_THRESHOLD):
+        """Average-Linkage-Cluster der Konfigurationen über die Gesamt-Matrix
+
+        Verschmilzt schrittweise die beiden Cluster mit der höchsten mittleren
+        paarweisen Ähnlichkeit (fehlende Paare zählen nicht mit), bis diese unter
+        threshold fällt. Liefert (Cluster als Indexlisten, Indizes ohne Daten).
+        """
+        n = len(self.models)
+        known = ~np.isnan(self.matrix)
+        np.fill_diagonal(known, False)
+        has_data = known.any(axis=1)
+        totals = np.where(known, self.matrix, 0.0)
+        counts = known.astype(float)
+        members = {j: [j] for j in np.flatnonzero(has_data)}
+        active = has_data.copy()
+        while active.sum() > 1:
+            linkage = np.divide(totals, counts, out=np.full((n, n), -np.inf), where=counts > 0)
+            linkage[~active] = -np.inf
+            linkage[:, ~active] = -np.inf
+            np.fill_diagonal(linkage, -np.inf)
+            a, b = divmod(int(np.argmax(linkage)), n)
+            if linkage[a, b] < threshold:
+                break
+            # Summen und Anzahlen von b in a übernehmen (Lance-Williams für Average Linkage)
+            totals[a] += totals[b]
+            totals[:, a] = totals[a]
+            counts[a] += counts[b]
+            counts[:, a] = counts[a]
+            members[a] += members.pop(b)
+            active[b] = False
+        return [members[j] for j in np.flatnonzero(active)], list(np.flatnonzero(~has_data))
+
+    def cohesion(self, cluster):
+        """Mittlere paarweise Ähnlichkeit innerhalb eines Clusters (NaN für Einzelne)"""
+        block = self.matrix[np.ix_(cluster, cluster)].copy()
+        np.fill_diagonal(block, np.nan)
+        return float(nan_mean(block.ravel(), axis=0))
+
+    def outlier_scores(self):
+        """Robuste z-Werte der Ähnlichkeit zu den anderen Antworten, je Prompt
+
+        (Wert - Median) / (1.4826 · MAD) über die Konfigurationen eines Prompts;
+        NaN bei fehlenden Daten oder zu wenigen Antworten im Prompt.
+        """
+        scores = np.full(self.prompt_peer.shape, np.nan)
+        rows = (~np.isnan(self.prompt_peer)).sum(axis=1) >= SIMILARITY_OUTLIER_MIN_CONFIGS
+        peer = self.prompt_peer[rows]
+        median = np.nanmedian(peer, axis=1, keepdims=True)
+        mad = 1.4826 * np.nanmedian(np.abs(peer - median), axis=1, keepdims=True)
+        scores[rows] = np.divide(peer - median, mad, out=np.full(peer.shape, np.nan), where=mad > 0)
+        return scores
+
+def average_ranks(values):
+    """Ränge (ab 0) mit gemittelten Rängen bei Gleichstand"""
+    order = np.argsort(values, kind='mergesort')
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(len(values))
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    return np.bincount(inverse, weights=ranks)[inverse] / counts[inverse]
+
+def rank_correlation(x, y):
+    """Spearman-Korrelation über die Paare ohne NaN (None bei zu wenigen Paaren)"""
+    both = ~np.isnan(x) & ~np.isnan(y)
+    if both.sum() < 3:
+        return None
+    rx, ry = average_ranks(x[both]), average_ranks(y[both])
+    if rx.std() == 0 or ry.std() == 0:
+        return None
+    return float(np.corrcoef(rx, ry)[0, 1])
+
+def similarity_statistics(sim, model_stats):
+    """Ranking nach Ähnlichkeit zur Idealantwort, Cluster und Ausreißer für den Report"""
+    models = sim.models
+    stats = sim.ideal_stats()
+    # Ohne Gesamt-Matrix nach dem Mittel über die Prompts sortieren
+    key = np.where(np.isnan(stats['overall']), stats['mean'], stats['overall'])
+    
+    z = sim.outlier_scores()
+    flagged = z <= -SIMILARITY_OUTLIER_Z
+    outlier_counts = flagged.sum(axis=0)
+    rows, columns = np.nonzero(flagged)
+    order = np.argsort(z[rows, columns], kind='mergesort')[:SIMILARITY_OUTLIERS_SHOWN]
+    valid_peer = ~np.isnan(sim.prompt_peer)
+    prompt_median = np.full(len(sim.prompts), np.nan)
+    has_peers = valid_peer.any(axis=1)
+    prompt_median[has_peers] = np.nanmedian(sim.prompt_peer[has_peers], axis=1)
+    
+    ranking = []
+    for j in sorted(range(len(models)), key=lambda j: (np.isnan(key[j]), -np.nan_to_num(key[j]), j)):
+        ranking.append({
+            'model': models[j],
+            'overall': optional(stats['overall'][j]),
+            'mean': optional(stats['mean'][j]),
+            'std': optional(stats['std'][j]),
+            'prompts': int(stats['count'][j]),
+            'outliers': int(outlier_counts[j]),
+        })
+    
+    clusters, without_data = sim.clusters()
+    clusters.sort(key=lambda c: -len(c))
+    matrix_order = [j for cluster in clusters for j in cluster]
+    show_matrix = 1 < len(matrix_order) <= SIMILARITY_MATRIX_MAX_CONFIGS
+    
+    coverage = np.array([model_stats[m]['avg'] if model_stats[m]['count'] else np.nan for m in models], dtype=float)
+    return {
+        'ranking': ranking,
+        'rank_correlation': rank_correlation(key, coverage),
+        'threshold': SIMILARITY_CLUSTER_THRESHOLD,
+        'clusters': [{'members': [models[j] for j in c], 'cohesion': optional(sim.cohesion(c))} for c in clusters],
+        'without_data': [models[j] for j in without_data],
+        'matrix_models': [models[j] for j in matrix_order] if show_matrix else None,
+        'matrix': ([[optional(sim.matrix[a, b]) for b in matrix_order] for a in matrix_order]
+                   if show_matrix else None),
+        'outlier_total': int(flagged.sum()),
+        'outliers': [{
+            'prompt': sim.prompts[rows[k]],
+            'model': models[columns[k]],
+            'peer': float(sim.prompt_peer[rows[k], columns[k]]),
+            'median': float(prompt_median[rows[k]]),
+            'z': float(z[rows[k], columns[k]]),
+            'ideal': optional(sim.prompt_ideal[rows[k], columns[k]]),
+        } for k in order],
+    }
+
+# Kriterien: ab diesem Erfüllungsgrad gilt ein Kriterium als erfüllt (wie im Detail-Modal)
+CRITERIA_PASS = 0.5
+# Trennschärfe erst ab so vielen bewerteten Konfigurationen berechnen
+CRITERIA_MIN_CONFIGS = 3
+CRITERIA_SHOWN = 25
+
+class CriterionCube:
+    """Erfüllungsgrade der Einzelkriterien als dichtes Kriterien × Konfigurationen-Array
+
+    Eine Zeile ist ein Kriterium eines Prompts (keyPointText als Index in texts,
+    should_not getrennt von gleichlautenden should-Kriterien). coverage enthält den
+    Erfüllungsgrad 0..1, NaN = nicht bewertet. Für should_not-Kriterien ist
+    coverageExtent schon invertiert (1 = Falle vermieden), sodass beide Arten in
+    dieselbe Richtung zeigen.
+    """
+
+    def __init__(self, prompts, models, texts, prompt_idx, text_idx, inverted, coverage):
+        self.prompts = prompts
+        self.models = models
+        self.texts = texts
+        self.prompt_idx = prompt_idx
+        self.text_idx = text_idx
+        self.inverted = inverted
+        self.coverage = coverage
+
+    @classmethod
+    def from_scores(cls, llm_scores, models, prompts, errors=None, previous=None, reuse=()):
+        """Aus {Prompt: {Konfiguration: llmCoverageScores-Eintrag}}; Fehler-Zellen zählen nicht
+
+        Die Zeilen eines Prompts hängen nur an dessen Zellen: für die Prompts in
+        reuse werden sie aus previous (Cube mit denselben Konfigurationen)
+        übernommen. Reihenfolge der Zeilen und Texte ist dieselbe wie bei einem
+        vollständigen Aufbau.
+        """
+        previous_rows = {}
+        if reuse:
+            order = np.argsort(previous.prompt_idx, kind='stable')
+            starts = np.searchsorted(previous.prompt_idx[order], np.arange(len(previous.prompts) + 1))
+            previous_rows = {prompt_id: order[starts[i]:starts[i + 1]] for i, prompt_id in enumerate(previous.prompts)}
+        
+        text_lookup = {}
+        row_lookup = {}
+        rows, columns, values = [], [], []
+        copied_rows, copied_from = [], []
+        for i, prompt_id in enumerate(prompts):
+            if prompt_id in reuse:
+                for k in previous_rows[prompt_id].tolist():
+                    text_id = text_lookup.setdefault(previous.texts[previous.text_idx[k]], len(text_lookup))
+                    key = (i, text_id, bool(previous.inverted[k]))
+                    copied_rows.append(row_lookup.setdefault(key, len(row_lookup)))
+                    copied_from.append(k)
+                continue
+            prompt_scores = llm_scores.get(prompt_id) or {}
+            for j, model_id in enumerate(models):
+                score_data = prompt_scores.get(model_id)
+                if not isinstance(score_data, dict) or (errors is not None and errors[i, j]):
+                    continue
+                for assessment in score_data.get('pointAssessments') or []:
+                    coverage = assessment.get('coverageExtent', 0)
+                    if coverage is None:
+                        continue
+                    text_id = text_lookup.setdefault(assessment.get('keyPointText', ''), len(text_lookup))
+                    key = (i, text_id, bool(assessment.get('isInverted', False)))
+                    rows.append(row_lookup.setdefault(key, len(row_lookup)))
+                    columns.append(j)
+                    values.append(coverage)
+        
+        keys = np.array(list(row_lookup), dtype=np.intp).reshape(len(row_lookup), 3)
+        coverage = np.full((len(row_lookup), len(models)), np.nan)
+        coverage[np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)] = values
+        if copied_rows:
+            coverage[copied_rows] = previous.coverage[copied_from]
+        return cls(prompts, models, list(text_lookup), keys[:, 0], keys[:, 1], keys[:, 2].astype(bool), coverage)
+
+    @classmethod
+    def from_data(cls, data, models, prompts, errors=None):
+        """Aus evaluationResults.llmCoverageScores eines Runs"""
+        llm_scores = data.get('evaluationResults', {}).get('llmCoverageScores', {})
+        return cls.from_scores(llm_scores, models, prompts, errors)
+
+    def difficulty(self):
+        """Bewertete Konfigurationen, mittlerer Erfüllungsgrad und Anteil erfüllt je Kriterium"""
+        valid = ~np.isnan(self.coverage)
+        count = valid.sum(axis=1)
+        passed = (valid & (np.where(valid, self.coverage, 0.0) >= CRITERIA_PASS)).sum(axis=1)
+        pass_rate = np.divide(passed, count, out=np.full(len(count), np.nan), where=count > 0)
+        return count, nan_mean(self.coverage, axis=1), pass_rate
+
+    def discrimination(self):
+        """Trennschärfe: Korrelation zwischen Kriterium und Rest-Erfüllung der Konfiguration
+
+        Die Rest-Erfüllung ist der mittlere Erfüllungsgrad der Konfiguration über
+        alle anderen Kriterien (Item-Rest-Korrelation). Positive Werte: starke
+        Konfigurationen erfüllen das Kriterium eher. NaN bei weniger als
+        CRITERIA_MIN_CONFIGS Konfigurationen oder ohne Streuung.
+        """
+        valid = ~np.isnan(self.coverage)
+        values = np.where(valid, self.coverage, 0.0)
+        column_count = valid.sum(axis=0)
+        rest = np.divide(values.sum(axis=0) - values, column_count - 1,
+                         out=np.zeros(values.shape), where=column_count > 1)
+        valid &= column_count > 1
+        count = valid.sum(axis=1)
+        safe_count = np.maximum(count, 1)
+        x = np.where(valid, values - (values * valid).sum(axis=1, keepdims=True) / safe_count[:, None], 0.0)
+        y = np.where(valid, rest - np.where(valid, rest, 0.0).sum(axis=1, keepdims=True) / safe_count[:, None], 0.0)
+        x_var = (x * x).sum(axis=1)
+        y_var = (y * y).sum(axis=1)
+        defined = (count >= CRITERIA_MIN_CONFIGS) & (x_var > 1e-12) & (y_var > 1e-12)
+        return np.divide((x * y).sum(axis=1), np.sqrt(x_var * y_var),
+                         out=np.full(len(count), np.nan), where=defined)
+
+def criterion_statistics(cube):
+    """Schwerste Kriterien, Trennschärfe und should_not-Fallen über alle Konfigurationen"""
+    count, fulfilment, pass_rate = cube.difficulty()
+    discrimination = cube.discrimination()
+    valid = ~np.isnan(cube.coverage)
+    failed = valid & (np.where(valid, cube.coverage, 1.0) < CRITERIA_PASS)
+    # Beispiel-Konfiguration mit dem niedrigsten Erfüllungsgrad (für das Detail-Modal)
+    example = np.argmin(np.where(valid, cube.coverage, np.inf), axis=1) if len(cube.models) else np.zeros(0, dtype=np.intp)
+    should = np.flatnonzero(~cube.inverted)
+    traps = np.flatnonzero(cube.inverted)
+    defined = np.flatnonzero(~np.isnan(discrimination))
+    
+    def entries(order):
+        return [{
+            'prompt': cube.prompts[cube.prompt_idx[k]],
+            'text': cube.texts[cube.text_idx[k]],
+            'inverted': bool(cube.inverted[k]),
+            'configs': int(count[k]),
+            'fulfilment': float(fulfilment[k]),
+            'pass_rate': float(pass_rate[k]),
+            'failed': int(failed[k].sum()),
+            'discrimination': optional(discrimination[k]),
+            'example': cube.models[example[k]],
+        } for k in order[:CRITERIA_SHOWN]]
+    
+    # Stabile Sortierungen: bei Gleichstand zuerst Kriterien mit mehr Bewertungen
+    hardest = should[np.lexsort((-count[should], fulfilment[should]))]
+    worst_traps = traps[np.lexsort((-count[traps], fulfilment[traps], pass_rate[traps]))]
+    by_discrimination = defined[np.argsort(-discrimination[defined], kind='mergesort')]
+    negative = by_discrimination[discrimination[by_discrimination] < 0][::-1]
+    
+    trap_counts = (valid & cube.inverted[:, None]).sum(axis=0)
+    trap_falls = (failed & cube.inverted[:, None]).sum(axis=0)
+    trap_rate = np.divide(trap_falls, trap_counts, out=np.zeros(len(cube.models)), where=trap_counts > 0)
+    fallen = np.flatnonzero(trap_falls)
+    config_traps = [{
+        'model': cube.models[j],
+        'falls': int(trap_falls[j]),
+        'assessed': int(trap_counts[j]),
+        'rate': float(trap_rate[j]),
+    } for j in fallen[np.argsort(-trap_rate[fallen], kind='mergesort')][:CRITERIA_SHOWN]]
+    
+    assessments = int(count.sum())
+    return {
+        'criteria': len(count),
+        'should': len(should),
+        'should_not': len(traps),
+        'assessments': assessments,
+        'pass_rate': float(1 - failed.sum() / assessments) if assessments else None,
+        'should_fulfilment': optional(nan_mean(cube.coverage[should].ravel(), axis=0)),
+        'should_not_fulfilment': optional(nan_mean(cube.coverage[traps].ravel(), axis=0)),
+        'discriminating': len(defined),
+        'negative_total': int((discrimination[defined] < 0).sum()),
+        'threshold': CRITERIA_PASS,
+        'min_configs': CRITERIA_MIN_CONFIGS,
+        'hardest': entries(hardest),
+        'traps': entries(worst_traps),
+        'top_discrimination': entries(by_discrimination),
+        'negative': entries(negative),
+        'config_traps': config_traps,
+    }
@@ -0,0 +1,383 @@
+"""Indizierte SQLite-Ablage vieler Runs (geschrieben von export_results_db.py)
+
+Die Visualisierung (--from-db) und serve_results.py öffnen die Datenbank nur
+lesend und bauen einen Run mit load_run wieder als Comparison-Felder auf.
+"""
+
+import calendar
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from comparison_loader import (EXTRACT_FIELDS, extract_prompt, file_sha256, get_base_model_name,
+                               get_system_prompt_info, load_comparison, optional)
+
+RESULTS_DB_NAME = 'results.sqlite'
+RESULTS_DB_VERSION = 1
+
+# Felder, die der Export zusätzlich zu EXTRACT_FIELDS liest: die Metadaten des Runs
+EXPORT_RUN_FIELDS = {
+    'configId': True,
+    'configTitle': True,
+    'runLabel': True,
+    'timestamp': True,
+}
+
+# timestamp der Comparison-JSON, z.B. 2025-10-21T16-56-59-853Z (UTC)
+_RUN_TIMESTAMP_RE = re.compile(r'(\d{4}-\d\d-\d\dT\d\d)[-:](\d\d)[-:](\d\d)')
+
+# Spalten ohne Typ (score, coverage, multiplier) speichern Werte unverändert,
+# damit 1 und 1.0 wie in der JSON verschieden bleiben und der Report aus der
+# Datenbank exakt dem aus der JSON entspricht
+RESULTS_DB_SCHEMA = '''
+CREATE TABLE runs (
+    run_id INTEGER PRIMARY KEY, source TEXT NOT NULL, member TEXT, source_size INTEGER NOT NULL,
+    source_mtime_ns INTEGER NOT NULL, content_hash TEXT NOT NULL UNIQUE, blueprint_id TEXT, title TEXT,
+    run_label TEXT, timestamp TEXT, imported_at TEXT NOT NULL);
+CREATE TABLE configs (
+    config_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, base_model TEXT NOT NULL,
+    system_prompt TEXT NOT NULL);
+CREATE TABLE run_configs (
+    run_id INTEGER NOT NULL, position INTEGER NOT NULL, config_id INTEGER NOT NULL,
+    PRIMARY KEY (run_id, position)) WITHOUT ROWID;
+CREATE TABLE criteria (criterion_id INTEGER PRIMARY KEY, text TEXT NOT NULL UNIQUE);
+CREATE TABLE prompts (
+    prompt_key INTEGER PRIMARY KEY, run_id INTEGER NOT NULL, position INTEGER NOT NULL,
+    prompt_id TEXT NOT NULL, category TEXT NOT NULL, description TEXT, prompt TEXT, ideal TEXT,
+    UNIQUE (run_id, prompt_id));
+CREATE TABLE prompt_criteria (
+    prompt_key INTEGER NOT NULL, is_inverted INTEGER NOT NULL, position INTEGER NOT NULL,
+    criterion_id INTEGER NOT NULL, PRIMARY KEY (prompt_key, is_inverted, position)) WITHOUT ROWID;
+CREATE TABLE cells (
+    cell_id INTEGER PRIMARY KEY, prompt_key INTEGER NOT NULL, config_id INTEGER NOT NULL, response TEXT,
+    is_error INTEGER NOT NULL, score, key_points INTEGER, error TEXT, UNIQUE (prompt_key, config_id));
+CREATE TABLE assessments (
+    cell_id INTEGER NOT NULL, position INTEGER NOT NULL, criterion_id INTEGER NOT NULL,
+    is_inverted INTEGER NOT NULL, coverage, multiplier, judge TEXT, reflection TEXT, error TEXT,
+    PRIMARY KEY (cell_id, position)) WITHOUT ROWID;
+CREATE TABLE judgements (
+    cell_id INTEGER NOT NULL, position INTEGER NOT NULL, seq INTEGER NOT NULL, judge TEXT NOT NULL,
+    coverage, reflection TEXT, PRIMARY KEY (cell_id, position, seq)) WITHOUT ROWID;
+CREATE TABLE similarities (
+    run_id INTEGER NOT NULL, config_a INTEGER NOT NULL, config_b INTEGER NOT NULL, value REAL,
+    PRIMARY KEY (run_id, config_a, config_b)) WITHOUT ROWID;
+CREATE TABLE prompt_similarities (
+    prompt_key INTEGER NOT NULL, position INTEGER NOT NULL, config_id INTEGER NOT NULL, ideal REAL, peer REAL,
+    PRIMARY KEY (prompt_key, position)) WITHOUT ROWID;
+CREATE INDEX prompts_prompt_id ON prompts (prompt_id);
+CREATE INDEX cells_config ON cells (config_id);
+CREATE INDEX assessments_criterion ON assessments (criterion_id, coverage);
+CREATE INDEX configs_base_model ON configs (base_model);
+CREATE VIEW criterion_results AS
+    SELECT p.run_id, r.source, p.prompt_id, p.category, g.name AS config, g.base_model,
+           cr.text AS criterion, a.is_inverted, a.coverage, c.score
+    FROM assessments a
+    JOIN cells c ON c.cell_id = a.cell_id
+    JOIN prompts p ON p.prompt_key = c.prompt_key
+    JOIN runs r ON r.run_id = p.run_id
+    JOIN configs g ON g.config_id = c.config_id
+    JOIN criteria cr ON cr.criterion_id = a.criterion_id;
+'''
+
+def run_time(run, fallback=None):
+    """Zeitpunkt eines Runs (Epoch): timestamp der Evaluation, sonst run[fallback] (lokale Zeit), sonst 0"""
+    match = _RUN_TIMESTAMP_RE.match(run.get('timestamp') or '')
+    if match:
+        return calendar.timegm(time.strptime('{}:{}:{}'.format(*match.groups()), '%Y-%m-%dT%H:%M:%S'))
+    try:
+        return time.mktime(time.strptime(run[fallback], '%Y-%m-%dT%H:%M:%S'))
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+def latest_run(runs, fallback=None):
+    """Jüngster Run nach run_time, bei Gleichstand der zuletzt gelistete; None ohne Runs
+
+    Gilt für 'latest' in --from-db (Reihenfolge nach run_id) wie in serve_results.py.
+    """
+    return max(reversed(runs), key=lambda run: run_time(run, fallback), default=None)
+
+class ResultsDatabase:
+    """Indizierte Ablage vieler Runs in normalisierten SQLite-Tabellen
+
+    Runs, Konfigurationen, Prompts, Zellen (Antwort und Score) und die einzelnen
+    Kriterien-Bewertungen samt Judge-Urteilen stehen in eigenen Tabellen, sodass
+    sich Fragen über alle Runs per SQL beantworten lassen, ohne JSON zu laden
+    (bequem über die View criterion_results). import_run hängt einen Run in einer
+    Transaktion an, bereits importierte Inhalte werden übersprungen. load_run baut
+    daraus die Felder der Comparison-JSON wieder auf, die prepare_report braucht.
+    """
+
+    RUN_COLUMNS = ('run_id', 'source', 'member', 'blueprint_id', 'title', 'run_label', 'timestamp', 'imported_at',
+                   'content_hash')
+
+    def __init__(self, path, readonly=False):
+        self.path = Path(path)
+        if readonly:
+            self._db = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute('PRAGMA journal_mode = WAL')
+            self._db.execute('PRAGMA synchronous = NORMAL')
+        version = self._db.execute('PRAGMA user_version').fetchone()[0]
+        if version == 0 and not readonly:
+            self._db.executescript(RESULTS_DB_SCHEMA + f'PRAGMA user_version = {RESULTS_DB_VERSION};')
+        elif version != RESULTS_DB_VERSION:
+            self._db.close()
+            raise ValueError(f'{self.path} ist keine Ergebnis-Datenbank in Version {RESULTS_DB_VERSION} '
+                             f'(gefunden: {version})')
+
+    def close(self):
+        self._db.close()
+
+    def _ids(self, table, id_column, key_column, keys, make_row):
+        """Schlüssel -> ID einer Dimensionstabelle, fehlende Einträge werden angelegt"""
+        known = dict(self._db.execute(f'SELECT {key_column}, {id_column} FROM {table}'))
+        new = [key for key in dict.fromkeys(keys) if key not in known]
+        if new:
+            rows = [make_row(key) for key in new]
+            placeholders = ', '.join('?' * len(rows[0]))
+            self._db.executemany(f'INSERT INTO {table} VALUES (NULL, {placeholders})', rows)
+            known.update(self._db.execute(
+                f'SELECT {key_column}, {id_column} FROM {table} WHERE {id_column} > ?',
+                (max(known.values(), default=0),)))
+        return known
+
+    def _next_id(self, table, id_column):
+        return self._db.execute(f'SELECT COALESCE(MAX({id_column}), 0) + 1 FROM {table}').fetchone()[0]
+
+    def import_run(self, json_path, member=None):
+        """Importiert einen Run; liefert die Anzahl der Zeilen je Tabelle oder None, wenn er schon enthalten ist
+
+        Gleiche Datei (Pfad, Größe, mtime) wird ohne Lesen erkannt, gleicher Inhalt
+        unter anderem Pfad über den SHA-256 der Datei.
+        """
+        json_path = Path(json_path)
+        stat = json_path.stat()
+        source = str(json_path.resolve())
+        if self._db.execute('SELECT 1 FROM runs WHERE source = ? AND member IS ? AND source_size = ? '
+                            'AND source_mtime_ns = ?', (source, member, stat.st_size, stat.st_mtime_ns)).fetchone():
+            return None
+        content_hash = file_sha256(json_path) + (f':{member}' if member else '')
+        if self._db.execute('SELECT 1 FROM runs WHERE content_hash = ?', (content_hash,)).fetchone():
+            return None
+        data = load_comparison(json_path, {**EXTRACT_FIELDS, **EXPORT_RUN_FIELDS}, member)
+        with self._db:
+            cursor = self._db.execute(
+                'INSERT INTO runs VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (source, member, stat.st_size, stat.st_mtime_ns, content_hash, data.get('configId'),
+                 data.get('configTitle'), data.get('runLabel'), data.get('timestamp'),
+                 time.strftime('%Y-%m-%dT%H:%M:%S')))
+            return self._insert_run(cursor.lastrowid, data)
+
+    def _insert_run(self, run_id, data):
+        models = data.get('effectiveModels', [])
+        responses = data.get('allFinalAssistantResponses', {})
+        eval_results = data.get('evaluationResults', {})
+        scores = eval_results.get('llmCoverageScores', {})
+        overall = eval_results.get('similarityMatrix') or {}
+        per_prompt = eval_results.get('perPromptSimilarities') or {}
+
+        # Wie extract_data: bei doppelten IDs gilt die letzte Definition an der ersten Position
+        prompt_defs = {}
+        for prompt_def in data.get('config', {}).get('prompts', []):
+            if prompt_def.get('id') is not None:
+                prompt_defs[prompt_def['id']] = extract_prompt(prompt_def)
+
+        names = list(models)
+        for rows in (responses, scores, overall):
+            for prompt_id, row in rows.items():
+                names.extend(row)
+        names.extend(overall)
+        for configs, _, _ in per_prompt.values():
+            names.extend(configs)
+        config_ids = self._ids('configs', 'config_id', 'name', names,
+                               lambda name: (name, get_base_model_name(name), get_system_prompt_info(name)))
+        texts = [text for prompt in prompt_defs.values() for text in prompt['should'] + prompt['should_not']]
+        for prompt_id in prompt_defs:
+            for cell in (scores.get(prompt_id) or {}).values():
+                texts.extend(a.get('keyPointText', '') for a in cell.get('pointAssessments', []))
+        criterion_ids = self._ids('criteria', 'criterion_id', 'text', [text or '' for text in texts],
+                                  lambda text: (text,))
+
+        first_prompt_key = self._next_id('prompts', 'prompt_key')
+        prompt_keys = {prompt_id: first_prompt_key + position for position, prompt_id in enumerate(prompt_defs)}
+        prompt_rows = []
+        criterion_rows = []
+        for position, (prompt_id, prompt) in enumerate(prompt_defs.items()):
+            prompt_key = prompt_keys[prompt_id]
+            prompt_rows.append((prompt_key, run_id, position, str(prompt_id), prompt['category'],
+                                prompt['description'], prompt['prompt'], prompt['ideal']))
+            for is_inverted, field in ((0, 'should'), (1, 'should_not')):
+                criterion_rows.extend((prompt_key, is_inverted, i, criterion_ids[text or ''])
+                                      for i, text in enumerate(prompt[field]))
+
+        # Zellen zu Prompts ohne Definition zeigt auch die Visualisierung nicht
+        cell_id = self._next_id('cells', 'cell_id')
+        cell_rows = []
+        assessment_rows = []
+        judgement_rows = []
+        for prompt_id, prompt_key in prompt_keys.items():
+            prompt_responses = responses.get(prompt_id) or {}
+            prompt_scores = scores.get(prompt_id) or {}
+            for config in dict.fromkeys([*prompt_responses, *prompt_scores]):
+                response = prompt_responses.get(config)
+                response = response if isinstance(response, str) else None
+                cell = prompt_scores.get(config)
+                score = key_points = error = None
+                if isinstance(cell, dict):
+                    points = cell.get('pointAssessments', [])
+                    score = cell.get('avgCoverageExtent')
+                    key_points = cell.get('keyPointsCount', len(points))
+                    error = cell.get('error')
+                    for position, a in enumerate(points):
+                        assessment_rows.append((
+                            cell_id, position, criterion_ids[a.get('keyPointText', '') or ''],
+                            int(bool(a.get('isInverted', False))), a.get('coverageExtent', 0), a.get('multiplier'),
+                            a.get('judgeModelId'), a.get('reflection'), a.get('error')))
+                        judgement_rows.extend(
+                            (cell_id, position, seq, j.get('judgeModelId') or '', j.get('coverageExtent'),
+                             j.get('reflection'))
+                            for seq, j in enumerate(a.get('individualJudgements') or []))
+                cell_rows.append((cell_id, prompt_key, config_ids[config], response,
+                                  int(response is not None and '<<error>>' in response), score, key_points, error))
+                cell_id += 1
+
+        similarity_rows = [(run_id, config_ids[a], config_ids[b], value)
+                           for a, row in overall.items() for b, value in row.items()]
+        prompt_similarity_rows = [
+            (prompt_keys[prompt_id], position, config_ids[config], optional(ideal[position]),
+             optional(peer[position]))
+            for prompt_id, (configs, ideal, peer) in per_prompt.items() if prompt_id in prompt_keys
+            for position, config in enumerate(configs)]
+
+        db = self._db
+        db.executemany('INSERT INTO run_configs VALUES (?, ?, ?)',
+                       [(run_id, position, config_ids[model]) for position, model in enumerate(models)])
+        db.executemany('INSERT INTO prompts VALUES (?, ?, ?, ?, ?, ?, ?, ?)', prompt_rows)
+        db.executemany('INSERT INTO prompt_criteria VALUES (?, ?, ?, ?)', criterion_rows)
+        db.executemany('INSERT INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?)', cell_rows)
+        db.executemany('INSERT INTO assessments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', assessment_rows)
+        db.executemany('INSERT INTO judgements VALUES (?, ?, ?, ?, ?, ?)', judgement_rows)
+        db.executemany('INSERT INTO similarities VALUES (?, ?, ?, ?)', similarity_rows)
+        db.executemany('INSERT INTO prompt_similarities VALUES (?, ?, ?, ?, ?)', prompt_similarity_rows)
+        return {'run_id': run_id, 'prompts': len(prompt_rows), 'cells': len(cell_rows),
+                'assessments': len(assessment_rows), 'judgements': len(judgement_rows)}
+
+    def runs(self):
+        """Alle importierten Runs (älteste zuerst) als Dicts"""
+        return [dict(zip(self.RUN_COLUMNS, row)) for row in self._db.execute(
+            f"SELECT {', '.join(self.RUN_COLUMNS)} FROM runs ORDER BY run_id")]
+
+    def find_run(self, selector):
+        """Run zu einer Run-ID, 'latest' (jüngster timestamp), dem Pfad oder Dateinamen der Quelle oder dem runLabel"""
+        runs = self.runs()
+        if not runs:
+            raise LookupError(f'{self.path} enthält keine Runs')
+        if selector == 'latest':
+            return latest_run(runs)
+        source = str(Path(selector).resolve())
+        matches = [run for run in runs
+                   if selector in (str(run['run_id']), run['run_label'], Path(run['source']).name)
+                   or run['source'] == source]
+        if not matches:
+            raise LookupError(f'Kein Run {selector!r} in {self.path}')
+        return matches[-1]
+
+    def load_run(self, run_id, judgements=True):
+        """Felder der Comparison-JSON eines Runs, wie load_comparison sie mit EXTRACT_FIELDS liefert
+
+        judgements=False lässt die individualJudgements leer; der Report braucht nur
+        den Konsens je Kriterium.
+        """
+        db = self._db
+        models = [name for name, in db.execute(
+            'SELECT g.name FROM run_configs r JOIN configs g ON g.config_id = r.config_id '
+            'WHERE r.run_id = ? ORDER BY r.position', (run_id,))]
+
+        prompt_defs = {}
+        prompt_ids = {}
+        for prompt_key, prompt_id, description, prompt, ideal in db.execute(
+                'SELECT prompt_key, prompt_id, description, prompt, ideal FROM prompts '
+                'WHERE run_id = ? ORDER BY position', (run_id,)):
+            prompt_ids[prompt_key] = prompt_id
+            prompt_defs[prompt_id] = {'id': prompt_id, 'description': description,
+                                      'messages': [{'role': 'user', 'content': prompt}],
+                                      'idealResponse': ideal, 'points': [], 'should_not': []}
+        for prompt_key, is_inverted, text in db.execute(
+                'SELECT pc.prompt_key, pc.is_inverted, cr.text FROM prompt_criteria pc '
+                'JOIN prompts p ON p.prompt_key = pc.prompt_key '
+                'JOIN criteria cr ON cr.criterion_id = pc.criterion_id '
+                'WHERE p.run_id = ? ORDER BY pc.prompt_key, pc.is_inverted, pc.position', (run_id,)):
+            prompt_defs[prompt_ids[prompt_key]]['should_not' if is_inverted else 'points'].append({'text': text})
+
+        responses = {}
+        scores = {}
+        cells = {}
+        for cell_id, prompt_key, config, response, score, key_points, error in db.execute(
+                'SELECT c.cell_id, c.prompt_key, g.name, c.response, c.score, c.key_points, c.error FROM cells c '
+                'JOIN prompts p ON p.prompt_key = c.prompt_key JOIN configs g ON g.config_id = c.config_id '
+                'WHERE p.run_id = ? ORDER BY c.cell_id', (run_id,)):
+            prompt_id = prompt_ids[prompt_key]
+            if response is not None:
+                responses.setdefault(prompt_id, {})[config] = response
+            if key_points is not None:
+                cell = {'keyPointsCount': key_points, 'pointAssessments': []}
+                if score is not None:
+                    cell['avgCoverageExtent'] = score
+                if error is not None:
+                    cell['error'] = error
+                scores.setdefault(prompt_id, {})[config] = cell
+                cells[cell_id] = cell['pointAssessments']
+
+        assessments = {}
+        for cell_id, position, text, is_inverted, coverage, multiplier, judge, reflection, error in db.execute(
+                'SELECT a.cell_id, a.position, cr.text, a.is_inverted, a.coverage, a.multiplier, a.judge, '
+                'a.reflection, a.error FROM assessments a JOIN cells c ON c.cell_id = a.cell_id '
+                'JOIN prompts p ON p.prompt_key = c.prompt_key JOIN criteria cr ON cr.criterion_id = a.criterion_id '
+                'WHERE p.run_id = ? ORDER BY a.cell_id, a.position', (run_id,)):
+            assessment = {'keyPointText': text, 'coverageExtent': coverage, 'isInverted': bool(is_inverted),
+                          'individualJudgements': []}
+            for key, value in (('multiplier', multiplier), ('judgeModelId', judge), ('reflection', reflection),
+                               ('error', error)):
+                if value is not None:
+                    assessment[key] = value
+            cells[cell_id].append(assessment)
+            assessments[cell_id, position] = assessment
+        for cell_id, position, judge, coverage, reflection in db.execute(
+                'SELECT j.cell_id, j.position, j.judge, j.coverage, j.reflection FROM judgements j '
+                'JOIN cells c ON c.cell_id = j.cell_id JOIN prompts p ON p.prompt_key = c.prompt_key '
+                'WHERE p.run_id = ? ORDER BY j.cell_id, j.position, j.seq', (run_id,)) if judgements else ():
+            assessments[cell_id, position]['individualJudgements'].append(
+                {'judgeModelId': judge, 'coverageExtent': coverage, 'reflection': reflection})
+
+        eval_results = {'llmCoverageScores': scores}
+        matrix = {}
+        for a, b, value in db.execute(
+                'SELECT ga.name, gb.name, s.value FROM similarities s JOIN configs ga ON ga.config_id = s.config_a '
+                'JOIN configs gb ON gb.config_id = s.config_b WHERE s.run_id = ?', (run_id,)):
+            matrix.setdefault(a, {})[b] = value
+        if matrix:
+            eval_results['similarityMatrix'] = matrix
+        per_prompt = defaultdict(list)
+        for prompt_key, config, ideal, peer in db.execute(
+                'SELECT ps.prompt_key, g.name, ps.ideal, ps.peer FROM prompt_similarities ps '
+                'JOIN prompts p ON p.prompt_key = ps.prompt_key JOIN configs g ON g.config_id = ps.config_id '
+                'WHERE p.run_id = ? ORDER BY ps.prompt_key, ps.position', (run_id,)):
+            per_prompt[prompt_ids[prompt_key]].append((config, ideal, peer))
+        if per_prompt:
+            eval_results['perPromptSimilarities'] = {
+                prompt_id: ([row[0] for row in rows], np.array([row[1] for row in rows], dtype=float),
+                            np.array([row[2] for row in rows], dtype=float))
+                for prompt_id, rows in per_prompt.items()}
+
+        return {
+            'config': {'prompts': list(prompt_defs.values())},
+            'effectiveModels': models,
+            'allFinalAssistantResponses': responses,
+            'evaluationResults': eval_results,
+        }
@@ -0,0 +1,722 @@
+#!/usr/bin/env python3
+"""Führt einen Weval-Blueprint lokal gegen OpenAI-kompatible Endpunkte aus
+
+Jede Kombination aus Modell × System-Prompt-Variante × Prompt wird einmal
+generiert und anschließend pro Kriterium (should/should_not) von den
+Judge-Modellen bewertet. Alle Anfragen laufen gleichzeitig in einer asyncio-
+Schleife; begrenzt werden sie nur pro Provider (Semaphore), sodass die Laufzeit
+von der Parallelität abhängt und nicht von der Anzahl der Prompts. Bei 429/5xx
+wird mit exponentiellem Backoff (bzw. Retry-After) wiederholt, der ganze Provider
+pausiert so lange. Das Ergebnis ist eine Comparison-JSON im Weval-Schema, die
+create_complete_visualization.py direkt lesen kann:
+
+    python run_evaluation.py mittelhochdeutsch-evaluation.yml --mock
+    python run_evaluation.py mittelhochdeutsch-evaluation.yml --judge openrouter:openai/gpt-oss-120b \\
+        --concurrency 16 --provider-concurrency openai=4
+    python run_evaluation.py --serve-mock --port 8765      # Mock-Server einzeln starten
+
+Mit --jsonl steht jede fertige Zelle sofort in einer JSON-Lines-Datei, die
+create_complete_visualization.py mit --follow während des Runs auswertet.
+
+Mit --prescore werden Kriterien mit festen Zielwörtern lexikalisch vorbewertet
+(prescore_criteria.py); eindeutige Fälle brauchen dann keinen Judge-Aufruf.
+
+Provider und Modell stehen wie im Blueprint in der Modell-ID (openrouter:qwen/...),
+der API-Key kommt aus <PROVIDER>_API_KEY (z.B. OPENROUTER_API_KEY).
+
+Ohne externe Abhängigkeiten: HTTP/1.1 wird direkt über asyncio-Streams gesprochen
+(eine Verbindung pro Anfrage). Multi-Turn-Prompts werden auf die erste
+Nutzer-Nachricht reduziert, wie im kompilierten Prompt-Index.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import ssl
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from compile_blueprint import compile_blueprint
+from judge_cache import (DEFAULT_CACHE_DIR, IDEAL_MODEL_ID, JUDGE_CACHE_MAX_BYTES, JUDGE_CACHE_NAME, JudgeCache,
+                         consensus_assessment, coverage_cell, point_key, response_hash)
+from prescore_criteria import PRESCORER_ID, LexicalPrescorer
+
+PROVIDER_ENDPOINTS = {
+    'openai': 'https://api.openai.com/v1',
+    'openrouter': 'https://openrouter.ai/api/v1',
+}
+DEFAULT_JUDGES = ['openrouter:openai/gpt-oss-120b']
+DEFAULT_CONCURRENCY = 8
+REQUEST_TIMEOUT = 120.0
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Bewertungsskala der Judges wie in Weval (Anteil, zu dem ein Kriterium erfüllt ist)
+JUDGE_CLASSES = {
+    'CLASS_UNMET': 0.0,
+    'CLASS_PARTIALLY_MET': 0.25,
+    'CLASS_MODERATELY_MET': 0.5,
+    'CLASS_MAJORLY_MET': 0.75,
+    'CLASS_EXACTLY_MET': 1.0,
+}
+JUDGE_SYSTEM_PROMPT = (
+    'Du bewertest, ob ein Text ein einzelnes Kriterium erfüllt. Begründe kurz in '
+    '<reflection>...</reflection> und antworte dann mit genau einer Klasse in '
+    '<classification>...</classification>: ' + ', '.join(JUDGE_CLASSES) + '.'
+)
+_CLASSIFICATION_RE = re.compile(r'<classification>\s*(CLASS_[A-Z_]+)\s*</classification>')
+_REFLECTION_RE = re.compile(r'<reflection>(.*?)</reflection>', re.S)
+
+class ModelRequestError(Exception):
+    """Fehlgeschlagene Anfrage; retryable, wenn eine Wiederholung sinnvoll ist"""
+
+    def __init__(self, message, retryable=False, retry_after=None, rate_limited=False):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.rate_limited = rate_limited
+
+async def http_post_json(url, payload, headers=None, timeout=REQUEST_TIMEOUT):
+    """POST mit JSON-Body, liefert (Status, Header, Body-Bytes)"""
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = [f'POST {path} HTTP/1.1', f'Host: {parts.netloc}', 'Content-Type: application/json',
+            f'Content-Length: {len(body)}', 'Connection: close']
+    head += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    request = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80),
+            ssl=ssl.create_default_context() if secure else None)
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise ModelRequestError(f'Ungültige HTTP-Antwort: {status_line[:80]!r}', retryable=True)
+            response_headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                response_headers[name.strip().lower()] = value.strip()
+            if 'chunked' in response_headers.get('transfer-encoding', '').lower():
+                chunks = []
+                while True:
+                    size = int((await reader.readline()).split(b';')[0], 16)
+                    if size == 0:
+                        break
+                    chunks.append(await reader.readexactly(size))
+                    await reader.readline()
+                data = b''.join(chunks)
+            elif 'content-length' in response_headers:
+                data = await reader.readexactly(int(response_headers['content-length']))
+            else:
+                data = await reader.read()
+            return status, response_headers, data
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+def retry_after_seconds(headers):
+    """Wartezeit aus retry-after-ms (OpenAI) oder Retry-After (Sekunden), sonst None"""
+    for name, scale in (('retry-after-ms', 0.001), ('retry-after', 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, ValueError):
+            continue
+    return None
+
+class Provider:
+    """OpenAI-kompatibler Endpunkt mit eigener Parallelitätsgrenze und Backoff
+
+    Höchstens concurrency Anfragen sind gleichzeitig offen. Meldet der Endpunkt
+    ein Rate-Limit (429) oder Überlastung (503), warten alle weiteren Anfragen
+    dieses Providers bis zum angegebenen Zeitpunkt, statt ihn sofort erneut zu
+    treffen, und die Grenze wird halbiert (höchstens einmal pro Wartezeit).
+    Jede erfolgreiche Anfrage hebt sie wieder um 1/Grenze an, bis concurrency
+    erreicht ist (AIMD).
+    """
+
+    def __init__(self, name, base_url, api_key=None, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES):
+        self.name = name
+        self.url = base_url.rstrip('/') + '/chat/completions'
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._limit = float(concurrency)
+        self._active = 0
+        self._waiters = deque()
+        self._resume_at = 0.0
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'timeouts': 0, 'failed': 0,
+                      'busy_seconds': 0.0, 'min_limit': concurrency}
+
+    async def _acquire(self):
+        if self._active < int(self._limit) and not self._waiters:
+            self._active += 1
+            return
+        # Wartende werden in Ankunftsreihenfolge und nur bei freiem Platz geweckt
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _wake(self):
+        while self._waiters and self._active < int(self._limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
+
+    def _release(self):
+        self._active -= 1
+        self._wake()
+
+    def _rate_limited(self, delay):
+        now = asyncio.get_running_loop().time()
+        if now >= self._resume_at:
+            self._limit = max(1.0, self._limit / 2)
+            self.stats['min_limit'] = min(self.stats['min_limit'], int(self._limit))
+        self._resume_at = max(self._resume_at, now + delay)
+
+    async def _request(self, payload):
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        loop = asyncio.get_running_loop()
+        await self._acquire()
+        try:
+            wait = self._resume_at - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self.stats['requests'] += 1
+            start = loop.time()
+            try:
+                status, response_headers, body = await http_post_json(self.url, payload, headers, self.timeout)
+            except asyncio.TimeoutError:
+                self.stats['timeouts'] += 1
+                raise ModelRequestError(f'Timeout nach {self.timeout:.0f}s', retryable=True)
+            except (OSError, asyncio.IncompleteReadError, ssl.SSLError, ValueError) as exc:
+                raise ModelRequestError(f'Verbindungsfehler: {exc}', retryable=True)
+            finally:
+                self.stats['busy_seconds'] += loop.time() - start
+        finally:
+            self._release()
+
+        text = body.decode('utf-8', errors='replace')
+        if status == 429 or status >= 500:
+            if status == 429:
+                self.stats['rate_limited'] += 1
+            # 503 (überlastet) ist wie 429 ein Signal, weniger parallel zu senden
+            raise ModelRequestError(f'HTTP {status}: {text[:300]}', retryable=True,
+                                    retry_after=retry_after_seconds(response_headers),
+                                    rate_limited=status in (429, 503))
+        if status != 200:
+            raise ModelRequestError(f'HTTP {status}: {text[:300]}')
+        try:
+            content = json.loads(text)['choices'][0]['message']['content'] or ''
+        except (ValueError, KeyError, IndexError, TypeError):
+            raise ModelRequestError(f'Unerwartete Antwort: {text[:300]}', retryable=True)
+        self._limit = min(float(self.concurrency), self._limit + 1 / self._limit)
+        self._wake()
+        return content
+
+    async def chat(self, model, messages, temperature=None):
+        """Antworttext des Modells; wirft ModelRequestError, wenn alle Versuche scheitern"""
+        payload = {'model': model, 'messages': messages}
+        if temperature is not None:
+            payload['temperature'] = temperature
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._request(payload)
+            except ModelRequestError as exc:
+                if not exc.retryable or attempt == self.max_retries:
+                    self.stats['failed'] += 1
+                    raise
+                # Zufälliger Anteil, damit wartende Anfragen nicht alle gleichzeitig wiederkommen
+                if exc.retry_after is not None:
+                    delay = exc.retry_after * (1 + random.random())
+                else:
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * (0.5 + random.random())
+                if exc.rate_limited:
+                    self._rate_limited(delay)
+                else:
+                    self._resume_at = max(self._resume_at, loop.time() + delay)
+                self.stats['retries'] += 1
+                await asyncio.sleep(delay)
+
+def split_model_id(model_id):
+    """'openrouter:qwen/qwen3' -> ('openrouter', 'qwen/qwen3'); ohne Präfix gilt openai"""
+    provider, sep, model = model_id.partition(':')
+    return (provider, model) if sep else ('openai', model_id)
+
+def config_id(model_id, temperature, sp_idx):
+    return f'{model_id}[temp:{temperature:g}][sp_idx:{sp_idx}]'
+
+def weval_timestamp(moment):
+    return moment.strftime('%Y-%m-%dT%H-%M-%S-') + f'{moment.microsecond // 1000:03d}Z'
+
+class EvaluationRun:
+    """Ein Lauf über alle Prompts × Konfigurationen, schreibt ins Comparison-Schema"""
+
+    def __init__(self, blueprint, prompts, providers, models=None, judges=DEFAULT_JUDGES, judge_cache=None,
+                 prescore=False, progress=True, jsonl_path=None):
+        self.blueprint = blueprint
+        self.jsonl_path = jsonl_path
+        self._jsonl = None
+        self.judge_cache = judge_cache
+        self.prescorer = None
+        if prescore:
+            self.prescorer = LexicalPrescorer()
+            for prompt in prompts:
+                for point in prompt['should']:
+                    self.prescorer.add_criterion(prompt['id'], point, False, prompt['prompt'])
+                for point in prompt['should_not']:
+                    self.prescorer.add_criterion(prompt['id'], point, True, prompt['prompt'])
+        self.prescored = 0
+        self.prompts = prompts
+        self.providers = providers
+        self.models = models or blueprint.get('models') or []
+        self.judges = judges
+        self.systems = blueprint.get('system', blueprint.get('systems')) or [None]
+        if not isinstance(self.systems, list):
+            self.systems = [self.systems]
+        self.temperature = float(blueprint.get('temperature') or 0)
+        self.configs = [(config_id(model, self.temperature, sp_idx), model, system)
+                        for model in self.models for sp_idx, system in enumerate(self.systems)]
+        self.progress = progress
+        self.responses = {}
+        self.coverage = {}
+        self.errors = {}
+        self._done = 0
+
+    def provider(self, model_id):
+        return self.providers[split_model_id(model_id)[0]]
+
+    async def judge_point(self, prompt, response, digest, point, inverted):
+        """Konsens der Judges für ein Kriterium im Format von pointAssessments"""
+        messages = [
+            {'role': 'system', 'content': JUDGE_SYSTEM_PROMPT},
+            {'role': 'user', 'content': f"<prompt>{prompt['prompt']}</prompt>\n<text>{response}</text>\n"
+                                        f"<criterion>{point}</criterion>"},
+        ]
+        key = point_key(point, inverted, digest)
+
+        async def judge(judge_id):
+            if self.judge_cache is not None:
+                cached_verdict = self.judge_cache.get(judge_id, key)
+                if cached_verdict is not None:
+                    return (judge_id, *cached_verdict)
+            try:
+                answer = await self.provider(judge_id).chat(split_model_id(judge_id)[1], messages, 0)
+            except ModelRequestError as exc:
+                return judge_id, None, str(exc)
+            match = _CLASSIFICATION_RE.search(answer)
+            if not match or match.group(1) not in JUDGE_CLASSES:
+                return judge_id, None, f'Keine gültige Klassifikation: {answer[:200]}'
+            reflection = _REFLECTION_RE.search(answer)
+            reflection = reflection.group(1).strip() if reflection else ''
+            if self.judge_cache is not None:
+                self.judge_cache.put(judge_id, key, JUDGE_CLASSES[match.group(1)], reflection)
+            return judge_id, JUDGE_CLASSES[match.group(1)], reflection
+
+        verdicts = await asyncio.gather(*(judge(judge_id) for judge_id in self.judges))
+        valid = [verdict for verdict in verdicts if verdict[1] is not None]
+        assessment = consensus_assessment(point, inverted, valid, self.judges)
+        if not valid:
+            assessment['error'] = f'Alle {len(verdicts)} Judges sind fehlgeschlagen: {verdicts[0][2]}'
+        return assessment
+
+    async def run_cell(self, prompt, config, model_id, system):
+        messages = ([{'role': 'system', 'content': system}] if system else [])
+        messages.append({'role': 'user', 'content': prompt['prompt']})
+        try:
+            response = await self.provider(model_id).chat(split_model_id(model_id)[1], messages, self.temperature)
+        except ModelRequestError as exc:
+            message = f'Failed to get response for {config}: {exc}'
+            self.responses[prompt['id']][config] = f'<<error>>{message}<</error>>'
+            self.errors.setdefault(prompt['id'], {})[config] = message
+            self.coverage[prompt['id']][config] = {'error': f'Generation failed: {message}'}
+        else:
+            self.responses[prompt['id']][config] = response
+            points = [(point, False) for point in prompt['should']] + [(point, True) for point in prompt['should_not']]
+            digest = response_hash(response)
+            # Lexikalisch sichere Urteile ersetzen die Judges für dieses Kriterium
+            prescored = self.prescorer.scan(prompt['id'], response) if self.prescorer is not None else {}
+            self.prescored += len(prescored)
+
+            async def assess(point, inverted):
+                verdict = prescored.get((point, inverted))
+                if verdict is not None:
+                    return consensus_assessment(point, inverted, [(PRESCORER_ID, *verdict)])
+                return await self.judge_point(prompt, response, digest, point, inverted)
+
+            assessments = await asyncio.gather(*(assess(point, inverted) for point, inverted in points))
+            self.coverage[prompt['id']][config] = coverage_cell(assessments)
+        self.write_record({'type': 'result', 'promptId': prompt['id'], 'modelId': config,
+                           'response': self.responses[prompt['id']][config],
+                           'coverage': self.coverage[prompt['id']][config]})
+        self._done += 1
+        total = len(self.prompts) * len(self.configs)
+        if self.progress and (self._done == total or self._done % max(1, total // 20) == 0):
+            print(f"[{self._done}/{total}] {time.perf_counter() - self._start:.1f}s", flush=True)
+
+    def write_record(self, record):
+        """Hängt einen Record an die JSON-Lines-Datei an (sofort geschrieben, für --follow)"""
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._jsonl.flush()
+
+    async def run(self):
+        """Führt alle Zellen gleichzeitig aus (begrenzt durch die Provider) und liefert die Comparison
+
+        Mit jsonl_path steht jede fertige Zelle sofort als Zeile in dieser Datei;
+        create_complete_visualization.py <datei>.jsonl --follow zeigt den Zwischenstand.
+        """
+        started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        for prompt in self.prompts:
+            self.responses[prompt['id']] = {IDEAL_MODEL_ID: prompt['ideal']}
+            self.coverage[prompt['id']] = {}
+        if self.jsonl_path is not None:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl = open(self.jsonl_path, 'w', encoding='utf-8')
+        try:
+            self.write_record({'type': 'run', **self.header(started),
+                               'effectiveModels': [IDEAL_MODEL_ID] + [config for config, _, _ in self.configs]})
+            await asyncio.gather(*(self.run_cell(prompt, config, model_id, system)
+                                   for prompt in self.prompts for config, model_id, system in self.configs))
+            self.write_record({'type': 'end', 'elapsed': time.perf_counter() - self._start})
+        finally:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+        return self.comparison(started)
+
+    def header(self, started):
+        """Kopf der Comparison (Run-Kennung und Konfiguration mit allen Prompts)"""
+        config = {
+            **{key: value for key, value in self.blueprint.items() if key not in ('system', 'systems')},
+            'models': list(self.models),
+            'systems': list(self.systems),
+            'prompts': [{
+                'id': prompt['id'],
+                'description': prompt['description'],
+                'messages': [{'role': 'user', 'content': prompt['prompt']}],
+                'idealResponse': prompt['ideal'],
+                'points': [{'text': text, 'multiplier': 1} for text in prompt['should']],
+                'should_not': [{'text': text, 'multiplier': 1} for text in prompt['should_not']],
+            } for prompt in self.prompts],
+        }
+        return {
+            'configId': self.blueprint.get('id') or 'local-run',
+            'configTitle': self.blueprint.get('title') or '',
+            'runLabel': hashlib.sha256(json.dumps(config, sort_keys=True, ensure_ascii=False).encode('utf-8')
+                                       ).hexdigest()[:16],
+            'timestamp': weval_timestamp(started),
+            'description': self.blueprint.get('description') or '',
+            'config': config,
+        }
+
+    def comparison(self, started):
+        """Ergebnis im Schema der Weval-Comparison-JSON"""
+        order = [config for config, _, _ in self.configs]
+        histories = {}
+        for prompt in self.prompts:
+            histories[prompt['id']] = {}
+            for config_name, _, system in self.configs:
+                history = [{'role': 'system', 'content': system}] if system else []
+                history += [{'role': 'user', 'content': prompt['prompt']},
+                            {'role': 'assistant', 'content': self.responses[prompt['id']][config_name]}]
+                histories[prompt['id']][config_name] = history
+        return {
+            **self.header(started),
+            'evalMethodsUsed': ['llm-coverage'],
+            'effectiveModels': [IDEAL_MODEL_ID] + order,
+            'modelSystemPrompts': {config_name: system for config_name, _, system in self.configs},
+            'promptIds': [prompt['id'] for prompt in self.prompts],
+            'promptContexts': {prompt['id']: [{'role': 'user', 'content': prompt['prompt']}] for prompt in self.prompts},
+            'extractedKeyPoints': {},
+            'allFinalAssistantResponses': {
+                prompt_id: {m: row[m] for m in [IDEAL_MODEL_ID] + order if m in row}
+                for prompt_id, row in self.responses.items()},
+            'fullConversationHistories': histories,
+            'evaluationResults': {'llmCoverageScores': {
+                prompt_id: {m: row[m] for m in order if m in row} for prompt_id, row in self.coverage.items()}},
+            'errors': self.errors,
+        }
+
+async def handle_mock_request(reader, writer, latency, max_in_flight, in_flight, overloaded):
+    """Ein Request an den Mock-Server (OpenAI-kompatibles /chat/completions)
+
+    Antworten und Judge-Klassen sind deterministisch aus dem Inhalt abgeleitet.
+    Mehr als max_in_flight gleichzeitige Anfragen pro Modell ergeben 429 mit
+    retry-after-ms, Modelle mit 'unavailable' im Namen 404. Modelle mit
+    'overloaded' im Namen beantworten den ersten Versuch jeder Anfrage mit 503
+    (overloaded merkt sich die schon gesehenen Anfragen).
+    """
+    try:
+        request_line = await reader.readline()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+    except (asyncio.IncompleteReadError, ValueError, ConnectionError):
+        writer.close()
+        return
+
+    def respond(status, payload, extra=()):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        reason = {200: 'OK', 404: 'Not Found', 429: 'Too Many Requests',
+                  503: 'Service Unavailable'}.get(status, 'Error')
+        head = [f'HTTP/1.1 {status} {reason}', 'Content-Type: application/json',
+                f'Content-Length: {len(data)}', 'Connection: close', *extra]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+
+    try:
+        parts = request_line.decode('latin-1').split()
+        if len(parts) < 2 or not parts[1].endswith('/chat/completions'):
+            respond(404, {'error': {'message': 'Unbekannter Pfad'}})
+            return
+        request = json.loads(body)
+        model = request.get('model', '')
+        if 'unavailable' in model:
+            respond(404, {'error': {'message': f'No endpoints found for {model}.', 'code': 404}})
+            return
+        if in_flight.get(model, 0) >= max_in_flight:
+            respond(429, {'error': {'message': 'Rate limit exceeded'}}, ('retry-after-ms: 100',))
+            return
+        if 'overloaded' in model and body not in overloaded:
+            overloaded.add(body)
+            respond(503, {'error': {'message': 'Overloaded'}}, ('retry-after-ms: 50',))
+            return
+        in_flight[model] = in_flight.get(model, 0) + 1
+        try:
+            messages = request.get('messages') or []
+            text = messages[-1]['content'] if messages else ''
+            digest = hashlib.sha256(f'{model}\n{text}'.encode('utf-8')).digest()
+            await asyncio.sleep(latency * (0.5 + digest[0] / 255))
+            if messages and messages[0].get('role') == 'system' and messages[0]['content'] == JUDGE_SYSTEM_PROMPT:
+                label = list(JUDGE_CLASSES)[digest[1] % len(JUDGE_CLASSES)]
+                content = f'<reflection>Mock-Bewertung.</reflection><classification>{label}</classification>'
+            else:
+                words = text.split()
+                content = f'Antwort von {model}: ' + ' '.join(words[digest[2] % max(1, len(words)):][:40])
+        finally:
+            in_flight[model] -= 1
+        respond(200, {
+            'id': 'mock-' + digest.hex()[:12],
+            'object': 'chat.completion',
+            'model': model,
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        })
+    finally:
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+async def start_mock_server(host='127.0.0.1', port=0, latency=0.05, max_in_flight=64):
+    """Startet den Mock-Server und liefert (Server, Basis-URL)"""
+    in_flight = {}
+    overloaded = set()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_mock_request(reader, writer, latency, max_in_flight, in_flight, overloaded),
+        host, port, backlog=1024)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    return server, f'http://{bound_host}:{bound_port}/v1'
+
+def parse_assignments(values, convert=str):
+    """['openai=4', 'openrouter=16'] -> {'openai': 4, 'openrouter': 16}"""
+    result = {}
+    for value in values or []:
+        name, sep, setting = value.partition('=')
+        if not sep:
+            raise ValueError(f'Erwartet <Provider>=<Wert>, nicht {value!r}')
+        result[name] = convert(setting)
+    return result
+
+def build_providers(model_ids, base_url, endpoints, concurrency, provider_concurrency, timeout, retries):
+    providers = {}
+    for name in sorted({split_model_id(model_id)[0] for model_id in model_ids}):
+        url = base_url or endpoints.get(name) or PROVIDER_ENDPOINTS.get(name)
+        if not url:
+            raise ValueError(f'Kein Endpunkt für Provider {name!r} (--endpoint {name}=URL oder --base-url)')
+        api_key = os.environ.get(re.sub(r'\W', '_', name).upper() + '_API_KEY')
+        providers[name] = Provider(name, url, api_key, provider_concurrency.get(name, concurrency), timeout, retries)
+    return providers
+
+async def run_evaluation(args, index, judge_cache=None):
+    prompts = list(index['prompts'].values())[:args.limit]
+    blueprint = index['blueprint']
+    models = args.models or blueprint.get('models') or []
+    server = None
+    base_url = args.base_url
+    if args.mock:
+        server, base_url = await start_mock_server(latency=args.mock_latency, max_in_flight=args.mock_max_in_flight)
+        print(f"Mock-Server: {base_url}")
+    try:
+        providers = build_providers(models + args.judge, base_url, args.endpoint, args.concurrency,
+                                    args.provider_concurrency, args.timeout, args.retries)
+        run = EvaluationRun(blueprint, prompts, providers, models, args.judge, judge_cache, args.prescore,
+                            jsonl_path=args.jsonl)
+        points = sum(len(p['should']) + len(p['should_not']) for p in prompts)
+        print(f"{len(prompts)} Prompts × {len(run.configs)} Konfigurationen, "
+              f"{points * len(run.configs) * len(args.judge)} Judge-Urteile "
+              f"({', '.join(f'{p.name}: {p.concurrency} parallel' for p in providers.values())})")
+        start = time.perf_counter()
+        comparison = await run.run()
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    return comparison, providers, elapsed, run.prescored
+
+def write_comparison(comparison, output_path):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(comparison, f, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Führt einen Weval-Blueprint gegen OpenAI-kompatible Endpunkte aus und schreibt eine Comparison-JSON')
+    parser.add_argument('blueprint', nargs='?', type=Path, help='Blueprint-YAML, z.B. mittelhochdeutsch-evaluation.yml')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Ziel-JSON (Standard: results/<id>_<timestamp>_comparison.json)')
+    parser.add_argument('--models', nargs='+', help='Modelle statt der aus dem Blueprint (provider:modell)')
+    parser.add_argument('--judge', nargs='+', default=DEFAULT_JUDGES,
+                        help=f'Judge-Modelle, bei mehreren zählt der Mittelwert (Standard: {DEFAULT_JUDGES[0]})')
+    parser.add_argument('--limit', type=int, help='Nur die ersten N Prompts ausführen')
+    parser.add_argument('--base-url', help='Ein OpenAI-kompatibler Endpunkt für alle Provider (z.B. vLLM, Ollama)')
+    parser.add_argument('--endpoint', action='append', default=[], metavar='PROVIDER=URL',
+                        help='Endpunkt eines Providers, mehrfach angebbar')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Gleichzeitige Anfragen pro Provider (Standard: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--provider-concurrency', action='append', default=[], metavar='PROVIDER=N',
+                        help='Abweichende Parallelität für einen Provider, mehrfach angebbar')
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT,
+                        help=f'Timeout pro Anfrage in Sekunden (Standard: {REQUEST_TIMEOUT:.0f})')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES,
+                        help=f'Wiederholungen bei 429/5xx/Timeouts (Standard: {MAX_RETRIES})')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR,
+                        help=f'Verzeichnis des Judge-Caches {JUDGE_CACHE_NAME} (Standard: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--judge-cache-max-mb', type=int, default=JUDGE_CACHE_MAX_BYTES // (1024 * 1024),
+                        help='Maximale Größe des Judge-Caches in MB, am längsten ungenutzte Urteile zuerst gelöscht')
+    parser.add_argument('--no-judge-cache', action='store_true',
+                        help='Jedes Kriterium neu bewerten, auch wenn ein Urteil zur selben Antwort gespeichert ist')
+    parser.add_argument('--prescore', action='store_true',
+                        help='Kriterien mit festen Zielwörtern lexikalisch vorbewerten und dafür keinen Judge fragen '
+                             '(siehe prescore_criteria.py)')
+    parser.add_argument('--jsonl', type=Path,
+                        help='Jede fertige Zelle sofort als Zeile in diese JSON-Lines-Datei schreiben; '
+                             'create_complete_visualization.py <datei> --follow zeigt den Zwischenstand')
+    parser.add_argument('--mock', action='store_true', help='Gegen einen lokalen Mock-Server im selben Prozess laufen')
+    parser.add_argument('--mock-latency', type=float, default=0.05, help='Mittlere Antwortzeit des Mock-Servers in Sekunden')
+    parser.add_argument('--mock-max-in-flight', type=int, default=64,
+                        help='Gleichzeitige Anfragen pro Modell, ab denen der Mock-Server 429 meldet')
+    parser.add_argument('--serve-mock', action='store_true', help='Nur den Mock-Server starten (mit --port)')
+    parser.add_argument('--port', type=int, default=8765, help='Port für --serve-mock')
+    args = parser.parse_args()
+
+    if args.serve_mock:
+        async def serve():
+            server, base_url = await start_mock_server(port=args.port, latency=args.mock_latency,
+                                                       max_in_flight=args.mock_max_in_flight)
+            print(f"Mock-Server läuft: {base_url} (Strg+C beendet)")
+            async with server:
+                await server.serve_forever()
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.blueprint is None:
+        parser.error('Blueprint fehlt')
+    if args.concurrency < 1:
+        parser.error('--concurrency muss mindestens 1 sein')
+    try:
+        args.endpoint = parse_assignments(args.endpoint)
+        args.provider_concurrency = parse_assignments(args.provider_concurrency, int)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    try:
+        import yaml
+    except ImportError:
+        print("Error: PyYAML wird zum Lesen des Blueprints benötigt (pip install pyyaml)")
+        sys.exit(1)
+    try:
+        index, _ = compile_blueprint(args.blueprint, args.blueprint.with_suffix('.index'))
+    except (OSError, ValueError, yaml.YAMLError) as exc:
+        print(f"Error: {args.blueprint} konnte nicht gelesen werden: {exc}")
+        sys.exit(1)
+
+    judge_cache = None
+    if not args.no_judge_cache:
+        judge_cache = JudgeCache(args.cache_dir / JUDGE_CACHE_NAME, args.judge_cache_max_mb * 1024 * 1024)
+    try:
+        comparison, providers, elapsed, prescored = asyncio.run(run_evaluation(args, index, judge_cache))
+    except ValueError as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
+    finally:
+        if judge_cache is not None:
+            judge_cache.close()
+
+    output_path = args.output or Path(__file__).parent / 'results' / (
+        f"{comparison['configId']}_{comparison['timestamp']}_comparison.json")
+    write_comparison(comparison, output_path)
+
+    requests = sum(p.stats['requests'] for p in providers.values())
+    busy = sum(p.stats['busy_seconds'] for p in providers.values())
+    failed_cells = sum(len(row) for row in comparison['errors'].values())
+    print(f"\nFertig in {elapsed:.1f}s: {requests} Anfragen ({requests / elapsed:.1f}/s), "
+          f"im Mittel {busy / elapsed:.1f} gleichzeitig, {failed_cells} fehlgeschlagene Zellen")
+    for provider in providers.values():
+        stats = provider.stats
+        print(f"  {provider.name}: {stats['requests']} Anfragen, {stats['retries']} Wiederholungen "
+              f"({stats['rate_limited']}× 429, {stats['timeouts']} Timeouts), {stats['failed']} endgültig fehlgeschlagen, "
+              f"Parallelität mindestens {stats['min_limit']}")
+    if judge_cache is not None:
+        print(f"  Judge-Cache: {judge_cache.hits} Urteile wiederverwendet, {judge_cache.misses} neu bewertet")
+    if args.prescore:
+        print(f"  Vorbewertung: {prescored} Kriterien lexikalisch entschieden, "
+              f"{prescored * len(args.judge)} Judge-Urteile gespart")
+    print(f"Comparison: {output_path}")
+
+if __name__ == "__main__":
+    main()
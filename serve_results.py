@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""Lokaler Ergebnis-Server: Runs einmal laden, Ansichten als paginiertes JSON ausliefern
+
+Statt für jeden Run eine mehrere MB große HTML-Datei zu rendern, hält der Server
+einen Index aller Runs (Comparison-JSONs und/oder Runs aus der Datenbank von
+export_results_db.py). Ein Run wird beim ersten Zugriff wie in der Visualisierung
+über prepare_report (mit Report-Cache) geladen; Leaderboards, Kategorien, Heatmap-
+Zeilen und die Details einer Zelle (Prompt, ideale Antwort, Modell-Antwort,
+Kriterien wie in showDetails) liegen danach fertig im Speicher:
+
+    python serve_results.py results/*.json --db results/results.sqlite
+    curl 'http://127.0.0.1:8050/api/runs'
+    curl 'http://127.0.0.1:8050/api/runs/latest/heatmap?offset=0&limit=50&category=Schimpfwörter'
+    curl 'http://127.0.0.1:8050/api/runs/latest/details?prompt=mhd-1&config=...'
+
+Jede Antwort trägt ein ETag aus der Version des Runs (Größe/mtime der Datei bzw.
+Inhalts-Hash in der Datenbank) und der angefragten Ansicht; bei passendem
+If-None-Match antwortet der Server mit 304, ohne den Run zu laden. 'latest' ist
+der Run mit dem jüngsten timestamp der Evaluation; ohne timestamp zählt die mtime
+der Datei bzw. der Importzeitpunkt in der Datenbank. Neue oder
+geänderte Dateien und neu exportierte Runs werden beim nächsten Request erkannt.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from comparison_loader import comparison_stem, expand_inputs, load_comparison, load_prompt_index, simplify_model_name
+from create_complete_visualization import HEATMAP_CLASS_CODES, get_color_class, prepare_report
+from judge_cache import DEFAULT_CACHE_DIR
+from report_cache import CACHE_MAX_BYTES, CACHE_SCHEMA_VERSION, ResultCache, cached, index_kind
+from results_db import ResultsDatabase, latest_run
+
+API_VERSION = 1
+DEFAULT_PORT = 8050
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Geladene Runs im Speicher (älteste Zugriffe werden zuerst verworfen)
+MAX_LOADED_RUNS = 8
+# Dateien und Datenbank höchstens so oft auf neue/geänderte Runs prüfen (Sekunden)
+REFRESH_INTERVAL = 2.0
+GZIP_MIN_BYTES = 1024
+# Mehr braucht 'latest' aus einer Comparison-JSON nicht
+RUN_TIMESTAMP_FIELDS = {'timestamp': True}
+
+def _number(value, digits=None):
+    """float für JSON: None statt NaN/inf, optional gerundet"""
+    if value is None or not math.isfinite(value):
+        return None
+    return round(float(value), digits) if digits is not None else float(value)
+
+def leaderboard_items(report, kind):
+    """Einträge des konsolidierten bzw. detaillierten Leaderboards wie in iter_ranking_items"""
+    significance = report.get('significance')
+    items = []
+    for idx, (model_id, stats) in enumerate(report[f'{kind}_ranking'], 1):
+        places = significance[kind][model_id] if significance else (idx, idx)
+        ci = significance['ci'].get(model_id) if significance else None
+        total_tests = stats['count'] + stats['errors']
+        items.append({
+            'rank': places[0],
+            'places': list(places),
+            'config': model_id,
+            'name': simplify_model_name(model_id),
+            'base_model': stats['base_name'],
+            'system_prompt': stats['sp_info'],
+            'avg': stats['avg'],
+            'min': stats['min'],
+            'max': stats['max'],
+            'count': stats['count'],
+            'errors': stats['errors'],
+            'success_rate': stats['count'] / total_tests * 100 if total_tests else 0,
+            'ci': [_number(ci[0]), _number(ci[1])] if ci else None,
+        })
+    return items
+
+def category_items(report):
+    """Kategorie-Karten: Sieger und Durchschnitt jeder Konfiguration, in Reihenfolge der Prompts"""
+    categories = dict.fromkeys(report['prompts_data'][p]['category'] for p in report['prompts'])
+    items = []
+    for category in categories:
+        if category not in report['category_best']:
+            continue
+        best_model, best_score = report['category_best'][category]
+        configs = []
+        for model_id in report['models']:
+            score = report['model_stats'][model_id]['category_avg'].get(category)
+            if score is not None:
+                configs.append({'config': model_id, 'name': simplify_model_name(model_id), 'score': score,
+                                'class': get_color_class(score)})
+        items.append({
+            'category': category,
+            'prompts': sum(1 for p in report['prompts'] if report['prompts_data'][p]['category'] == category),
+            'best': {'config': best_model, 'name': simplify_model_name(best_model), 'score': best_score},
+            'configs': configs,
+        })
+    return items
+
+def heatmap_rows(report):
+    """Eine Heatmap-Zeile pro Prompt: gerundete Scores und Farbklassen (Codes wie heatmap_payload)"""
+    rows = []
+    for prompt_id in report['prompts']:
+        row = report['results'].get(prompt_id, {})
+        scores = []
+        classes = []
+        for model_id in report['models']:
+            if model_id not in row:
+                scores.append(None)
+                classes.append('-')
+                continue
+            score = row[model_id]['score']
+            scores.append(_number(score, 1))
+            classes.append(HEATMAP_CLASS_CODES[get_color_class(score)])
+        rows.append({'prompt': prompt_id, 'category': report['prompts_data'][prompt_id]['category'],
+                     'scores': scores, 'classes': ''.join(classes)})
+    return rows
+
+def build_views(report):
+    """Vorberechnete Ansichten eines Runs (der In-Memory-Index eines geladenen Reports)"""
+    return {
+        'report': report,
+        'configs': [{'config': m, 'name': simplify_model_name(m)} for m in report['models']],
+        'consolidated': leaderboard_items(report, 'consolidated'),
+        'detailed': leaderboard_items(report, 'detailed'),
+        'categories': category_items(report),
+        'heatmap': heatmap_rows(report),
+    }
+
+class RunIndex:
+    """Alle bekannten Runs mit Version (für ETags) und die zuletzt benutzten geladenen Reports
+
+    Runs aus Dateien heißen wie ihre Datei (comparison_stem), Runs aus der
+    Datenbank db-<run_id>. Die Liste wird bei Requests höchstens alle
+    REFRESH_INTERVAL Sekunden neu aufgebaut; ändert sich die Version eines Runs,
+    wird sein geladener Report verworfen.
+    """
+
+    def __init__(self, inputs=(), db_path=None, member=None, prompt_index=None, cache=None,
+                 max_loaded=MAX_LOADED_RUNS):
+        self.inputs = list(inputs)
+        self.db_path = db_path
+        self.member = member
+        self.prompt_index = prompt_index
+        self.cache = cache
+        self.max_loaded = max_loaded
+        self.runs = {}
+        self.listing_version = ''
+        self._names = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._loaded = OrderedDict()
+        self._timestamps = {}
+        self._refreshed = 0.0
+        self.refresh(force=True)
+
+    def _version(self, *parts):
+        digest = self.prompt_index['digest'][:16] if self.prompt_index else ''
+        key = '|'.join(map(str, (API_VERSION, CACHE_SCHEMA_VERSION, digest, *parts)))
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+
+    def _name(self, key, stem):
+        """Stabiler Name eines Runs; gleichnamige Dateien aus anderen Verzeichnissen bekommen -2, -3, ..."""
+        if key not in self._names:
+            taken = set(self._names.values())
+            name = stem
+            suffix = 2
+            while name in taken:
+                name = f'{stem}-{suffix}'
+                suffix += 1
+            self._names[key] = name
+        return self._names[key]
+
+    def _scan(self, strict):
+        runs = {}
+        if self.inputs:
+            try:
+                json_paths = expand_inputs(self.inputs)
+            except FileNotFoundError:
+                if strict:
+                    raise
+                json_paths = [Path(run['source']) for run in self.runs.values() if run['kind'] == 'json']
+            for json_path in json_paths:
+                try:
+                    stat = json_path.stat()
+                except FileNotFoundError:
+                    continue
+                source = str(json_path.resolve())
+                name = self._name(source, comparison_stem(json_path))
+                version = self._version(source, self.member, stat.st_size, stat.st_mtime_ns)
+                runs[name] = {
+                    'id': name, 'kind': 'json', 'source': source, 'member': self.member,
+                    'title': None, 'run_label': None, 'timestamp': self._timestamps.get(version),
+                    'modified': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(stat.st_mtime)),
+                    'version': version,
+                }
+        if self.db_path:
+            database = ResultsDatabase(self.db_path, readonly=True)
+            try:
+                db_runs = database.runs()
+            finally:
+                database.close()
+            for run in db_runs:
+                name = self._name(('db', run['run_id']), f"db-{run['run_id']}")
+                runs[name] = {
+                    'id': name, 'kind': 'db', 'source': run['source'], 'member': run['member'],
+                    'db_run_id': run['run_id'], 'title': run['title'], 'run_label': run['run_label'],
+                    'timestamp': run['timestamp'], 'modified': run['imported_at'],
+                    'version': self._version(run['content_hash']),
+                }
+        return runs
+
+    def refresh(self, force=False):
+        """Liste der Runs neu aufbauen (gedrosselt); veraltete geladene Reports verwerfen"""
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed < REFRESH_INTERVAL:
+                return
+            try:
+                runs = self._scan(strict=force)
+            except (sqlite3.Error, ValueError) as exc:
+                if force:
+                    raise
+                print(f"Warnung: Runs konnten nicht neu eingelesen werden: {exc}")
+                runs = self.runs
+            self._refreshed = time.monotonic()
+            for name, views in list(self._loaded.items()):
+                if name not in runs or runs[name]['version'] != views['version']:
+                    del self._loaded[name]
+            self.runs = runs
+            self.listing_version = self._version(*(f"{name}:{run['version']}" for name, run in runs.items()))
+
+    def _read_timestamps(self):
+        """Trägt den timestamp der Datei-Runs nach, selektiv gelesen und einmal je Version einer Datei"""
+        with self._lock:
+            for run in self.runs.values():
+                if run['kind'] != 'json' or run['timestamp'] is not None:
+                    continue
+                if run['version'] not in self._timestamps:
+                    try:
+                        timestamp = load_comparison(run['source'], RUN_TIMESTAMP_FIELDS, run['member']).get('timestamp')
+                    except (ValueError, zipfile.BadZipFile, OSError, EOFError) as exc:
+                        print(f"Warnung: timestamp von {run['source']} nicht lesbar: {exc}")
+                        timestamp = None
+                    self._timestamps[run['version']] = timestamp if isinstance(timestamp, str) else None
+                run['timestamp'] = self._timestamps[run['version']]
+
+    def find(self, name):
+        """Run zu seinem Namen oder 'latest', sonst None
+
+        'latest' ist der jüngste Run nach latest_run: Datei-Runs werden dafür beim
+        ersten Mal nach ihrem timestamp gelesen; nur ohne lesbaren timestamp zählt
+        die mtime der Datei (bzw. der Importzeitpunkt in der Datenbank).
+        """
+        if name == 'latest':
+            self._read_timestamps()
+            return latest_run(list(self.runs.values()), 'modified')
+        return self.runs.get(name)
+
+    def _load_report(self, run):
+        if run['kind'] == 'db':
+            print(f"Lade Run {run['db_run_id']} aus {self.db_path}...")
+            database = ResultsDatabase(self.db_path, readonly=True)
+            try:
+                return prepare_report(database.load_run(run['db_run_id'], judgements=False), self.prompt_index)
+            finally:
+                database.close()
+
+        json_path = Path(run['source'])
+        def prepare():
+            print(f"Lade {json_path}...")
+            return prepare_report(load_comparison(json_path, member=run['member']), self.prompt_index)
+        return cached(self.cache, json_path, index_kind('report', self.prompt_index), prepare, run['member'])
+
+    def views(self, run):
+        """Vorberechnete Ansichten eines Runs; lädt ihn beim ersten Zugriff (pro Run nur einmal gleichzeitig)"""
+        name = run['id']
+        with self._lock:
+            views = self._loaded.get(name)
+            if views is not None and views['version'] == run['version']:
+                self._loaded.move_to_end(name)
+                return views
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            with self._lock:
+                views = self._loaded.get(name)
+                if views is not None and views['version'] == run['version']:
+                    return views
+            start = time.perf_counter()
+            views = build_views(self._load_report(run))
+            views['version'] = run['version']
+            print(f"Run {name} geladen ({time.perf_counter() - start:.2f}s)")
+            with self._lock:
+                self._loaded[name] = views
+                while len(self._loaded) > self.max_loaded:
+                    self._loaded.popitem(last=False)
+        return views
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def page_params(query):
+    """offset/limit aus der Query (400 bei ungültigen Werten)"""
+    try:
+        offset = int(query.get('offset', 0))
+        limit = int(query.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, 'offset und limit müssen ganze Zahlen sein')
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f'offset >= 0 und 1 <= limit <= {MAX_PAGE_SIZE} erwartet')
+    return offset, limit
+
+def paginate(items, path, query, **extra):
+    """Seite aus items samt Gesamtzahl und Link auf die nächste Seite"""
+    offset, limit = page_params(query)
+    next_url = None
+    if offset + limit < len(items):
+        next_url = f"{path}?{urlencode({**query, 'offset': offset + limit, 'limit': limit})}"
+    return {**extra, 'total': len(items), 'offset': offset, 'limit': limit,
+            'items': items[offset:offset + limit], 'next': next_url}
+
+def run_info(run):
+    return {key: run.get(key) for key in ('id', 'kind', 'source', 'title', 'run_label', 'timestamp', 'modified')}
+
+def run_endpoint(index, run, view, path, query):
+    """Antwort auf /api/runs/<run>[/<view>]"""
+    views = index.views(run)
+    report = views['report']
+    if view is None:
+        return {
+            **run_info(run),
+            'prompts': len(report['prompts']),
+            'configs': views['configs'],
+            'categories': [item['category'] for item in views['categories']],
+            'cells': sum(len(row) for row in report['results'].values()),
+        }
+    if view == 'leaderboard':
+        kind = query.pop('kind', 'consolidated')
+        if kind not in ('consolidated', 'detailed'):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "kind muss 'consolidated' oder 'detailed' sein")
+        return paginate(views[kind], path, {'kind': kind, **query}, run=run['id'], kind=kind)
+    if view == 'categories':
+        return paginate(views['categories'], path, query, run=run['id'])
+    if view == 'heatmap':
+        rows = views['heatmap']
+        category = query.get('category')
+        if category is not None:
+            rows = [row for row in rows if row['category'] == category]
+        return paginate(rows, path, query, run=run['id'], configs=views['configs'])
+    if view == 'details':
+        prompt_id = query.get('prompt')
+        if prompt_id not in report['prompts_data']:
+            raise ApiError(HTTPStatus.NOT_FOUND, f'Prompt {prompt_id!r} nicht im Run {run["id"]}')
+        row = report['results'].get(prompt_id, {})
+        config = query.get('config')
+        if config is None:
+            results = {model_id: row[model_id] for model_id in report['models'] if model_id in row}
+        elif config in row:
+            results = {config: row[config]}
+        else:
+            raise ApiError(HTTPStatus.NOT_FOUND, f'Keine Zelle ({prompt_id!r}, {config!r}) im Run {run["id"]}')
+        return {'run': run['id'], 'prompt': {'id': prompt_id, **report['prompts_data'][prompt_id]},
+                'results': results}
+    raise ApiError(HTTPStatus.NOT_FOUND, f'Unbekannte Ansicht {view!r}')
+
+ENDPOINTS = [
+    '/api/runs?offset=&limit=',
+    '/api/runs/<run|latest>',
+    '/api/runs/<run>/leaderboard?kind=consolidated|detailed&offset=&limit=',
+    '/api/runs/<run>/categories?offset=&limit=',
+    '/api/runs/<run>/heatmap?category=&offset=&limit=',
+    '/api/runs/<run>/details?prompt=<id>[&config=<id>]',
+]
+
+class ResultsRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD auf die JSON-API; ETag + If-None-Match, gzip bei Accept-Encoding"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'mhd-results/1'
+
+    def do_HEAD(self):
+        self.handle_api(send_body=False)
+
+    def do_GET(self):
+        self.handle_api(send_body=True)
+
+    def handle_api(self, send_body):
+        index = self.server.index
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/') or '/'
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = path.split('/')[1:]
+        try:
+            index.refresh()
+            if path == '/':
+                return self.send_json({'api': API_VERSION, 'runs': len(index.runs), 'endpoints': ENDPOINTS},
+                                      send_body)
+            if parts[:2] != ['api', 'runs'] or len(parts) > 4:
+                raise ApiError(HTTPStatus.NOT_FOUND, f'Unbekannter Pfad {url.path}')
+            if len(parts) == 2:
+                # Alle Runs: das ETag hängt an den Versionen aller Runs
+                etag = self.etag(index.listing_version, path, query)
+                if self.not_modified(etag):
+                    return
+                runs = [run_info(run) for run in index.runs.values()]
+                return self.send_json(paginate(runs, path, query), send_body, etag)
+            run = index.find(parts[2])
+            if run is None:
+                raise ApiError(HTTPStatus.NOT_FOUND, f'Unbekannter Run {parts[2]!r}')
+            # Das ETag entsteht vor dem Laden: bei 304 wird der Run nicht angefasst
+            etag = self.etag(run['version'], '/'.join(['', 'api', 'runs', run['id'], *parts[3:]]), query)
+            if self.not_modified(etag):
+                return
+            payload = run_endpoint(index, run, parts[3] if len(parts) == 4 else None, path, dict(query))
+            return self.send_json(payload, send_body, etag)
+        except ApiError as exc:
+            self.send_json({'error': str(exc)}, send_body, status=exc.status)
+        except (ValueError, zipfile.BadZipFile, OSError, EOFError, sqlite3.Error, pickle.UnpicklingError) as exc:
+            self.log_error('%s', exc)
+            self.send_json({'error': f'Run konnte nicht geladen werden: {exc}'}, send_body,
+                           status=HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def etag(version, path, query):
+        key = f"{version}|{path}|{urlencode(sorted(query.items()))}"
+        return '"' + hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest() + '"'
+
+    def not_modified(self, etag):
+        """304 senden, wenn If-None-Match das ETag (auch als gzip-Variante oder schwach) enthält"""
+        header = self.headers.get('If-None-Match')
+        if header is None:
+            return False
+        tags = {tag.strip().removeprefix('W/').replace('-gz"', '"') for tag in header.split(',')}
+        if '*' not in tags and etag not in tags:
+            return False
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header('ETag', self.encoded_etag(etag))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        return True
+
+    def accepts_gzip(self):
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def encoded_etag(self, etag):
+        # Die gzip-Variante ist eine andere Repräsentation und braucht ein eigenes starkes ETag
+        return etag[:-1] + '-gz"' if self.accepts_gzip() else etag
+
+    def send_json(self, payload, send_body, etag=None, status=HTTPStatus.OK):
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode('utf-8')
+        gzipped = len(body) >= GZIP_MIN_BYTES and self.accepts_gzip()
+        if gzipped:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        if etag is not None:
+            self.send_header('ETag', etag[:-1] + '-gz"' if gzipped else etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if isinstance(payload, dict) and payload.get('next'):
+            self.send_header('Link', f"<{payload['next']}>; rel=\"next\"")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler HTTP-Server mit paginierten JSON-Ansichten der Runs')
+    parser.add_argument('inputs', nargs='*',
+                        help='Comparison-JSONs (auch komprimiert), Verzeichnisse oder Glob-Muster')
+    parser.add_argument('--db', type=Path, help='Zusätzlich alle Runs aus einer Datenbank von export_results_db.py')
+    parser.add_argument('--member', help='Name oder Glob-Muster des JSON-Eintrags in .zip-Archiven')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse (Standard: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (Standard: {DEFAULT_PORT})')
+    parser.add_argument('--preload', action='store_true', help='Alle Runs schon beim Start laden')
+    parser.add_argument('--max-loaded', type=int, default=MAX_LOADED_RUNS,
+                        help=f'Höchstens so viele geladene Runs im Speicher halten (Standard: {MAX_LOADED_RUNS})')
+    parser.add_argument('--prompt-index', type=Path, help='Mit compile_blueprint.py kompilierter Blueprint-Index')
+    parser.add_argument('--no-cache', action='store_true', help='Report-Cache nicht verwenden')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR,
+                        help=f'Cache-Verzeichnis (Standard: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-max-mb', type=int, default=CACHE_MAX_BYTES // (1024 * 1024),
+                        help='Maximale Cache-Größe in MB')
+    args = parser.parse_args()
+    if not args.inputs and not args.db:
+        parser.error('keine Eingaben (Dateien oder --db)')
+    if args.max_loaded < 1:
+        parser.error('--max-loaded muss mindestens 1 sein')
+
+    prompt_index = None
+    if args.prompt_index:
+        try:
+            prompt_index = load_prompt_index(args.prompt_index)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as exc:
+            print(f"Error: Prompt-Index {args.prompt_index} konnte nicht gelesen werden: {exc}")
+            sys.exit(1)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    try:
+        index = RunIndex(args.inputs, args.db, args.member, prompt_index, cache, args.max_loaded)
+    except (FileNotFoundError, sqlite3.Error, ValueError) as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
+    if args.preload:
+        for run in index.runs.values():
+            try:
+                index.views(run)
+            except (ValueError, zipfile.BadZipFile, OSError, EOFError, sqlite3.Error) as exc:
+                print(f"Error: Run {run['id']} konnte nicht geladen werden: {exc}")
+                sys.exit(1)
+
+    server = ThreadingHTTPServer((args.host, args.port), ResultsRequestHandler)
+    server.index = index
+    print(f"{len(index.runs)} Runs, Server läuft: http://{args.host}:{server.server_port}/ (Strg+C beendet)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""is_up_to_date: Batch-Ausgaben veralten auch durch Änderungen an den Modulen des Renderers"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from create_complete_visualization import is_up_to_date, script_sources
+
+def test_sources_include_imported_modules():
+    names = {path.name for path in script_sources()}
+    assert {'create_complete_visualization.py', 'mhd_text.py', 'report_statistics.py',
+            'comparison_loader.py', 'text_search.py'} <= names
+
+def test_output_older_than_a_module_is_stale(tmp_path):
+    json_path = tmp_path / 'run.json'
+    output_path = tmp_path / 'run.html'
+    json_path.write_text('{}')
+    output_path.write_text('')
+    os.utime(json_path, (1_000_000_000, 1_000_000_000))
+    newest = max(source.stat().st_mtime for source in script_sources())
+    os.utime(output_path, (newest + 1, newest + 1))
+    assert is_up_to_date(json_path, output_path)
+    # jünger als die Eingabe, aber älter als das zuletzt geänderte Modul
+    os.utime(output_path, (newest - 1, newest - 1))
+    assert not is_up_to_date(json_path, output_path)
+    assert not is_up_to_date(json_path, tmp_path / 'missing.html')
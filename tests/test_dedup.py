@@ -0,0 +1,92 @@
+"""MinHash/LSH: Kandidatenpaare und Gruppen für bekannte nahezu gleiche und verschiedene Antworten"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dedup import DUPLICATE_SHINGLE, MinHashLSH, duplicate_statistics, minhash_signatures
+
+BASE = ('Uns ist in alten mæren wunders vil geseit von helden lobebæren, von grôzer arebeit, '
+        'von fröuden, hôchgezîten, von weinen und von klagen, von küener recken strîten '
+        'muget ir nu wunder hœren sagen.')
+NEAR = BASE.replace('muget ir nu', 'muget ir noch')
+REFORMATTED = '  ' + BASE.upper().replace(' ', '\n  ') + ' '
+DISTINCT = ('Ez wuohs in Burgonden ein vil edel magedîn, daz in allen landen niht schœners mohte sîn, '
+            'Kriemhilt geheizen: si wart ein scœne wîp. dar umbe muosen degene vil verliesen den lîp.')
+
+def shingles(text, k=DUPLICATE_SHINGLE):
+    text = ' '.join(text.casefold().split())
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+def jaccard(a, b):
+    return len(shingles(a) & shingles(b)) / len(shingles(a) | shingles(b))
+
+def build_lsh(texts, seed=0):
+    lsh = MinHashLSH(seed=seed)
+    for key, text, scope in texts:
+        lsh.add(key, text, scope)
+    return lsh
+
+TEXTS = [('base', BASE, 'p1'), ('distinct', DISTINCT, 'p1'), ('near', NEAR, 'p1'),
+         ('reformatted', REFORMATTED, 'p1'), ('other_prompt', BASE, 'p2')]
+
+def test_signatures_are_deterministic_and_normalized():
+    signatures = minhash_signatures([BASE, REFORMATTED, NEAR, DISTINCT], seed=3)
+    assert signatures.shape == (4, 128)
+    np.testing.assert_array_equal(signatures, minhash_signatures([BASE, REFORMATTED, NEAR, DISTINCT], seed=3))
+    assert not np.array_equal(signatures, minhash_signatures([BASE, REFORMATTED, NEAR, DISTINCT], seed=4))
+    np.testing.assert_array_equal(signatures[0], signatures[1])
+
+def test_signature_agreement_estimates_jaccard():
+    for seed in (0, 1, 2):
+        signatures = minhash_signatures([BASE, NEAR, DISTINCT], seed=seed)
+        assert abs((signatures[0] == signatures[1]).mean() - jaccard(BASE, NEAR)) < 0.15
+        assert abs((signatures[0] == signatures[2]).mean() - jaccard(BASE, DISTINCT)) < 0.15
+    assert jaccard(BASE, NEAR) > 0.85 and jaccard(BASE, DISTINCT) < 0.1
+
+def test_candidate_pairs_stay_within_scope():
+    lsh = build_lsh(TEXTS)
+    first, other = lsh.candidate_pairs()
+    pairs = {tuple(sorted((lsh.keys[a], lsh.keys[b]))) for a, b in zip(first.tolist(), other.tolist())}
+    # alle nahezu gleichen Texte landen im Bucket des ersten ('base'), 'distinct' in keinem
+    assert pairs == {('base', 'near'), ('base', 'reformatted')}
+
+def test_groups_for_fixed_seeds():
+    for seed in (0, 1, 2):
+        lsh = build_lsh(TEXTS, seed)
+        assert [[lsh.keys[i] for i in members] for members in lsh.groups()] == [['base', 'near', 'reformatted']]
+        assert lsh.similarity(0, 3) == 1.0
+        assert lsh.similarity(0, 1) < 0.2
+        assert lsh.groups(threshold=1.0) == [[0, 3]]
+
+def test_query_finds_near_duplicate_in_same_scope():
+    lsh = build_lsh(TEXTS[:2])
+    key, similarity = lsh.query(NEAR, scope='p1')
+    assert key == 'base' and similarity >= 0.8
+    assert lsh.query(NEAR, scope='p2') is None
+    assert lsh.query(DISTINCT.replace('Kriemhilt', 'Brünhilt'), scope='p1')[0] == 'distinct'
+
+def cell(output, score, is_error=False):
+    return {'output': output, 'score': score, 'is_error': is_error, 'passed': [], 'failed': []}
+
+def test_duplicate_statistics_groups_per_prompt():
+    models = ['a', 'b', 'c', 'd']
+    results = {
+        'p1': {'a': cell(BASE, 80.0), 'b': cell(NEAR, 40.0), 'c': cell(DISTINCT, 60.0),
+               'd': cell('<<error>> ' + BASE, None, is_error=True)},
+        'p2': {'a': cell(DISTINCT, 50.0), 'b': cell(DISTINCT, 55.0), 'c': cell('', None), 'd': cell(BASE, 70.0)},
+    }
+    prompts_data = {'p1': {'should': ['x', 'y'], 'should_not': ['z']}, 'p2': {'should': ['x'], 'should_not': []}}
+    stats = duplicate_statistics(results, models, ['p1', 'p2'], prompts_data)
+    assert stats['responses'] == 6
+    assert [(g['prompt'], g['models'], g['identical']) for g in stats['groups']] == [
+        ('p1', ['a', 'b'], False), ('p2', ['a', 'b'], True)]
+    assert stats['groups'][0]['score_min'] == 40.0 and stats['groups'][0]['score_max'] == 80.0
+    assert stats['groups'][1]['similarity'] == stats['groups'][1]['min_similarity'] == 1.0
+    assert stats['reusable'] == 3 + 1
+    assert stats['pairs'] == [{'models': ['a', 'b'], 'prompts': 2}]
+    # übernommene Prompts liefern dasselbe Ergebnis wie neu gehashte
+    assert duplicate_statistics(results, models, ['p1', 'p2'], prompts_data, previous=stats, reuse={'p2'}) == stats
@@ -0,0 +1,89 @@
+"""prepare_report_incremental: gleiches Ergebnis wie prepare_report, Änderungsbericht nennt genau die geänderten Zellen"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from create_complete_visualization import prepare_report, prepare_report_incremental, write_change_report
+
+MODELS = ['openai:gpt[sp_idx:0]', 'openai:gpt[sp_idx:1]', 'mistral:large[sp_idx:0]', 'qwen:max[sp_idx:0]']
+PROMPTS = [f'p{i}' for i in range(8)]
+
+def assessment(prompt, model, extent):
+    points = [{'keyPointText': f'{prompt} Kriterium {k}', 'coverageExtent': extent if k else 1 - extent,
+               'isInverted': k == 2} for k in range(3)]
+    return {'avgCoverageExtent': sum(p['coverageExtent'] for p in points) / len(points), 'pointAssessments': points}
+
+def build_run():
+    prompts = [{'id': p, 'description': f'Aufgabe {p}', 'messages': [{'role': 'user', 'content': f'Übersetze {p}'}],
+                'idealResponse': f'ideal {p}', 'points': [{'text': f'{p} Kriterium 0'}, {'text': f'{p} Kriterium 1'}],
+                'should_not': [{'text': f'{p} Kriterium 2'}]} for p in PROMPTS]
+    responses = {p: {m: f'{p} antwort von {m.split(":")[0]} daz was guot' for m in MODELS} for p in PROMPTS}
+    scores = {p: {m: assessment(p, m, ((i * 7 + j * 3) % 10) / 10) for j, m in enumerate(MODELS)}
+              for i, p in enumerate(PROMPTS)}
+    ids = ['IDEAL_BENCHMARK'] + MODELS
+    similarity = {a: {b: 1.0 if a == b else 0.5 + 0.1 * ((i + j) % 4) for j, b in enumerate(ids)}
+                  for i, a in enumerate(ids)}
+    return {
+        'config': {'prompts': prompts},
+        'effectiveModels': ['IDEAL_BENCHMARK'] + MODELS,
+        'allFinalAssistantResponses': responses,
+        'evaluationResults': {'llmCoverageScores': scores, 'similarityMatrix': similarity},
+    }
+
+def change_run(data):
+    changed = copy.deepcopy(data)
+    responses = changed['allFinalAssistantResponses']
+    scores = changed['evaluationResults']['llmCoverageScores']
+    responses['p1'][MODELS[0]] = 'ganz neue antwort'
+    scores['p3'][MODELS[2]] = assessment('p3', MODELS[2], 0.9)
+    responses['p5'][MODELS[3]] = '<<error>> timeout'
+    scores['p5'][MODELS[3]] = {}
+    return changed, {('p1', MODELS[0]), ('p3', MODELS[2]), ('p5', MODELS[3])}
+
+def test_incremental_render_equals_full_render(capsys):
+    data = build_run()
+    _, state, changes = prepare_report_incremental(data)
+    assert not changes['has_previous']
+    changed, _ = change_run(data)
+    report, _, _ = prepare_report_incremental(changed, state)
+    np.testing.assert_equal(report, prepare_report(changed))
+
+def test_changed_prompt_definition_equals_full_render(capsys):
+    data = build_run()
+    _, state, _ = prepare_report_incremental(data)
+    changed = copy.deepcopy(data)
+    changed['config']['prompts'][2]['description'] = 'neue Beschreibung'
+    report, _, changes = prepare_report_incremental(changed, state)
+    np.testing.assert_equal(report, prepare_report(changed))
+    assert changes['changed_prompts'] == ['p2']
+    assert {c['prompt'] for c in changes['changed_cells']} == {'p2'}
+
+def test_change_report_lists_exactly_changed_cells(tmp_path, capsys):
+    data = build_run()
+    _, state, _ = prepare_report_incremental(data)
+    changed, expected = change_run(data)
+    _, _, changes = prepare_report_incremental(changed, state)
+    output_path = tmp_path / 'run_changes.json'
+    write_change_report(changes, output_path)
+    written = json.loads(output_path.read_text(encoding='utf-8'))
+    assert {(c['prompt'], c['model']) for c in written['changed_cells']} == expected
+    assert len(written['changed_cells']) == len(expected)
+    cells = {(c['prompt'], c['model']): c for c in written['changed_cells']}
+    assert cells[('p1', MODELS[0])]['output_changed'] and not cells[('p1', MODELS[0])]['assessment_changed']
+    assert cells[('p3', MODELS[2])]['assessment_changed'] and not cells[('p3', MODELS[2])]['output_changed']
+    assert cells[('p5', MODELS[3])]['new_score'] is None
+    assert sorted(c['model'] for c in written['recomputed_configs']) == sorted(m for _, m in expected)
+    assert written['added_prompts'] == written['removed_prompts'] == written['changed_prompts'] == []
+
+def test_unchanged_run_has_no_changes(capsys):
+    data = build_run()
+    _, state, _ = prepare_report_incremental(data)
+    report, _, changes = prepare_report_incremental(copy.deepcopy(data), state)
+    assert changes['changed_cells'] == [] and changes['recomputed_configs'] == []
+    np.testing.assert_equal(report, prepare_report(data))
@@ -0,0 +1,34 @@
+"""normalize_text und normalizeSearchText (NORMALIZE_SCRIPT) normalisieren gleich"""
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mhd_text import MHD_LETTERS, NORMALIZE_SCRIPT, normalize_text
+
+WORDS = [
+    'süeʒiu', 'Süeziu', 'schœne', 'schoene', 'Schön', 'schon', 'magedîn', 'MAGEDÎN',
+    'daȥ', 'ſwer', 'Straße', 'STRASSE', 'Æventiure', 'Øre', 'guͦt', 'uͤbel', 'hôchgezît',
+    'wuohs', 'ellende', 'minne', 'Über', 'ê', 'ëre',
+] + list(MHD_LETTERS) + [letter.upper() for letter in MHD_LETTERS]
+
+def test_letters_cover_umlauts():
+    assert normalize_text('schœne') == normalize_text('schoene') == 'schoene'
+    assert normalize_text('schön') == 'schoen'
+    assert normalize_text('schon') == 'schon'
+    assert normalize_text('süeʒiu') == normalize_text('Süeziu')
+    assert normalize_text('magedîn') == 'magedin'
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node nicht installiert')
+def test_browser_normalization_matches_python():
+    script = (NORMALIZE_SCRIPT + 'console.log(JSON.stringify(JSON.parse(process.argv[1])'
+              '.map(normalizeSearchText)));')
+    output = subprocess.run(['node', '-e', script, json.dumps(WORDS)],
+                            capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == [normalize_text(word) for word in WORDS]
@@ -0,0 +1,83 @@
+"""TermMatcher und LexicalPrescorer: überlappende Treffer, Wortgrenzen, Normalisierung"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mhd_text import normalize_text
+from prescore_criteria import LexicalPrescorer, TermMatcher, agreement_report
+
+def names(matcher, term_ids):
+    return {matcher.terms[term_id] for term_id in term_ids}
+
+def test_overlapping_matches_share_one_pass():
+    matcher = TermMatcher(['he', 'she', 'hers', 'his'])
+    words, prefixes = matcher.find('ushers she hers')
+    # in 'ushers' beginnt keiner der Begriffe an einer Wortgrenze
+    assert names(matcher, words) == {'she', 'hers'}
+    assert names(matcher, prefixes) == {'he', 'she', 'hers'}
+
+def test_nested_terms_and_suffix_outputs():
+    matcher = TermMatcher(['wuchs', 'wuchs auf', 'auf', 'wuchs heran'])
+    words, prefixes = matcher.find('er wuchs auf.')
+    assert names(matcher, words) == {'wuchs', 'wuchs auf', 'auf'}
+    assert names(matcher, prefixes) == names(matcher, words)
+    words, prefixes = matcher.find('aufwuchs')
+    assert words == set() and names(matcher, prefixes) == {'auf'}
+
+def test_word_boundaries():
+    matcher = TermMatcher(['elend'])
+    assert matcher.find('elend') == ({0}, {0})
+    assert matcher.find('elende leute') == (set(), {0})
+    assert matcher.find('das ist elend, sagt er') == ({0}, {0})
+    assert matcher.find('unelend') == (set(), set())
+    assert matcher.find('') == (set(), set())
+
+def prescorer(*criteria, prompt_text=''):
+    scorer = LexicalPrescorer()
+    registered = [scorer.add_criterion('p1', criterion, inverted, prompt_text) for criterion, inverted in criteria]
+    return scorer, registered
+
+SWEET = "Übersetzt 'süeʒe' als 'süß' oder 'lieblich'."
+FEAST = "Erklärt 'hôchgezît' als 'Fest' oder 'Hochzeit'."
+MISERY = "Übersetzt 'ellende' als 'elend' oder 'arm'."
+
+def test_should_matches_normalized_whole_words():
+    scorer, registered = prescorer((SWEET, False), (FEAST, False))
+    assert registered == [True, True] and len(scorer) == 2
+    verdicts = scorer.scan('p1', 'Diu maget was SÜSS und ein grôzez FEST wart gehalten')
+    assert set(verdicts) == {(SWEET, False), (FEAST, False)}
+    assert verdicts[(SWEET, False)][0] == 1.0
+    assert normalize_text('süß') in verdicts[(SWEET, False)][1]
+    # nur Wortanfang: kein sicheres Urteil
+    assert scorer.scan('p1', 'Süßigkeiten und Festtage') == {}
+
+def test_should_not_needs_absence_of_prefixes():
+    scorer, _ = prescorer((MISERY, True))
+    assert scorer.scan('p1', 'in der Fremde') == {(MISERY, True): (
+        0.0, "Lexical pre-score: none of the terms 'arm', 'elend' appear in the response.")}
+    assert scorer.scan('p1', 'die elenden Leute') == {}
+    assert scorer.scan('p1', 'ARMUT') == {}
+
+def test_terms_from_prompt_are_not_evidence():
+    scorer, registered = prescorer((FEAST, False), ("Verwechselt 'wîp' mit 'Weib'.", True),
+                                   prompt_text='Ein fest an dem hove')
+    assert registered == [True, False] and len(scorer) == 1
+    assert scorer.scan('p1', 'ein Fest') == {}
+    assert set(scorer.scan('p1', 'eine hôchzît')) == set()
+    assert set(scorer.scan('p1', 'eine Hochzeit')) == {(FEAST, False)}
+
+def test_agreement_report_counts_rules():
+    assessments = [{'keyPointText': FEAST, 'coverageExtent': 1.0},
+                   {'keyPointText': MISERY, 'coverageExtent': 0.2, 'isInverted': True},
+                   {'keyPointText': "Verwechselt 'wîp' mit 'Weib'.", 'coverageExtent': 1.0, 'isInverted': True}]
+    data = {'config': {'prompts': [{'id': 'p1', 'messages': [{'role': 'user', 'content': 'Übersetze'}]}]},
+            'allFinalAssistantResponses': {'p1': {'m': 'ein Fest in der Fremde'}},
+            'evaluationResults': {'llmCoverageScores': {'p1': {'m': {'pointAssessments': assessments}}}}}
+    report = agreement_report(data)
+    assert report['rules'] == 2
+    assert report['assessed'] == 3
+    assert report['prescored'] == {False: 1, True: 1}
+    assert report['agree'] == {False: 1, True: 0}
+    assert [d[2] for d in report['disagreements']] == [MISERY]
@@ -0,0 +1,77 @@
+"""ResultCache: LRU-Verdrängung unter max_bytes, Bereinigung von index.json, Schlüssel nach Inhalt"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from report_cache import ResultCache, cached
+
+PAYLOAD = b'x' * 4000
+
+def write_input(path, content):
+    path.write_text(content)
+    return path
+
+def entry_names(cache):
+    return sorted(p.stem.split('-')[0] for p in cache.cache_dir.glob('*.pickle'))
+
+def age(cache, key, mtime):
+    entry_path = cache.cache_dir / f'{key}.pickle'
+    os.utime(entry_path, (mtime, mtime))
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    inputs = [write_input(tmp_path / f'{name}.json', f'{{"run": "{name}"}}') for name in 'abc']
+    cache = ResultCache(tmp_path / 'cache', max_bytes=10_000)
+    keys = [cache.key(path, name) for path, name in zip(inputs, 'abc')]
+    for key, mtime in zip(keys[:2], (1_000_000_000, 1_000_000_100)):
+        cache.put(key, PAYLOAD)
+        age(cache, key, mtime)
+    assert entry_names(cache) == ['a', 'b']
+    # a wird gelesen und ist damit jünger als b
+    assert cache.get(keys[0]) == PAYLOAD
+    cache.put(keys[2], PAYLOAD)
+    assert entry_names(cache) == ['a', 'c']
+    assert cache.get(keys[1]) is None
+    assert sum(p.stat().st_size for p in cache.cache_dir.glob('*.pickle')) <= cache.max_bytes
+
+def test_index_keeps_only_hashes_of_remaining_entries(tmp_path):
+    old = write_input(tmp_path / 'old.json', '{"run": "old"}')
+    new = write_input(tmp_path / 'new.json', '{"run": "new"}')
+    cache = ResultCache(tmp_path / 'cache', max_bytes=6000)
+    old_key = cache.key(old, 'report')
+    cache.put(old_key, PAYLOAD)
+    age(cache, old_key, 1_000_000_000)
+    cache.put(cache.key(new, 'report'), PAYLOAD)
+    index = json.loads((tmp_path / 'cache' / 'index.json').read_text(encoding='utf-8'))
+    assert list(index) == [str(new.resolve())]
+    # ein neuer Cache liest den bereinigten Index
+    assert ResultCache(tmp_path / 'cache')._load_index() == index
+
+def test_same_size_content_change_invalidates_key(tmp_path):
+    path = write_input(tmp_path / 'run.json', '{"score": 10}')
+    cache = ResultCache(tmp_path / 'cache')
+    key = cache.key(path, 'report')
+    stat = path.stat()
+    # gleiche Größe, neue Werte, mtime zurückgesetzt (z.B. durch cp -p oder ein Entpacken)
+    path.write_text('{"score": 90}')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert path.stat().st_size == stat.st_size
+    assert cache.key(path, 'report') != key
+    assert ResultCache(tmp_path / 'cache').key(path, 'report') == cache.key(path, 'report')
+
+def test_cached_computes_once(tmp_path, capsys):
+    path = write_input(tmp_path / 'run.json', '{}')
+    cache = ResultCache(tmp_path / 'cache')
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        return {'value': len(calls)}
+    
+    assert cached(cache, path, 'report', compute) == {'value': 1}
+    assert cached(cache, path, 'report', compute) == {'value': 1}
+    assert cached(cache, path, 'report', compute, member='inner.json') == {'value': 2}
+    assert len(calls) == 2
@@ -0,0 +1,84 @@
+"""Bootstrap-Konfidenzintervalle, paarweise p-Werte und Gleichstands-Gruppen (report_statistics)"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from report_statistics import ScoreCube, pairwise_p_values, significance_statistics, statistics_from_cube, tie_groups
+
+MODELS = ['alpha', 'beta', 'gamma', 'delta', 'empty']
+
+def build_cube():
+    # alpha und beta praktisch gleichauf, gamma klar dahinter, delta konstant, empty ohne Scores
+    rng = np.random.default_rng(7)
+    n_prompts = 30
+    alpha = rng.uniform(0.6, 1.0, n_prompts)
+    scores = np.column_stack([
+        alpha,
+        np.clip(alpha + rng.normal(0, 0.02, n_prompts), 0, 1),
+        rng.uniform(0.0, 0.4, n_prompts),
+        np.full(n_prompts, 0.5),
+        np.full(n_prompts, np.nan),
+    ])
+    errors = np.zeros(scores.shape, dtype=bool)
+    prompts = [f'p{i}' for i in range(n_prompts)]
+    categories = ['a' if i % 2 else 'b' for i in range(n_prompts)]
+    return ScoreCube.from_arrays(prompts, MODELS, scores, errors, categories)
+
+def significance(cube, resamples=2000):
+    _, consolidated, detailed, _ = statistics_from_cube(cube)
+    return significance_statistics(cube, consolidated, detailed, resamples=resamples)
+
+def test_confidence_intervals_on_fixed_seed():
+    cube = build_cube()
+    first = significance(cube)
+    assert first['ci'] == significance(cube)['ci']
+    valid = cube.valid
+    for j, model in enumerate(MODELS[:4]):
+        low, high = first['ci'][model]
+        column = cube.scores[valid[:, j], j]
+        assert column.min() <= low <= column.mean() <= high <= column.max()
+    assert first['ci']['delta'] == (0.5, 0.5)
+    assert 'empty' not in first['ci']
+    # mehr Stichproben verschieben die Grenzen kaum
+    low, high = significance(cube, resamples=6000)['ci']['alpha']
+    assert abs(low - first['ci']['alpha'][0]) < 0.01 and abs(high - first['ci']['alpha'][1]) < 0.01
+
+def test_p_value_matrix_is_symmetric_with_unit_diagonal():
+    cube = build_cube()
+    p_values = pairwise_p_values(cube.bootstrap_means(2000, seed=0), batch=128)
+    assert p_values.shape == (len(MODELS), len(MODELS))
+    assert np.array_equal(np.diag(p_values), np.ones(len(MODELS)))
+    np.testing.assert_allclose(p_values, p_values.T, equal_nan=True)
+    comparable = p_values[:4, :4]
+    assert ((comparable >= 0) & (comparable <= 1)).all()
+    assert np.isnan(p_values[:4, 4]).all()
+    alpha, beta, gamma = 0, 1, 2
+    assert p_values[alpha, beta] >= 0.05
+    assert p_values[alpha, gamma] < 0.001
+
+def test_p_values_do_not_depend_on_batch_size():
+    means = build_cube().bootstrap_means(1000, seed=0)
+    np.testing.assert_array_equal(pairwise_p_values(means, batch=7), pairwise_p_values(means, batch=1000))
+
+def test_tie_groups_of_constructed_cube():
+    groups = significance(build_cube())['detailed']
+    assert groups['alpha'] == groups['beta'] == (1, 2)
+    assert groups['delta'] == (3, 3)
+    assert groups['gamma'] == (4, 4)
+    assert groups['empty'] == (5, 5)
+
+def test_tie_group_compares_with_first_member():
+    # b ist weder von a noch von c unterscheidbar, c aber von a: c beginnt eine neue Gruppe
+    p_values = np.array([
+        [1.0, 0.30, 0.01],
+        [0.30, 1.0, 0.40],
+        [0.01, 0.40, 1.0],
+    ])
+    ranking = [('a', {}), ('b', {}), ('c', {})]
+    model_index = {'a': 0, 'b': 1, 'c': 2}
+    assert tie_groups(ranking, p_values, model_index) == {'a': (1, 2), 'b': (1, 2), 'c': (3, 3)}
+    assert tie_groups(ranking, p_values, model_index, alpha=0.5) == {'a': (1, 1), 'b': (2, 2), 'c': (3, 3)}
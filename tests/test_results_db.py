@@ -0,0 +1,41 @@
+"""ResultsDatabase.find_run('latest') und latest_run: jüngster timestamp, nicht der zuletzt importierte Run"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from results_db import ResultsDatabase, latest_run
+
+def write_run(path, timestamp):
+    document = {'runLabel': path.stem, 'config': {'prompts': []}, 'effectiveModels': []}
+    if timestamp is not None:
+        document['timestamp'] = timestamp
+    path.write_text(json.dumps(document))
+    return path
+
+def import_runs(tmp_path, runs):
+    database = ResultsDatabase(tmp_path / 'results.sqlite')
+    for name, timestamp in runs:
+        database.import_run(write_run(tmp_path / f'{name}.json', timestamp))
+    return database
+
+def test_latest_is_newest_timestamp_not_last_import(tmp_path):
+    database = import_runs(tmp_path, [('new', '2025-10-22T08-00-00-000Z'), ('old', '2025-10-21T16-56-59-853Z')])
+    assert database.find_run('latest')['run_label'] == 'new'
+
+def test_latest_without_timestamps_is_highest_run_id(tmp_path):
+    database = import_runs(tmp_path, [('first', None), ('second', None)])
+    assert database.find_run('latest')['run_label'] == 'second'
+
+def test_run_without_timestamp_loses_to_dated_run(tmp_path):
+    database = import_runs(tmp_path, [('dated', '2025-10-21T16-56-59-853Z'), ('undated', None)])
+    assert database.find_run('latest')['run_label'] == 'dated'
+
+def test_fallback_field_orders_undated_runs():
+    runs = [{'id': 'b', 'timestamp': None, 'modified': '2025-10-22T08:00:00'},
+            {'id': 'a', 'timestamp': None, 'modified': '2025-10-21T08:00:00'}]
+    assert latest_run(runs, 'modified')['id'] == 'b'
+    assert latest_run(runs)['id'] == 'a'
+    assert latest_run([]) is None
@@ -0,0 +1,119 @@
+"""run_evaluation.py gegen den mitgelieferten Mock-Server: AIMD bei 429/503, FIFO-Warteschlange, JSON-Lines"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compile_blueprint import compile_prompt
+from run_evaluation import (IDEAL_MODEL_ID, EvaluationRun, ModelRequestError, Provider, build_providers,
+                            start_mock_server)
+
+def run_with_mock(scenario, **mock_options):
+    async def main():
+        server, base_url = await start_mock_server(latency=mock_options.pop('latency', 0.005), **mock_options)
+        try:
+            return await scenario(base_url)
+        finally:
+            server.close()
+            await server.wait_closed()
+    return asyncio.run(main())
+
+def test_rate_limit_halves_parallelism_and_retries():
+    async def scenario(base_url):
+        provider = Provider('mock', base_url, concurrency=8)
+        answers = await asyncio.gather(*(provider.chat('m1', [{'role': 'user', 'content': f'frage {i}'}])
+                                         for i in range(24)))
+        return provider, answers
+    provider, answers = run_with_mock(scenario, max_in_flight=2, latency=0.05)
+    assert all(answer.startswith('Antwort von m1') for answer in answers)
+    assert provider.stats['rate_limited'] > 0 and provider.stats['retries'] >= provider.stats['rate_limited']
+    assert provider.stats['min_limit'] < 8
+    assert provider.stats['failed'] == 0 and provider._active == 0
+
+def test_overload_is_retried_and_halves_parallelism():
+    async def scenario(base_url):
+        provider = Provider('mock', base_url, concurrency=4)
+        answer = await provider.chat('overloaded-model', [{'role': 'user', 'content': 'frage'}])
+        return provider, answer
+    provider, answer = run_with_mock(scenario)
+    assert answer.startswith('Antwort von overloaded-model')
+    assert provider.stats['retries'] == 1 and provider.stats['rate_limited'] == 0
+    assert provider.stats['min_limit'] == 2
+
+def test_client_errors_are_not_retried():
+    async def scenario(base_url):
+        provider = Provider('mock', base_url, concurrency=4)
+        try:
+            await provider.chat('unavailable-model', [{'role': 'user', 'content': 'frage'}])
+        except ModelRequestError as exc:
+            return provider, exc
+    provider, exc = run_with_mock(scenario)
+    assert 'HTTP 404' in str(exc) and not exc.retryable
+    assert provider.stats['requests'] == 1 and provider.stats['failed'] == 1
+
+def test_waiters_are_served_in_arrival_order():
+    async def main():
+        provider = Provider('mock', 'http://127.0.0.1:9/v1', concurrency=2)
+        order = []
+
+        async def worker(name):
+            await provider._acquire()
+            order.append(name)
+            await asyncio.sleep(0)
+            provider._release()
+
+        await provider._acquire()
+        await provider._acquire()
+        provider._limit = 1.0  # wie nach einem Rate-Limit: es wird nur ein Platz frei
+        tasks = [asyncio.create_task(worker(name)) for name in 'abcde']
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        provider._release()
+        assert order == []  # noch zwei aktiv bei Grenze 1
+        provider._release()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return order, provider
+    order, provider = asyncio.run(main())
+    assert order == ['a', 'c', 'd', 'e']
+    assert provider._active == 0 and not provider._waiters
+
+def prompts():
+    return [compile_prompt({'id': f'prompt-{i}', 'prompt': f'Übersetze den Satz Nummer {i} ins Neuhochdeutsche.',
+                            'ideal': f'Ideal {i}', 'should': [f'Nennt die Nummer {i}.', 'Ist vollständig.'],
+                            'should_not': ['Erfindet Wörter.']}) for i in range(3)]
+
+def test_jsonl_records_match_comparison(tmp_path):
+    jsonl_path = tmp_path / 'run.jsonl'
+    models = ['openai:m1', 'openai:unavailable-model']
+    judges = ['openai:judge-a', 'openai:judge-b']
+
+    async def scenario(base_url):
+        providers = build_providers(models + judges, base_url, {}, 4, {}, 10.0, 3)
+        run = EvaluationRun({'id': 'mock-test', 'system': [None, 'Du bist ein Mediävist.']}, prompts(), providers,
+                            models, judges, progress=False, jsonl_path=jsonl_path)
+        return await run.run()
+    comparison = run_with_mock(scenario)
+
+    records = [json.loads(line) for line in jsonl_path.read_text(encoding='utf-8').splitlines()]
+    assert records[0]['type'] == 'run' and records[-1]['type'] == 'end'
+    assert records[0]['effectiveModels'] == comparison['effectiveModels']
+    assert records[0]['timestamp'] == comparison['timestamp']
+    results = records[1:-1]
+    assert {record['type'] for record in results} == {'result'}
+    configs = comparison['effectiveModels'][1:]
+    assert len(configs) == 4
+    assert sorted((r['promptId'], r['modelId']) for r in results) == sorted(
+        (p, c) for p in comparison['promptIds'] for c in configs)
+    coverage = comparison['evaluationResults']['llmCoverageScores']
+    for record in results:
+        assert record['response'] == comparison['allFinalAssistantResponses'][record['promptId']][record['modelId']]
+        assert record['coverage'] == coverage[record['promptId']][record['modelId']]
+        if 'unavailable' in record['modelId']:
+            assert record['response'].startswith('<<error>>') and 'error' in record['coverage']
+        else:
+            assert len(record['coverage']['pointAssessments']) == 3
+    assert comparison['allFinalAssistantResponses']['prompt-0'][IDEAL_MODEL_ID] == 'Ideal 0'
+    assert set(comparison['errors']) == set(comparison['promptIds'])
@@ -0,0 +1,63 @@
+"""SelectiveJsonReader gegen json.loads, über alle Blockgrößen"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from comparison_loader import SelectiveJsonReader
+
+DOCUMENT = json.dumps({
+    'skipped': {'deep': [1.5, -2e-3, {'x': 'a "quoted" \\ value'}], 'n': 12345.678},
+    'int': 12,
+    'float': 12.5,
+    'negative': -0.125,
+    'exponent': 1.5e-10,
+    'upper': 6.02E+23,
+    'text': 'magedîn ʒ "zitat" \\ ende',
+    'flags': [True, False, None],
+    'nested': {'keep': {'coverageExtent': 0.75, 'pointAssessments': [{'coverageExtent': 1e0}]},
+               'drop': [3.25, 'x', {'y': 0.1}], 'last': 100},
+    'tail': 7,
+}, ensure_ascii=False)
+
+FIELDS = {
+    'int': True,
+    'float': True,
+    'negative': True,
+    'exponent': True,
+    'upper': True,
+    'text': True,
+    'flags': True,
+    'nested': {'keep': {'*': True}, 'last': True},
+    'tail': True,
+}
+
+def select(value, fields):
+    """Erwartetes Ergebnis: json.loads, auf die ausgewählten Pfade reduziert"""
+    result = {}
+    for key, item in value.items():
+        sub_fields = fields.get(key, fields.get('*'))
+        if sub_fields is True:
+            result[key] = item
+        elif sub_fields:
+            result[key] = select(item, sub_fields) if isinstance(item, dict) else item
+    return result
+
+@pytest.mark.parametrize('chunk_size', range(1, len(DOCUMENT) + 1))
+def test_matches_json_loads_for_every_chunk_size(chunk_size):
+    reader = SelectiveJsonReader(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+    assert reader.read(FIELDS) == select(json.loads(DOCUMENT), FIELDS)
+
+@pytest.mark.parametrize('chunk_size', [2, 3, 9])
+def test_number_cut_at_chunk_boundary(chunk_size):
+    reader = SelectiveJsonReader(io.StringIO('{"a": 12.5, "b": 1}'), chunk_size=chunk_size)
+    assert reader.read({'a': True, 'b': True}) == {'a': 12.5, 'b': 1}
+
+def test_truncated_document_fails():
+    with pytest.raises(ValueError):
+        SelectiveJsonReader(io.StringIO('{"a": 12.5, "b": '), chunk_size=4).read({'a': True, 'b': True})
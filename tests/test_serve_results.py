@@ -0,0 +1,52 @@
+"""RunIndex.find('latest') wählt den jüngsten Run, nicht den zuletzt gelisteten"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from results_db import run_time
+from serve_results import RunIndex
+
+def test_latest_is_newest_file_not_last_listed(tmp_path):
+    # Verzeichnisse werden nach Namen sortiert gelistet: b kommt nach a, ist aber älter
+    for name, mtime in (('a.json', 2_000_000_000), ('b.json', 1_000_000_000)):
+        path = tmp_path / name
+        path.write_text('{}')
+        os.utime(path, (mtime, mtime))
+    index = RunIndex([tmp_path])
+    assert list(index.runs)[-1] == 'b'
+    assert index.find('latest')['id'] == 'a'
+
+def test_evaluation_timestamp_wins_over_modified():
+    older = {'timestamp': '2025-10-21T16-56-59-853Z', 'modified': '2030-01-01T00:00:00'}
+    newer = {'timestamp': '2025-10-22T08-00-00-000Z', 'modified': '2025-10-22T08:00:00'}
+    assert run_time(newer) > run_time(older)
+
+def test_latest_of_empty_index_is_none(tmp_path):
+    assert RunIndex([tmp_path]).find('latest') is None
+
+def test_latest_reads_evaluation_timestamp_of_files(tmp_path):
+    # eine alte Datei, später kopiert (jüngere mtime), bleibt älter als der neue Run
+    runs = (('copied_old.json', '2025-10-21T16-56-59-853Z', 2_000_000_000),
+            ('new.json', '2025-10-22T08-00-00-000Z', 1_000_000_000))
+    for name, timestamp, mtime in runs:
+        path = tmp_path / name
+        path.write_text(json.dumps({'timestamp': timestamp, 'config': {'prompts': []}}))
+        os.utime(path, (mtime, mtime))
+    index = RunIndex([tmp_path])
+    assert index.runs['new']['timestamp'] is None
+    assert index.find('latest')['id'] == 'new'
+    assert index.runs['copied_old']['timestamp'] == '2025-10-21T16-56-59-853Z'
+    index.refresh(force=True)
+    assert index.runs['new']['timestamp'] == '2025-10-22T08-00-00-000Z'
+
+def test_unreadable_file_falls_back_to_mtime(tmp_path):
+    for name, content, mtime in (('broken.json', '{"timestamp": ', 2_000_000_000),
+                                 ('dated.json', '{"timestamp": "2025-10-21T16-56-59-853Z"}', 1_000_000_000)):
+        path = tmp_path / name
+        path.write_text(content)
+        os.utime(path, (mtime, mtime))
+    assert RunIndex([tmp_path]).find('latest')['id'] == 'broken'
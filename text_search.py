@@ -0,0 +1,322 @@
+"""Volltextsuche der Heatmap: invertierter Index in Python, Abfrage im Browser
+
+search_index baut aus einem Report den Index über Prompts, Idealantworten,
+Kriterien und Antworten (Wörter normalisiert wie in mhd_text.py, Postings als
+Varints); SEARCH_SCRIPT ist das Gegenstück im Report, das ihn dekodiert und
+Suchanfragen beantwortet.
+"""
+
+import base64
+import itertools
+
+import numpy as np
+
+from dedup import HASH_MULTIPLIER, mix64
+from mhd_text import NORMALIZE_SCRIPT, normalize_text
+
+# Volltextsuche der Heatmap: Wörter kürzer als SEARCH_MIN_TERM werden nicht indiziert
+SEARCH_MIN_TERM = 2
+# Zeichen je Block, den _search_tokens auf einmal zerlegt
+SEARCH_CHUNK_CHARS = 1 << 22
+# Wortzeichen je Codepoint wie \w, dazu kombinierende Zeichen (uͤ, e + Zirkumflex in NFD), die
+# normalize_text entfernt; ab U+3000 (CJK, Emoji, ...) zählt alles als Wortzeichen
+_WORD_TABLE = np.ones(0x110000, dtype=bool)
+_WORD_TABLE[:0x3000] = [chr(c).isalnum() or c == 0x5f or 0x300 <= c <= 0x36f for c in range(0x3000)]
+_VARINT_LIMITS = [1 << (7 * b) for b in range(1, 5)]
+
+class _SearchVocabulary:
+    """Schreibweisen (Hash ihrer Zeichen) -> Wort-ID; jede Schreibweise wird nur einmal normalisiert"""
+
+    def __init__(self):
+        self.term_ids = {}
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        self._ids = np.zeros(0, dtype=np.int64)
+    
+    def _positions(self, hashes):
+        positions = np.searchsorted(self._hashes, hashes)
+        if not len(self._hashes):
+            return positions, np.zeros(len(hashes), dtype=bool)
+        return positions, self._hashes[np.minimum(positions, len(self._hashes) - 1)] == hashes
+    
+    def lookup(self, hashes, joined, starts, ends):
+        """Wort-IDs der Wörter joined[starts:ends] mit diesen Hashes, -1 für zu kurze Wörter"""
+        positions, known = self._positions(hashes)
+        if not known.all():
+            unique, first = np.unique(hashes[~known], return_index=True)
+            first = np.flatnonzero(~known)[first]
+            ids = []
+            for start, end in zip(starts[first].tolist(), ends[first].tolist()):
+                term = normalize_text(joined[start:end])
+                ids.append(-1 if len(term) < SEARCH_MIN_TERM else self.term_ids.setdefault(term, len(self.term_ids)))
+            all_hashes = np.concatenate([self._hashes, unique])
+            order = np.argsort(all_hashes)
+            self._hashes = all_hashes[order]
+            self._ids = np.concatenate([self._ids, np.array(ids, dtype=np.int64)])[order]
+            positions, known = self._positions(hashes)
+        return self._ids[positions]
+
+def _search_tokens(texts, vocabulary):
+    """(Wort-ID, Textnummer) für jedes Wort der Texte
+
+    Die Texte werden, getrennt durch NUL, als ein Array von Codepoints zerlegt;
+    ein rollender Hash über die Zeichen fasst gleiche Schreibweisen zusammen.
+    """
+    # NUL vorne und hinten: jedes Wort hat eine Grenze davor und danach
+    joined = '\x00' + '\x00'.join(texts) + '\x00'
+    codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+    word = _WORD_TABLE[codes]
+    starts = np.flatnonzero(~word[:-1] & word[1:]) + 1
+    ends = np.flatnonzero(word[:-1] & ~word[1:]) + 1
+    owner = np.searchsorted(np.flatnonzero(codes == 0), starts) - 1
+    
+    # Nach Länge absteigend sortiert: im Schritt j sind nur die Wörter mit mehr als
+    # j Zeichen beteiligt, und die stehen vorne im Array
+    lengths = ends - starts
+    longest = int(lengths.max()) if len(lengths) else 0
+    order = np.argsort(longest - lengths.astype(np.uint16 if longest < 1 << 16 else np.int64), kind='stable')
+    sorted_starts = starts[order]
+    active = np.searchsorted(-lengths[order], -np.arange(longest))
+    hashes = np.zeros(len(order), dtype=np.uint64)
+    for j, count in enumerate(active.tolist()):
+        hashes[:count] = hashes[:count] * HASH_MULTIPLIER + codes[sorted_starts[:count] + j]
+    hashes[order] = mix64(hashes ^ lengths[order].astype(np.uint64))
+    
+    token_terms = vocabulary.lookup(hashes, joined, starts, ends)
+    return token_terms[token_terms >= 0], owner[token_terms >= 0]
+
+def search_index(report):
+    """Invertierter Index über Prompts, Antworten und Kriterien für das Suchfeld der Heatmap
+
+    Dokumente sind die Zellen (Nummer r * len(models) + c, Text: die Antwort)
+    und die Prompt-Zeilen (Nummer len(prompts) * len(models) + r, Text: Prompt,
+    Beschreibung, Idealantwort, Kategorie und Kriterien). Wörter werden wie in
+    prescore_criteria normalisiert, 'magedîn', 'Magedin' und 'süeʒe'/'suez'
+    finden sich also gegenseitig. 'terms' sind die sortierten Wörter (durch
+    Zeilenumbruch getrennt, Reihenfolge wie der String-Vergleich in JavaScript),
+    'postings' je Wort die aufsteigenden Dokumentnummern als Varint-Differenzen
+    (die erste um 1 erhöht) mit einer 0 als Abschluss, base64-kodiert.
+    """
+    prompts = report['prompts']
+    models = report['models']
+    results = report['results']
+    cells = len(prompts) * len(models)
+    
+    def documents():
+        for r, prompt_id in enumerate(prompts):
+            prompt = report['prompts_data'][prompt_id]
+            for text in [prompt_id, prompt['description'], prompt['prompt'], prompt['ideal'], prompt['category'],
+                         *prompt['should'], *prompt['should_not']]:
+                yield cells + r, text
+            row = results.get(prompt_id, {})
+            for c, model_id in enumerate(models):
+                result = row.get(model_id)
+                if result is not None and result['output']:
+                    yield r * len(models) + c, result['output']
+    
+    vocabulary = _SearchVocabulary()
+    pair_terms = []
+    pair_docs = []
+    texts = []
+    docs = []
+    size = 0
+    for doc, text in itertools.chain(documents(), [(None, None)]):
+        if text is not None:
+            texts.append(text.replace('\x00', ' '))
+            docs.append(doc)
+            size += len(text)
+        if texts and (size >= SEARCH_CHUNK_CHARS or text is None):
+            token_terms, owner = _search_tokens(texts, vocabulary)
+            pair_terms.append(token_terms)
+            pair_docs.append(np.array(docs, dtype=np.int64)[owner])
+            texts, docs, size = [], [], 0
+    
+    term_ids = vocabulary.term_ids
+    terms = sorted(term_ids, key=lambda term: term.encode('utf-16-be'))
+    rank = np.empty(len(terms), dtype=np.int64)
+    rank[[term_ids[term] for term in terms]] = np.arange(len(terms))
+    # Sortiert nach (Wort, Dokument), jedes Paar nur einmal
+    documents_total = cells + len(prompts)
+    keys = np.concatenate([rank[t] * documents_total + d for t, d in zip(pair_terms, pair_docs)]
+                          or [np.zeros(0, dtype=np.int64)])
+    keys.sort()
+    keys = keys[np.append(True, keys[1:] != keys[:-1])[:len(keys)]]
+    term_array, doc_array = keys // documents_total, keys % documents_total
+    
+    # Differenzen je Wort, das erste Dokument um 1 erhöht, damit 0 nur als Abschluss vorkommt
+    first = np.ones(len(term_array), dtype=bool)
+    first[1:] = term_array[1:] != term_array[:-1]
+    values = doc_array.copy()
+    values[1:] -= doc_array[:-1]
+    values[first] = doc_array[first] + 1
+    last = np.ones(len(term_array), dtype=bool)
+    last[:-1] = first[1:]
+    values = np.insert(values, np.flatnonzero(last) + 1, 0)
+    # Varint: 7 Bit je Byte, gesetztes hohes Bit = es folgt ein weiteres Byte
+    lengths = 1 + sum((values >= limit).astype(np.int64) for limit in _VARINT_LIMITS)
+    starts = np.cumsum(lengths) - lengths
+    encoded = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    for b in range(len(_VARINT_LIMITS) + 1):
+        more = lengths > b
+        encoded[starts[more] + b] = ((values[more] >> (7 * b)) & 0x7f) | np.where(lengths[more] > b + 1, 0x80, 0)
+    return {
+        'prompts': len(prompts),
+        'models': len(models),
+        'terms': '\n'.join(terms),
+        'postings': base64.b64encode(encoded.tobytes()).decode('ascii'),
+    }
+
+SEARCH_SCRIPT = '''
+        // Volltextsuche über den vorberechneten Index (search_index): jedes Suchwort
+        // muss als Wortanfang in der Antwort oder in Prompt/Idealantwort/Kriterien stehen,
+        // mit 'antwort:' bzw. 'prompt:' davor nur dort
+''' + NORMALIZE_SCRIPT + '''        let searchTerms = null;
+        let searchBytes = null;
+        let searchOffsets = null;
+        let searchLoading = null;
+        // Treffer je Zelle (Zeile * Modelle + Spalte) bei aktiver Suche, sonst null
+        let searchMatches = null;
+        
+        function loadSearchIndex() {
+            if (searchIndex !== null) return Promise.resolve();
+            if (searchLoading === null) {
+                searchLoading = new Promise((resolve, reject) => {
+                    window.registerSearchIndex = index => {
+                        searchIndex = index;
+                        resolve();
+                    };
+                    const script = document.createElement('script');
+                    script.src = searchIndexUrl;
+                    script.onerror = () => {
+                        searchLoading = null;
+                        script.remove();
+                        reject();
+                    };
+                    document.head.appendChild(script);
+                });
+            }
+            return searchLoading;
+        }
+        
+        function prepareSearchIndex() {
+            searchTerms = searchIndex.terms ? searchIndex.terms.split('\\n') : [];
+            const raw = atob(searchIndex.postings);
+            searchBytes = new Uint8Array(raw.length);
+            for (let i = 0; i < raw.length; i++) searchBytes[i] = raw.charCodeAt(i);
+            // Jede Postings-Liste endet mit einer 0 (kommt sonst in keinem Varint als letztes Byte vor)
+            searchOffsets = new Uint32Array(searchTerms.length + 1);
+            let pos = 0;
+            for (let t = 0; t < searchTerms.length; t++) {
+                pos = searchBytes.indexOf(0, pos) + 1;
+                searchOffsets[t + 1] = pos;
+            }
+        }
+        
+        function markPostings(t, cells, rowHits, cellHits) {
+            const end = searchOffsets[t + 1] - 1;
+            let pos = searchOffsets[t];
+            let doc = -1;
+            while (pos < end) {
+                let value = 0;
+                let shift = 0;
+                let byte;
+                do {
+                    byte = searchBytes[pos++];
+                    value |= (byte & 0x7f) << shift;
+                    shift += 7;
+                } while (byte & 0x80);
+                doc = doc < 0 ? value - 1 : doc + value;
+                if (doc < cells) cellHits[doc] = 1;
+                else rowHits[doc - cells] = 1;
+            }
+        }
+        
+        function searchTokens(query) {
+            const tokens = [];
+            for (const part of query.split(/\\s+/)) {
+                const field = part.match(/^(antwort|prompt):(.*)$/i);
+                const words = normalizeSearchText(field ? field[2] : part).match(/[\\p{L}\\p{N}_]+/gu) || [];
+                for (const word of words) {
+                    if (word.length >= ''' + str(SEARCH_MIN_TERM) + ''') {
+                        tokens.push({word: word, field: field ? field[1].toLowerCase() : null});
+                    }
+                }
+            }
+            return tokens;
+        }
+        
+        function searchHeatmap(query) {
+            const status = document.getElementById('heatmapSearchStatus');
+            const tokens = searchTokens(query);
+            if (tokens.length && searchIndex === null) {
+                status.textContent = 'Lade Suchindex...';
+                loadSearchIndex().then(
+                    () => searchHeatmap(document.getElementById('heatmapSearch').value),
+                    () => { status.textContent = 'Suchindex konnte nicht geladen werden: ' + searchIndexUrl; });
+                return;
+            }
+            const start = performance.now();
+            searchMatches = null;
+            if (tokens.length) {
+                if (searchTerms === null) prepareSearchIndex();
+                const rows = searchIndex.prompts;
+                const cols = searchIndex.models;
+                const cells = rows * cols;
+                searchMatches = new Uint8Array(cells).fill(1);
+                for (const {word, field} of tokens) {
+                    const rowHits = new Uint8Array(rows);
+                    const cellHits = new Uint8Array(cells);
+                    let lo = 0;
+                    let hi = searchTerms.length;
+                    while (lo < hi) {
+                        const mid = (lo + hi) >> 1;
+                        if (searchTerms[mid] < word) lo = mid + 1;
+                        else hi = mid;
+                    }
+                    for (let t = lo; t < searchTerms.length && searchTerms[t].startsWith(word); t++) {
+                        markPostings(t, cells, rowHits, cellHits);
+                    }
+                    if (field === 'antwort') rowHits.fill(0);
+                    if (field === 'prompt') cellHits.fill(0);
+                    for (let r = 0; r < rows; r++) {
+                        const rowHit = rowHits[r];
+                        for (let i = r * cols; i < (r + 1) * cols; i++) {
+                            searchMatches[i] &= rowHit | cellHits[i];
+                        }
+                    }
+                }
+            }
+            if (typeof filterHeatmap === 'function') {
+                filterHeatmap(searchMatches);
+            } else {
+                filterHeatmapTable(searchMatches);
+            }
+            if (searchMatches === null) {
+                status.textContent = '';
+                return;
+            }
+            const cols = searchIndex.models;
+            let cellCount = 0;
+            let rowCount = 0;
+            for (let r = 0; r < searchIndex.prompts; r++) {
+                let hits = 0;
+                for (let i = r * cols; i < (r + 1) * cols; i++) hits += searchMatches[i];
+                cellCount += hits;
+                rowCount += hits > 0 ? 1 : 0;
+            }
+            status.textContent = `${cellCount} Zellen in ${rowCount} Prompts (${(performance.now() - start).toFixed(1)} ms)`;
+        }
+        
+        function filterHeatmapTable(matches) {
+            const table = document.querySelector('#heatmap .matrix-table');
+            if (!table) return;
+            table.tBodies[0].querySelectorAll('tr').forEach((row, r) => {
+                let visible = !matches;
+                for (let c = 1; c < row.cells.length; c++) {
+                    const hit = !matches || matches[r * (row.cells.length - 1) + c - 1] === 1;
+                    row.cells[c].classList.toggle('search-miss', !hit);
+                    visible = visible || hit;
+                }
+                row.style.display = visible ? '' : 'none';
+            });
+        }
+'''